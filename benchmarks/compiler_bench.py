@@ -0,0 +1,283 @@
+"""
+Бенчмарк компилятора DSL: время и память стадий Engine.compile_ic
+(Lexer.tokenize, Parser.parse, JSONGenerator) на синтетических программах.
+
+Запуск (из корня репозитория):
+    PYTHONPATH=src python -m benchmarks.compiler_bench -o bench.json
+    PYTHONPATH=src python -m benchmarks.compiler_bench --baseline benchmarks/compiler_baseline.json
+    PYTHONPATH=src python -m benchmarks.compiler_bench --save-baseline benchmarks/compiler_baseline.json
+
+Каждая серия меняет один параметр программы (число маршрутов, глубину
+пайплайнов, долю условий, долю перекрестных ссылок, число таргетов).
+Если следующий случай серии по оценке займет больше --budget секунд
+(время предыдущего, для серии routes — умноженное на рост числа маршрутов),
+он и остальные случаи серии не запускаются и отмечаются как пропущенные.
+"""
+
+from typing import Dict, Any, List, Optional
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from dsl_compiler.config import Config
+from dsl_compiler.json_generator import JSONGenerator
+from dsl_compiler.lexer import Lexer
+from dsl_compiler.parser import Parser
+
+from benchmarks.dsl_generator import DslShape, generate_dsl
+
+
+STAGES = ("lex", "parse", "generate")
+
+# Серии: параметр и его значения; остальные параметры — из базовой программы
+SERIES = {
+    "routes": [10, 100, 1000, 10000, 50000],
+    "depth": [1, 4, 8],
+    "condition_density": [0.0, 0.5, 1.0],
+    "var_refs": [0.0, 0.2, 0.5],
+    "targets": [1, 10, 50],
+}
+BASE_SHAPE = {"routes": 200, "targets": 1, "depth": 2, "condition_density": 0.3, "var_refs": 0.2}
+
+
+def compile_stages(text: str, on_stage=None) -> Dict[str, Any]:
+    """
+    Выполняет стадии compile_ic по очереди (как Engine.compile_ic, без загрузки источника).
+
+    Args:
+        text: Текст программы
+        on_stage: Функция (stage, "begin" | "end"), вызываемая на границах стадий
+
+    Returns:
+        Результат генерации (IC)
+    """
+    on_stage = on_stage or (lambda stage, event: None)
+    on_stage("lex", "begin")
+    tokens = Lexer().tokenize(text)
+    on_stage("lex", "end")
+    on_stage("parse", "begin")
+    ast = Parser().parse(tokens)
+    on_stage("parse", "end")
+    on_stage("generate", "begin")
+    result = ast.accept(JSONGenerator(""))
+    on_stage("generate", "end")
+    return result
+
+
+def _measure_time(text: str) -> Dict[str, float]:
+    marks = {}
+
+    def on_stage(stage: str, event: str) -> None:
+        marks[(stage, event)] = time.perf_counter()
+
+    compile_stages(text, on_stage)
+    return {stage: marks[(stage, "end")] - marks[(stage, "begin")] for stage in STAGES}
+
+
+def _measure_memory(text: str) -> Dict[str, Dict[str, int]]:
+    """Пик и удержанная память каждой стадии (отдельный прогон под tracemalloc)"""
+    memory = {}
+    started = {}
+
+    def on_stage(stage: str, event: str) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if event == "begin":
+            started[stage] = current
+            tracemalloc.reset_peak()
+        else:
+            peak = tracemalloc.get_traced_memory()[1]
+            memory[stage] = {"peak": peak - started[stage], "retained": current - started[stage]}
+
+    tracemalloc.start()
+    try:
+        compile_stages(text, on_stage)
+    finally:
+        tracemalloc.stop()
+    return memory
+
+
+def run_case(shape: DslShape, repeat: int = 3, memory: bool = True) -> Dict[str, Any]:
+    """
+    Измеряет один случай: медиана и минимум времени стадий за repeat прогонов
+    и память стадий.
+    """
+    text = generate_dsl(shape)
+    runs: List[Dict[str, float]] = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            gc.collect()
+            runs.append(_measure_time(text))
+        stage_memory = _measure_memory(text) if memory else {}
+
+    stages = {}
+    for stage in STAGES + ("total",):
+        values = [sum(run.values()) if stage == "total" else run[stage] for run in runs]
+        stages[stage] = {"median": statistics.median(values), "min": min(values)}
+        if stage in stage_memory:
+            stages[stage].update(stage_memory[stage])
+    return {
+        "name": shape.name,
+        "shape": shape.to_dict(),
+        "lines": text.count("\n"),
+        "bytes": len(text.encode("utf-8")),
+        "stages": stages,
+    }
+
+
+def run_suite(
+    series: Optional[List[str]] = None,
+    max_routes: Optional[int] = None,
+    repeat: int = 3,
+    budget: float = 60.0,
+    memory: bool = True,
+    log=None
+) -> Dict[str, Any]:
+    """
+    Выполняет серии бенчмарка.
+
+    Args:
+        series: Имена серий из SERIES (по умолчанию все)
+        max_routes: Ограничение числа маршрутов в серии routes
+        repeat: Сколько раз измерять время каждого случая
+        budget: Случаи серии, оценка времени которых больше budget секунд, пропускаются
+        memory: Измерять память стадий
+        log: Функция для вывода прогресса
+    """
+    log = log or (lambda message: None)
+    Config.set(lang="en", debug=False, color=False)
+    cases = []
+    for name in series or list(SERIES):
+        over_budget = False
+        previous = None
+        for value in SERIES[name]:
+            if name == "routes" and max_routes and value > max_routes:
+                continue
+            shape = DslShape(**{**BASE_SHAPE, name: value})
+            if previous is not None and not over_budget:
+                # Оценка снизу: время растет не медленнее числа маршрутов
+                total, previous_value = previous
+                estimate = total * value / previous_value if name == "routes" else total
+                over_budget = estimate > budget
+            if over_budget:
+                cases.append({"name": shape.name, "series": name, "shape": shape.to_dict(), "skipped": "budget"})
+                log(f"{shape.name}: пропущен (оценка времени больше {budget} с)")
+                continue
+            case = {**run_case(shape, repeat, memory), "series": name}
+            cases.append(case)
+            previous = (case["stages"]["total"]["median"], value)
+            log(f"{shape.name}: {previous[0]:.3f} с")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "cases": cases,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+    min_seconds: float = 0.01
+) -> List[Dict[str, Any]]:
+    """
+    Сравнивает результаты с базовыми по минимальному времени стадий
+    (минимум из повторов меньше всего зависит от фоновой нагрузки).
+
+    Args:
+        current: Результаты run_suite
+        baseline: Сохраненные результаты run_suite
+        tolerance: Допустимый относительный рост времени
+        min_seconds: Стадии быстрее этого порога не сравниваются (шум)
+
+    Returns:
+        Список регрессий: случай, стадия, базовое и текущее время
+        (current None — случай, измеренный в базовых результатах, теперь пропущен)
+    """
+    baseline_cases = {case["name"]: case for case in baseline.get("cases", []) if "stages" in case}
+    regressions = []
+    for case in current.get("cases", []):
+        base = baseline_cases.get(case["name"])
+        if base is None:
+            continue
+        if "stages" not in case:
+            regressions.append({
+                "case": case["name"], "stage": "total", "baseline": base["stages"]["total"]["min"],
+                "current": None, "ratio": None,
+            })
+            continue
+        for stage, stats in case["stages"].items():
+            before = base["stages"].get(stage, {}).get("min")
+            after = stats["min"]
+            if before is None or max(before, after) < min_seconds:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append({
+                    "case": case["name"], "stage": stage, "baseline": before, "current": after,
+                    "ratio": after / before if before else float("inf"),
+                })
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Бенчмарк компилятора DSL Data Route")
+    parser.add_argument('-s', '--series', action='append', choices=list(SERIES), help='Серия (можно несколько)')
+    parser.add_argument('--max-routes', type=int, help='Максимальное число маршрутов в серии routes')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Повторов измерения времени')
+    parser.add_argument('--budget', type=float, default=60.0, help='Порог времени случая для пропуска больших, с')
+    parser.add_argument('--no-memory', action='store_true', help='Не измерять память стадий')
+    parser.add_argument('-o', '--output', help='Файл для JSON с результатами (по умолчанию stdout)')
+    parser.add_argument('-b', '--baseline', help='JSON с базовыми результатами для сравнения')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25, help='Допустимый рост времени (доля)')
+    parser.add_argument('--min-seconds', type=float, default=0.01, help='Более быстрые стадии не сравниваются, с')
+    parser.add_argument('--save-baseline', help='Сохранить результаты как базовые в файл')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    results = run_suite(
+        args.series, args.max_routes, args.repeat, args.budget, not args.no_memory,
+        log=lambda message: print(message, file=sys.stderr)
+    )
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        for item in regressions:
+            if item["current"] is None:
+                change = "случай пропущен по бюджету времени"
+            else:
+                change = f"{item['current']:.4f} с (x{item['ratio']:.2f})"
+            print(f"Регрессия: {item['case']} [{item['stage']}] {item['baseline']:.4f} с -> {change}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("Регрессий нет", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
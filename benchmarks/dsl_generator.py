@@ -0,0 +1,88 @@
+"""
+Генератор синтетических программ DSL для бенчмарков компилятора.
+
+Программа масштабируется по числу маршрутов, глубине пайплайнов, доле
+условий среди шагов, доле перекрестных ссылок (шаг ссылается на итоговое
+поле маршрута выше как на $поле — это зависимости, из которых строится
+execution_plan) и числу таргетов. Генерация
+детерминирована: одинаковые параметры и seed дают одинаковый текст.
+"""
+
+from typing import Dict, Any, Iterator, List
+from dataclasses import dataclass, asdict
+import random
+
+
+@dataclass
+class DslShape:
+    """Параметры синтетической программы"""
+    routes: int = 100
+    targets: int = 1
+    depth: int = 2
+    condition_density: float = 0.3
+    var_refs: float = 0.2
+    global_vars: int = 5
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return (
+            f"routes={self.routes} targets={self.targets} depth={self.depth} "
+            f"cond={self.condition_density} refs={self.var_refs}"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _step(rng: random.Random, shape: DslShape, fields: List[str]) -> str:
+    """Возвращает один шаг пайплайна: функцию или условие"""
+    if fields and rng.random() < shape.var_refs:
+        # Ссылка на итоговое поле маршрута выше: создает зависимость маршрутов
+        value = f"${rng.choice(fields)}"
+    elif shape.global_vars and rng.random() < 0.5:
+        value = f"$gv{rng.randrange(shape.global_vars)}"
+    else:
+        value = str(rng.randrange(100))
+
+    if rng.random() < shape.condition_density:
+        kind = rng.randrange(3)
+        if kind == 0:
+            return f'IF($this == {value}): *get(0)'
+        if kind == 1:
+            return f'IF($this == None): *get({value}) ELSE: *s1'
+        return f'IF($this == {value}): *get(1) ELIF($this == None): *get(0) ELSE: *s1'
+    if rng.random() < 0.5:
+        return "*s1"
+    return f"*get({value})"
+
+
+def iter_dsl_lines(shape: DslShape) -> Iterator[str]:
+    """Отдает строки программы по одной (без сборки всего текста)"""
+    rng = random.Random(shape.seed)
+    yield "lang=py"
+    yield "source=dict/feed"
+    for index in range(shape.global_vars):
+        yield f"$gv{index}={index * 10}"
+    for target in range(1, shape.targets + 1):
+        yield f"target{target}=dict/out{target}"
+
+    per_target = [shape.routes // shape.targets] * shape.targets
+    for index in range(shape.routes % shape.targets):
+        per_target[index] += 1
+
+    for target, count in enumerate(per_target, 1):
+        yield f"target{target}:"
+        fields = []
+        for index in range(count):
+            if shape.depth:
+                steps = "|".join(_step(rng, shape, fields) for _ in range(shape.depth))
+                yield f"    [f{index}] -> |{steps}| -> [f{index}_out](int)"
+            else:
+                yield f"    [f{index}] -> [f{index}_out](int)"
+            fields.append(f"f{index}_out")
+
+
+def generate_dsl(shape: DslShape) -> str:
+    """Возвращает текст программы"""
+    return "\n".join(iter_dsl_lines(shape)) + "\n"
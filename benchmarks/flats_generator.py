@@ -0,0 +1,175 @@
+"""
+Генератор синтетической ленты квартир для бенчмарков исполнителя.
+
+Записи повторяют поля ленты из t/1.py, значения берутся из словарей
+пользовательских функций t/my_funcs (типы, отделка, комнаты), поэтому
+функции находят соответствия так же, как на реальных данных. Набор
+маршрутов (mix) задает, из чего состоят пайплайны: прямые копии полей,
+цепочки *функций, маршруты с условиями IF или все маршруты t/1.py.
+Во всех наборах есть маршрут uuid с IF … SKIP: доля записей без uuid
+(skip_rate) определяет, сколько записей пропускается (условие — первый
+шаг единственного таргета, поэтому оно передается источнику). Генерация
+детерминирована: одинаковые параметры и seed дают одинаковые записи.
+"""
+
+from typing import Dict, Any, Iterator, List
+from dataclasses import dataclass, asdict
+import os
+import random
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUNCS_FOLDER = os.path.join(ROOT, "t", "my_funcs")
+VARS_FOLDER = os.path.join(ROOT, "t", "my_vars")
+
+BLOCKS = [
+    "f49f5e6b-67f1-4596-a4f8-5f27f1f5f457",
+    "04c6223f-24fc-412b-bf49-2adcd8ddccc8",
+    "5d0a5c8e-2f8e-4c1f-9a57-0f3f4b8a9d21",
+]
+TYPES = ["flat", "Квартира", "студия", "apartment", "Апартаменты", "Паркинг", "Кладовая", "Таунхаус", "Коммерция", "дом"]
+FINISHING = ["без отделки", "Черновая", "Чистовая", "White box", "С мебелью", "Предчистовая отделка", "нет данных"]
+ROOMS = ["0", "1", "2", "3", "4", "5", "9", "Помещение свободного назначения", "null", None]
+EURO = ["1", "true", "0", "false", None]
+VIEWS = ["Во двор", "На улицу", "На парк", "На реку"]
+
+# Маршруты t/1.py по видам; $-ссылки указывают на итоговые поля маршрутов выше
+DIRECT_ROUTES = [
+    "[block_uuid] -> [block_uuid](str)",
+    "[rooms] -> [rooms](str)",
+    "[area_total] -> [area_total](float)",
+    "[area_given] -> [area_given](float)",
+    "[area_kitchen] -> [area_kitchen](float)",
+    "[windows] -> [windows](str)",
+    "[window_view] -> [window_view](str)",
+    "[view_places] -> [view_places](str)",
+    "[floors_in_section] -> [floors_in_section](int)",
+    "[comment] -> [comment](str)",
+    "[plan_url] -> [plan_url](str)",
+    "[floor_plan_url] -> [floor_plan_url](str)",
+    "[building_uuid] -> [building_uuid](str)",
+]
+FUNC_ROUTES = [
+    "[block_uuid] -> [block_uuid](str)",
+    "[rooms] -> [rooms](str)",
+    "[type] -> |*get_tag_by_type($this)| -> [tags](str)",
+    "[finising] -> |*get_finishing($this)| -> [finishing](str)",
+    "[] -> |*get_flats_type_uuid($block_uuid, $rooms, $tags)| -> [flats_type_uuid](str)",
+    "[] -> |*get($tags)|*get_uuid_real_estate_type($this)| -> [uuid_real_estate_type](str)",
+    "[price_sale] -> |*s1| -> [price_sale](int)",
+]
+IF_ROUTES = [
+    "[block_uuid] -> [block_uuid](str)",
+    "[is_euro] -> |*s1|IF($this IN $$mv.is_euro): *get(True) ELSE: *get(False)| -> [is_euro](bool)",
+    "[rooms] -> |*s1|IF($block_uuid == $block9Floor AND $this == \"9\" OR $this == None): *get(0)| -> [rooms](str)",
+    "[section] -> |*s1|IF($this == None): *get(\"Нет секции\")| -> [section_name](str)",
+    "[price_sale] -> |*s1| -> [$price_sale](int)",
+    "[price_base] -> |*s1|IF($price_sale != None OR $price_sale != \"0\"): *get($price_sale)| -> [price](int)",
+    "[number] -> |IF($this == None): *get(\"-\")| -> [number](str)",
+    "[floor] -> |*s1|IF($this == None): *get(0)| -> [floor_of_flat](int)",
+]
+FLATS_ROUTES = [
+    "[block_uuid] -> [block_uuid](str)",
+    "[is_euro] -> |*s1|IF($this IN $$mv.is_euro): *get(True) ELSE: *get(False)| -> [is_euro](bool)",
+    "[rooms] -> |*s1|IF($block_uuid == $block9Floor AND $this == \"9\" OR $this == None): *get(0)| -> [rooms](str)",
+    "[] -> |*get(\"Свободна\")| -> [status](str)",
+    "[section] -> |*s1|IF($this == None): *get(\"Нет секции\")| -> [section_name](str)",
+    "[price_sale] -> |*s1| -> [$price_sale](int)",
+    "[price_base] -> |*s1|IF($price_sale != None OR $price_sale != \"0\"): *get($price_sale)| -> [price](int)",
+    "[type] -> |*get_tag_by_type($this)| -> [tags](str)",
+    "[area_total] -> [area_total](float)",
+    "[area_given] -> [area_given](float)",
+    "[area_kitchen] -> [area_kitchen](float)",
+    "[number] -> |IF($this == None): *get(\"-\")| -> [number](str)",
+    "[windows] -> [windows](str)",
+    "[window_view] -> [window_view](str)",
+    "[view_places] -> [view_places](str)",
+    "[floor] -> |*s1|IF($this == None): *get(0)| -> [floor_of_flat](int)",
+    "[floors_in_section] -> [floors_in_section](int)",
+    "[comment] -> [comment](str)",
+    "[plan_url] -> [plan_url](str)",
+    "[floor_plan_url] -> [floor_plan_url](str)",
+    "[finising] -> |*get_finishing($this)| -> [finishing](str)",
+    "[] -> |*get_flats_type_uuid($block_uuid, $rooms, $tags)| -> [flats_type_uuid](str)",
+    "[building_uuid] -> [building_uuid](str)",
+    "[] -> |*get_uuid_real_estate_type($tags)| -> [uuid_real_estate_type](str)",
+]
+SKIP_ROUTE = "[uuid] -> |IF($this == None): SKIP(\"Нет uuid\")| -> [flats_uuid](str)"
+
+MIXES = {
+    "direct": DIRECT_ROUTES,
+    "funcs": FUNC_ROUTES,
+    "if_heavy": IF_ROUTES,
+    "flats": FLATS_ROUTES,
+}
+
+
+@dataclass
+class FeedShape:
+    """Параметры синтетической ленты и программы"""
+    records: int = 10000
+    mix: str = "flats"
+    skip_rate: float = 0.05
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"records={self.records} mix={self.mix} skip={self.skip_rate}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def iter_records(shape: FeedShape) -> Iterator[Dict[str, Any]]:
+    """Отдает записи ленты по одной"""
+    rng = random.Random(shape.seed)
+    for index in range(shape.records):
+        area = round(rng.uniform(20, 140), 1)
+        floors = rng.randint(5, 30)
+        price = str(rng.randrange(3_000_000, 30_000_000, 1000))
+        yield {
+            "block_uuid": rng.choice(BLOCKS),
+            "is_euro": rng.choice(EURO),
+            "rooms": rng.choice(ROOMS),
+            "section": rng.choice(["1", "2", "3", None]),
+            "price_sale": rng.choice([price, price, "0", None]),
+            "price_base": price,
+            "type": rng.choice(TYPES),
+            "area_total": area,
+            "area_given": round(area * 0.95, 1),
+            "area_kitchen": round(area * 0.2, 1),
+            "number": rng.choice([str(index), str(index), None]),
+            "windows": rng.choice(["2", "3", "4"]),
+            "window_view": rng.choice(VIEWS),
+            "view_places": rng.choice(VIEWS),
+            "floor": rng.choice([str(rng.randint(1, floors)), None]),
+            "floors_in_section": floors,
+            "comment": rng.choice(["", "Угловая", "С террасой", None]),
+            "plan_url": f"https://example.com/plans/{index}.png",
+            "floor_plan_url": f"https://example.com/floors/{index % 100}.png",
+            "finising": rng.choice(FINISHING),
+            "uuid": None if rng.random() < shape.skip_rate else f"00000000-0000-4000-8000-{index:012d}",
+            "building_uuid": rng.choice(BLOCKS),
+        }
+
+
+def generate_records(shape: FeedShape) -> List[Dict[str, Any]]:
+    """Возвращает записи ленты списком (источник dict)"""
+    return list(iter_records(shape))
+
+
+def iter_dsl_lines(mix: str, target: str = "dict/flats") -> Iterator[str]:
+    """Отдает строки программы для набора маршрутов и таргета ("тип/имя")"""
+    yield "lang=py"
+    yield "source=dict/feed"
+    yield f"norm={target}"
+    yield "$block9Floor=f49f5e6b-67f1-4596-a4f8-5f27f1f5f457"
+    yield "norm:"
+    for route in MIXES[mix]:
+        yield f"    {route}"
+    yield f"    {SKIP_ROUTE}"
+
+
+def generate_dsl(mix: str, target: str = "dict/flats") -> str:
+    """Возвращает текст программы"""
+    return "\n".join(iter_dsl_lines(mix, target)) + "\n"
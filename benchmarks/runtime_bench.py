@@ -0,0 +1,454 @@
+"""
+Бенчмарк исполнителя: DtrtRunner и PipelineExecutor на синтетической ленте
+квартир (benchmarks.flats_generator) без внешних сервисов.
+
+Запуск (из корня репозитория):
+    PYTHONPATH=src python -m benchmarks.runtime_bench -o runtime.json
+    PYTHONPATH=src python -m benchmarks.runtime_bench --baseline benchmarks/runtime_baseline.json
+    PYTHONPATH=src python -m benchmarks.runtime_bench --save-baseline benchmarks/runtime_baseline.json
+
+Каждая серия меняет один параметр запуска: число записей, набор маршрутов
+(прямые копии, цепочки *функций, условия IF, все маршруты t/1.py), долю
+пропускаемых записей и приемник. Приемники: memory (таргет dict),
+postgres (PgTargetWriter с поддельным пулом asyncpg в памяти) и jsonl
+(файл во временной папке). Для каждого случая измеряются записи в секунду
+и задержка на запись по стадиям read, transform и write: обработка
+таргета — по каждой записи, чтение и запись — время пачки, деленное на
+число ее записей (в выборку перцентилей попадает одно значение на пачку).
+
+Пиковая память запуска измеряется отдельным прогоном под tracemalloc
+(он медленнее, поэтому не входит в замеры времени): строки таргетов
+накапливаются до стадии записи, и пик растет линейно с числом записей —
+серия records показывает, сколько байт приходится на одну запись.
+"""
+
+from typing import Dict, Any, List, Optional
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.metrics.profiler import StepTimer
+from src.generator.python.pipeline.pipeline_executor import PipelineExecutor
+from src.generator.python.resources.pool_manager import PoolManager
+
+from benchmarks.flats_generator import FUNCS_FOLDER, VARS_FOLDER, MIXES, FeedShape, generate_dsl, generate_records
+
+
+SINKS = ("memory", "postgres", "jsonl")
+
+# Серии: параметр и его значения; остальные параметры — из базового случая
+SERIES = {
+    "records": [1000, 10000, 100000],
+    "mix": list(MIXES),
+    "skip_rate": [0.0, 0.2, 0.5],
+    "sink": list(SINKS),
+}
+BASE_CASE = {"records": 2000, "mix": "flats", "skip_rate": 0.05, "sink": "memory"}
+
+# Типы столбцов таблицы поддельного пула по типам итоговых полей
+PG_TYPES = {"int": "int8", "float": "float8", "bool": "bool", "str": "text"}
+
+SAMPLE_SIZE = 100000
+
+
+class FakeConnection:
+    """Соединение asyncpg в памяти: отдает столбцы таблицы и считает записанные строки"""
+
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+
+    async def execute(self, query: str, *args) -> None:
+        pass
+
+    async def fetch(self, query: str, *args) -> List[Dict[str, str]]:
+        return [{"column_name": name, "udt_name": udt_name} for name, udt_name in self.pool.columns.items()]
+
+    def transaction(self) -> "FakeConnection":
+        return self
+
+    async def __aenter__(self) -> "FakeConnection":
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        return False
+
+    async def copy_records_to_table(self, table: str, records: Any, columns: Any, schema_name: str) -> None:
+        self.pool.rows += sum(1 for _ in records)
+
+    async def executemany(self, query: str, records: Any) -> None:
+        self.pool.rows += sum(1 for _ in records)
+
+
+class FakePool:
+    """Пул asyncpg в памяти (одно соединение на всех)"""
+
+    def __init__(self, columns: Dict[str, str]):
+        self.columns = columns
+        self.rows = 0
+        self.connection = FakeConnection(self)
+
+    @contextlib.asynccontextmanager
+    async def _acquire(self):
+        await asyncio.sleep(0)
+        yield self.connection
+
+    def acquire(self):
+        return self._acquire()
+
+    def get_size(self) -> int:
+        return 1
+
+    def get_idle_size(self) -> int:
+        return 1
+
+    def get_min_size(self) -> int:
+        return 1
+
+    def get_max_size(self) -> int:
+        return 1
+
+    async def close(self) -> None:
+        pass
+
+
+class LatencyRecorder:
+    """Задержка на запись по стадиям: выборка для перцентилей, суммарное время и число записей"""
+
+    def __init__(self, sample_size: int = SAMPLE_SIZE, seed: int = 0):
+        self.sample_size = sample_size
+        self.rng = random.Random(seed)
+        self.timers: Dict[str, StepTimer] = {}
+        self.records: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float, records: int = 1) -> None:
+        """Учитывает обработку records записей за seconds (в выборку — время на одну запись)"""
+        timer = self.timers.get(stage)
+        if timer is None:
+            timer = self.timers[stage] = StepTimer(self.sample_size, self.rng)
+        timer.add(seconds / records)
+        self.records[stage] = self.records.get(stage, 0) + records
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage: {
+                "records": self.records[stage],
+                "seconds": self.seconds[stage],
+                "p50": timer.percentile(0.5),
+                "p99": timer.percentile(0.99),
+            }
+            for stage, timer in self.timers.items()
+        }
+
+
+class TimedExecutor(PipelineExecutor):
+    """Исполнитель, замеряющий обработку каждой записи (в программах бенчмарка один таргет)"""
+
+    def __init__(self, recorder: LatencyRecorder, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorder = recorder
+
+    async def _process_record(self, record, target_config, pipeline_builder):
+        started = time.perf_counter()
+        try:
+            return await super()._process_record(record, target_config, pipeline_builder)
+        finally:
+            self.recorder.add("transform", time.perf_counter() - started)
+
+
+class BenchRunner(DtrtRunner):
+    """Запуск с замером чтения пачек, обработки записей и записи таргетов"""
+
+    def __init__(self, *args, recorder: LatencyRecorder, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorder = recorder
+        self.executor_class = lambda *executor_args: TimedExecutor(recorder, *executor_args)
+
+    async def _iter_source(self, source_getter):
+        batches = super()._iter_source(source_getter)
+        while True:
+            started = time.perf_counter()
+            try:
+                batch = await batches.__anext__()
+            except StopAsyncIteration:
+                return
+            if batch:
+                self.recorder.add("read", time.perf_counter() - started, len(batch))
+            yield batch
+
+    async def _init_targets(self) -> None:
+        await super()._init_targets()
+        for target_writer in self.target_writers.values():
+            target_writer.write = self._timed_write(target_writer.write)
+
+    def _timed_write(self, write):
+        async def timed(warehouse):
+            started = time.perf_counter()
+            try:
+                return await write(warehouse)
+            finally:
+                if warehouse:
+                    self.recorder.add("write", time.perf_counter() - started, len(warehouse))
+        return timed
+
+
+def _sink_target(sink: str, folder: str) -> str:
+    if sink == "memory":
+        return "dict/flats"
+    if sink == "postgres":
+        return "postgres/bench.flats"
+    if sink == "jsonl":
+        return f"jsonl/{os.path.join(folder, 'flats.jsonl')}"
+    raise ValueError(f"Неизвестный приемник: {sink}")
+
+
+def compile_case(mix: str, sink: str, folder: str) -> Dict[str, Any]:
+    """Компилирует программу набора маршрутов для приемника"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return DataRoute(
+            generate_dsl(mix, _sink_target(sink, folder)), vars_folder=VARS_FOLDER, func_folder=FUNCS_FOLDER
+        ).compile_ic()
+
+
+async def _run_once(
+    ic: Dict[str, Any],
+    records: List[Dict[str, Any]],
+    sink: str,
+    batch_size: int,
+    recorder: LatencyRecorder
+) -> Dict[str, Any]:
+    runner = BenchRunner(
+        ic, FUNCS_FOLDER, source_data=records, source_config={"batch_size": batch_size}, recorder=recorder
+    )
+    pool = None
+    if sink == "postgres":
+        columns = {
+            route["final_name"]: PG_TYPES.get(route.get("final_type"), "text")
+            for target_key in runner.targets
+            for route in ic[target_key]["routes"].values()
+            if route.get("final_name") and not route["final_name"].startswith("$")
+        }
+        pool = FakePool(columns)
+        runner.pool_manager.pools[PoolManager.pool_key(runner.db_config)] = pool
+
+    started = time.perf_counter()
+    result = await runner.run()
+    seconds = time.perf_counter() - started
+    written = sum(result["results"].values())
+    return {"seconds": seconds, "written": written, "sink_rows": pool.rows if pool else written}
+
+
+def _peak_memory(ic: Dict[str, Any], records: List[Dict[str, Any]], sink: str, batch_size: int) -> int:
+    """Возвращает пик памяти, выделенной за запуск (tracemalloc), в байтах"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        asyncio.run(_run_once(ic, records, sink, batch_size, LatencyRecorder()))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(
+    shape: FeedShape,
+    sink: str = "memory",
+    batch_size: int = 1000,
+    repeat: int = 3,
+    memory: bool = True
+) -> Dict[str, Any]:
+    """
+    Измеряет один случай: время запуска за repeat прогонов, записи в секунду
+    и задержку на запись по стадиям (по самому быстрому прогону); с memory —
+    пик памяти запуска отдельным прогоном.
+    """
+    records = generate_records(shape)
+    runs = []
+    peak = None
+    with tempfile.TemporaryDirectory() as folder:
+        ic = compile_case(shape.mix, sink, folder)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(repeat):
+                gc.collect()
+                recorder = LatencyRecorder(seed=shape.seed)
+                run = asyncio.run(_run_once(ic, records, sink, batch_size, recorder))
+                run["stages"] = recorder.report()
+                runs.append(run)
+            if memory:
+                peak = _peak_memory(ic, records, sink, batch_size)
+
+    best = min(runs, key=lambda run: run["seconds"])
+    seconds = [run["seconds"] for run in runs]
+    case = {
+        "name": f"{shape.name} sink={sink}",
+        "shape": shape.to_dict(),
+        "sink": sink,
+        "batch_size": batch_size,
+        "records": shape.records,
+        "written": best["written"],
+        "sink_rows": best["sink_rows"],
+        "seconds": {"median": statistics.median(seconds), "min": min(seconds)},
+        "records_per_second": {
+            "median": shape.records / statistics.median(seconds),
+            "max": shape.records / min(seconds),
+        },
+        "stages": best["stages"],
+    }
+    if peak is not None:
+        case["memory"] = {"peak_bytes": peak, "bytes_per_record": peak / shape.records if shape.records else None}
+    return case
+
+
+def run_suite(
+    series: Optional[List[str]] = None,
+    max_records: Optional[int] = None,
+    batch_size: int = 1000,
+    repeat: int = 3,
+    budget: float = 60.0,
+    log=None,
+    memory: bool = True
+) -> Dict[str, Any]:
+    """
+    Выполняет серии бенчмарка.
+
+    Args:
+        series: Имена серий из SERIES (по умолчанию все)
+        max_records: Ограничение числа записей в серии records
+        batch_size: Размер пачки источника
+        repeat: Сколько раз запускать каждый случай
+        budget: Случаи серии, оценка времени которых больше budget секунд, пропускаются
+        log: Функция для вывода прогресса
+        memory: Измерять пик памяти каждого случая
+    """
+    log = log or (lambda message: None)
+    cases = []
+    for name in series or list(SERIES):
+        over_budget = False
+        previous = None
+        for value in SERIES[name]:
+            if name == "records" and max_records and value > max_records:
+                continue
+            params = {**BASE_CASE, name: value}
+            sink = params.pop("sink")
+            shape = FeedShape(**params)
+            case_name = f"{shape.name} sink={sink}"
+            if previous is not None and not over_budget:
+                # Оценка: время растет пропорционально числу записей
+                seconds, previous_value = previous
+                estimate = seconds * value / previous_value if name == "records" else seconds
+                over_budget = estimate * repeat > budget
+            if over_budget:
+                cases.append({"name": case_name, "series": name, "shape": shape.to_dict(), "sink": sink, "skipped": "budget"})
+                log(f"{case_name}: пропущен (оценка времени больше {budget} с)")
+                continue
+            case = {**run_case(shape, sink, batch_size, repeat, memory), "series": name}
+            cases.append(case)
+            previous = (case["seconds"]["median"], value)
+            peak = f", пик памяти {case['memory']['peak_bytes'] / 2 ** 20:.1f} МиБ" if "memory" in case else ""
+            log(f"{case_name}: {case['records_per_second']['max']:.0f} записей/с{peak}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "batch_size": batch_size,
+            "memory": memory,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "cases": cases,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    Сравнивает пропускную способность с базовой по лучшему прогону.
+
+    Args:
+        current: Результаты run_suite
+        baseline: Сохраненные результаты run_suite
+        tolerance: Допустимое относительное падение записей в секунду
+
+    Returns:
+        Список регрессий: случай, базовые и текущие записи в секунду
+        (current None — случай, измеренный в базовых результатах, теперь пропущен)
+    """
+    baseline_cases = {case["name"]: case for case in baseline.get("cases", []) if "records_per_second" in case}
+    regressions = []
+    for case in current.get("cases", []):
+        base = baseline_cases.get(case["name"])
+        if base is None:
+            continue
+        before = base["records_per_second"]["max"]
+        after = case["records_per_second"]["max"] if "records_per_second" in case else None
+        if after is None or after * (1 + tolerance) < before:
+            regressions.append({
+                "case": case["name"], "baseline": before, "current": after,
+                "ratio": after / before if after is not None else None,
+            })
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Бенчмарк исполнителя Data Route")
+    parser.add_argument('-s', '--series', action='append', choices=list(SERIES), help='Серия (можно несколько)')
+    parser.add_argument('--max-records', type=int, help='Максимальное число записей в серии records')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Размер пачки источника')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Запусков каждого случая')
+    parser.add_argument('--budget', type=float, default=60.0, help='Порог времени случая для пропуска больших, с')
+    parser.add_argument('-o', '--output', help='Файл для JSON с результатами (по умолчанию stdout)')
+    parser.add_argument('-b', '--baseline', help='JSON с базовыми результатами для сравнения')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25, help='Допустимое падение записей в секунду (доля)')
+    parser.add_argument('--save-baseline', help='Сохранить результаты как базовые в файл')
+    parser.add_argument('--no-memory', action='store_true', help='Не измерять пик памяти (прогон под tracemalloc)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    results = run_suite(
+        args.series, args.max_records, args.batch_size, args.repeat, args.budget,
+        log=lambda message: print(message, file=sys.stderr), memory=not args.no_memory
+    )
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for item in regressions:
+            if item["current"] is None:
+                change = "случай пропущен по бюджету времени"
+            else:
+                change = f"{item['current']:.0f} записей/с (x{item['ratio']:.2f})"
+            print(f"Регрессия: {item['case']} {item['baseline']:.0f} записей/с -> {change}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("Регрессий нет", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -117,6 +117,7 @@ class TargetNode(ASTNode):
     target_type: str
     value: str
     node_type: NodeType = NodeType.TARGET
+    keys: List[str] = field(default_factory=list)
     
     def accept(self, visitor):
         return visitor.visit_target(self)
@@ -64,6 +64,7 @@ class ErrorType(Enum):
     INVALID_TYPE = auto()          # Неверный тип данных
     DUPLICATE_FINAL_NAME = auto()  # Дублирующееся имя финальной цели
     DUPLICATE_TARGET_NAME_TYPE = auto()  # Дублирующееся type/name для цели
+    UNKNOWN_TARGET_KEY = auto()    # Ключевое поле цели не записывается маршрутами
     CONDITION_MISSING_IF = auto()  # В выражении может быть только if, но не может быть else без if
     CONDITION_MISSING_PARENTHESIS = auto()  # Условная конструкция должна содержать знак скобок
     CONDITION_EMPTY_EXPRESSION = auto()  # Не найдено логическое выражение внутри условной конструкции
@@ -104,6 +105,7 @@ ERROR_MESSAGE_MAP = {
     ErrorType.INVALID_TYPE: M.Error.INVALID_TYPE,
     ErrorType.DUPLICATE_FINAL_NAME: M.Error.DUPLICATE_FINAL_NAME,
     ErrorType.DUPLICATE_TARGET_NAME_TYPE: M.Error.DUPLICATE_TARGET_NAME_TYPE,
+    ErrorType.UNKNOWN_TARGET_KEY: M.Error.UNKNOWN_TARGET_KEY,
     ErrorType.CONDITION_MISSING_IF: M.Error.CONDITION_MISSING_IF,
     ErrorType.CONDITION_MISSING_PARENTHESIS: M.Error.CONDITION_MISSING_PARENTHESIS,
     ErrorType.CONDITION_EMPTY_EXPRESSION: M.Error.CONDITION_EMPTY_EXPRESSION,
@@ -137,6 +139,7 @@ ERROR_HINT_MAP = {
     ErrorType.INVALID_TYPE: M.Hint.INVALID_TYPE,
     ErrorType.DUPLICATE_FINAL_NAME: M.Hint.DUPLICATE_FINAL_NAME,
     ErrorType.DUPLICATE_TARGET_NAME_TYPE: M.Hint.DUPLICATE_TARGET_NAME_TYPE,
+    ErrorType.UNKNOWN_TARGET_KEY: M.Hint.UNKNOWN_TARGET_KEY,
     ErrorType.CONDITION_MISSING_IF: M.Hint.CONDITION_MISSING_IF,
     ErrorType.CONDITION_MISSING_PARENTHESIS: M.Hint.CONDITION_MISSING_PARENTHESIS,
     ErrorType.CONDITION_EMPTY_EXPRESSION: M.Hint.CONDITION_EMPTY_EXPRESSION,
@@ -159,8 +162,8 @@ PATTERNS = {
     # Определение источника: source=тип/путь
     TokenType.SOURCE: r'source\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\/([^\s]+)$',
     
-    # Определение цели: target1=тип/имя_или_путь
-    TokenType.TARGET: r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\/([^\s]+)$',
+    # Определение цели: target1=тип/имя_или_путь, необязательно с ключами: target1=тип/имя[id, uuid]
+    TokenType.TARGET: r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\/([^\s\[]+)(?:\s*\[([a-zA-Z0-9_,\s]*)\])?$',
     
     # Заголовок маршрута: target1:
     TokenType.ROUTE_HEADER: r'([a-zA-Z_][a-zA-Z0-9_]*)\s*:',
@@ -172,7 +175,8 @@ PATTERNS = {
     TokenType.COMMENT: r'#(.*)',
     
     # Строка маршрута с отступом: [id] -> |*s1| -> [external_id](str))
-    TokenType.ROUTE_LINE: r'^\s*\[([a-zA-Z0-9_.]*)\]\s*(?:->|=>|-|>|>>)\s*(?:(\|[^|]*(?:\|[^|]*)*\|)\s*(?:->|=>|-|>|>>)\s*)?\[([$a-zA-Z0-9_.]*)\](?:\(([a-zA-Z0-9_]+)\))?',
+    # Пайплайн — от первой до последней черты, после которой идет направление и [поле]
+    TokenType.ROUTE_LINE: r'^\s*\[([a-zA-Z0-9_.]*)\]\s*(?:->|=>|-|>|>>)\s*(?:(\|.*\|)\s*(?:->|=>|-|>|>>)\s*)?\[([$a-zA-Z0-9_.]*)\](?:\(([a-zA-Z0-9_]+)\))?',
     
     # Использование глобальной переменной в маршруте: [$my_var] -> [A](int)
     TokenType.GLOBAL_VAR_USAGE: r'^\s*\[\$([a-zA-Z][a-zA-Z0-9_]*)\]\s*(?:->|=>|-|>|>>).*',
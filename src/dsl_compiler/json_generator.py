@@ -225,6 +225,9 @@ class JSONGenerator(ASTVisitor):
                     "target_type": target_node.target_type,
                     "routes": {}
                 }
+                # Ключевые поля из строки цели (target1=тип/имя[id]) включают режим upsert
+                if target_node.keys:
+                    self.result[type_name_key]["target_keys"] = target_node.keys
             self.current_target = type_name_key
         else:
             self.current_target = target_name
@@ -250,6 +253,9 @@ class JSONGenerator(ASTVisitor):
         deps = self._route_dependencies.get(self.current_target, {})
         plan = self._build_execution_plan(routes, deps, route_order)
         self.result[self.current_target]["execution_plan"] = plan
+        skip_predicates = self._collect_skip_predicates(routes)
+        if skip_predicates:
+            self.result[self.current_target]["skip_predicates"] = skip_predicates
     
     def visit_route_line(self, node):
         """Обход строки маршрута"""
@@ -646,6 +652,26 @@ class JSONGenerator(ASTVisitor):
         deps.discard('this')
         return sorted(deps)
 
+    def _collect_skip_predicates(self, routes):
+        """Собирает условия пропуска записей для проталкивания в источник: маршруты,
+        пайплайн которых начинается с безусловного IF(...): SKIP(...) только по $this."""
+        predicates = []
+        for route_key, route_data in routes.items():
+            if route_key.startswith("__void"):
+                continue
+            for route in route_data if isinstance(route_data, list) else [route_data]:
+                first_step = (route.get("pipeline") or {}).get("1", {})
+                if first_step.get("type") != PipelineItemType.CONDITION.value or first_step.get("sub_type") != "if":
+                    continue
+                exp = first_step["if"].get("exp", {})
+                do = first_step["if"].get("do", {})
+                if exp.get("type") != "cond_exp" or do.get("type") != PipelineItemType.EVENT.value or do.get("sub_type") != "SKIP":
+                    continue
+                if re.search(r'\$(?!this\b)', exp.get("full_str", "")):
+                    continue
+                predicates.append({"field": route_key, "exp": exp["full_str"]})
+        return predicates
+
     def _build_execution_plan(self, routes, deps, order):
         """Строит execution_plan (batch-уровни) по depends_on для всех routes (без циклов), с сохранением порядка из DSL."""
         all_keys = list(routes.keys())
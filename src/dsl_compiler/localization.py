@@ -201,6 +201,10 @@ class Messages:
             "ru": ">R<Дублирующееся имя цели:>RS< {target_type}",
             "en": ">R<Duplicate target name:>RS< {target_type}"
         }
+        UNKNOWN_TARGET_KEY = {
+            "ru": ">R<Ключевое поле цели не записывается маршрутами:>RS< {key}",
+            "en": ">R<Target key field is not written by routes:>RS< {key}"
+        }
         FUNC_NOT_FOUND = {
             "ru": ">R<Функция не найдена:>RS< {func_name}",
             "en": ">R<Function not found:>RS< {func_name}"
@@ -399,6 +403,10 @@ class Messages:
             "ru": "Используйте уникальные имена целей для разных типов",
             "en": "Use unique target names for different types"
         }
+        UNKNOWN_TARGET_KEY = {
+            "ru": "Ключи в target=тип/имя[...] должны быть итоговыми полями маршрутов этой цели (без $)",
+            "en": "Keys in target=type/name[...] must be final fields of this target's routes (without $)"
+        }
         FUNC_NOT_FOUND = {
             "ru": "Проверьте имя функции и наличие файла с именем {func_name} в указанной вами папке: >Y<{func_folder}>RS<",
             "en": "Check the function name and the presence of a file named {func_name} in the specified folder: >Y<{func_folder}>RS<"
@@ -60,7 +60,8 @@ class Parser:
                 target_node = TargetNode(
                     token.value['name'],
                     {"type": token.value['type'], "name": token.value['value']},
-                    token.value['value']
+                    token.value['value'],
+                    keys=token.value.get('keys', [])
                 )
                 # Проверка дубликата по type/name
                 type_name_key = f"{token.value['type']}/{token.value['value']}"
@@ -78,6 +79,9 @@ class Parser:
                         target_type=type_name_key
                     )
                 type_name_keys.add(type_name_key)
+                # Строка цели нужна для сообщения о неизвестном ключевом поле
+                keys_part = f"[{', '.join(target_node.keys)}]" if target_node.keys else ""
+                target_node.set_position_info(f"{token.value['name']}={type_name_key}{keys_part}", token.position, 0)
                 self.ast.children.append(target_node)
                 if not hasattr(self.ast, '_targets'):
                     self.ast._targets = {}
@@ -168,6 +172,8 @@ class Parser:
                         final_names.add(norm_name)
                     routes.append(route_line)
                     self.position += 1
+                # Ключевые поля цели должны записываться маршрутами ее блока
+                self._check_target_keys(self.ast._targets[target_name], routes)
                 # Создаем блок маршрутов и добавляем в AST
                 route_block = RouteBlockNode(target_name, routes)
                 self.ast.children.append(route_block)
@@ -190,6 +196,25 @@ class Parser:
             )
         return self.ast
     
+    def _check_target_keys(self, target_node: TargetNode, routes: List[RouteLineNode]) -> None:
+        """Проверяет, что ключевые поля цели (target1=тип/имя[id]) есть среди итоговых полей маршрутов"""
+        final_names = {
+            route.target_field.name for route in routes
+            if route.target_field and route.target_field.name and not route.target_field.name.startswith("$")
+        }
+        for key in target_node.keys:
+            if key not in final_names:
+                from .errors import DSLSyntaxError
+                from .constants import ErrorType
+                raise DSLSyntaxError(
+                    ErrorType.UNKNOWN_TARGET_KEY,
+                    target_node.source_line,
+                    target_node.line_num,
+                    target_node.source_line.find(key, target_node.source_line.find("[")),
+                    None,
+                    key=key
+                )
+    
     def _parse_source(self) -> SourceNode:
         """Создает узел источника данных"""
         token = self.tokens[self.position]
@@ -204,7 +229,8 @@ class Parser:
         return TargetNode(
             token.value['name'],
             token.value['type'],
-            token.value['value']
+            token.value['value'],
+            keys=token.value.get('keys', [])
         )
     
     def _parse_route_line(self, token):
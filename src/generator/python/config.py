@@ -2,23 +2,36 @@ from typing import Dict, Type
 
 # Импорты источников данных
 from src.generator.python.source_getters.pydict_source_getter import PydictSourceGetter
+from src.generator.python.source_getters.sqlite_source_getter import SqliteSourceGetter
+from src.generator.python.source_getters.pg_source_getter import PgSourceGetter
 
 # Импорты целевых хранилищ 
 from src.generator.python.target_writers.pg_target_writer import PgTargetWriter
+from src.generator.python.target_writers.jsonl_target_writer import JsonlTargetWriter
+from src.generator.python.target_writers.csv_target_writer import CsvTargetWriter
+from src.generator.python.target_writers.dict_target_writer import DictTargetWriter
+from src.generator.python.target_writers.sqlite_target_writer import SqliteTargetWriter
 
 # Маппинг типов источников на соответствующие классы
 SOURCE_TYPE_MAPPING: Dict[str, Type] = {
     "dict": PydictSourceGetter,
+    "sqlite": SqliteSourceGetter,
+    "postgres": PgSourceGetter,
 }
 
 # Маппинг типов целевых хранилищ на соответствующие классы
 TARGET_TYPE_MAPPING: Dict[str, Type] = {
     "postgres": PgTargetWriter,
+    "jsonl": JsonlTargetWriter,
+    "csv": CsvTargetWriter,
+    "dict": DictTargetWriter,
+    "sqlite": SqliteTargetWriter,
 }
 
 # Маппинг типов нотификаторов
 NOTIFIER_TYPE_MAPPING: Dict[str, str] = {
     "console": "src.generator.python.notifiers.console_notifier",
+    "aggregated": "src.generator.python.notifiers.aggregated_notifier",
 }
 
 # Стандартные функции
@@ -2,16 +2,47 @@ import os
 import sys
 import json
 import importlib
+import inspect
 import asyncio
-from typing import Dict, List, Any, Optional, Union
+import sqlite3
+import time
+from typing import Dict, List, Any, Optional, Union, AsyncIterator, Tuple, Set
 from copy import deepcopy
 
+import asyncpg
+
 from src.generator.python.config import SOURCE_TYPE_MAPPING, TARGET_TYPE_MAPPING, NOTIFIER_TYPE_MAPPING, STD_FUNCTIONS_PATH
 from src.generator.python.exeptions import (
     ETLException, SourceValidationError, TargetValidationError, 
     ConfigurationError, TargetWriteError
 )
+from src.generator.python.metrics.run_hooks import RunHooks
 from src.generator.python.pipeline.pipeline_executor import PipelineExecutor
+from src.generator.python.resources.batch_controller import ADAPTIVE_OPTIONS, BatchSizeController
+from src.generator.python.resources.pool_manager import PoolManager, RunContext
+from src.generator.python.source_getters.prefetch_getter import PrefetchGetter
+from src.generator.python.source_getters.skip_predicate import SkipPredicate
+from src.generator.python.state.change_detector import ChangeDetector
+from src.generator.python.state.bloom_filter import BloomFilter
+from src.generator.python.state.checkpoint_store import open_checkpoint_store
+from src.generator.python.state.deduplicator import Deduplicator
+from src.generator.python.state.hash_store import open_hash_store
+from src.generator.python.state.spilling_hash_set import SpillingHashSet
+from src.generator.python.target_writers.dict_target_writer import DictTargetWriter
+
+
+# Ошибки подключения к целевому хранилищу при проверке его схемы
+SCHEMA_CHECK_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresError,
+    asyncpg.InterfaceError,
+    asyncpg.exceptions._base.InternalClientError,
+    sqlite3.Error,
+)
+
+# Ошибки создания и открытия getter'а источника: неверные параметры или недоступная база
+SOURCE_OPEN_ERRORS = (ValueError, TypeError) + SCHEMA_CHECK_ERRORS
 
 
 class DtrtRunner:
@@ -19,13 +50,23 @@ class DtrtRunner:
     Основной класс для выполнения ETL процесса на основе JSON-конфигурации.
     """
     
+    # Исполнитель пайплайнов (подкласс может замерять обработку записей, см. benchmarks)
+    executor_class = PipelineExecutor
+    
     def __init__(
         self,
         config: Dict[str, Any],
         user_functions_path: Optional[str] = None,
         notifier_type: str = "console",
         source_data: Optional[List[Dict[str, Any]]] = None,
-        db_config: Optional[Dict[str, Any]] = None
+        db_config: Optional[Dict[str, Any]] = None,
+        source_config: Optional[Dict[str, Any]] = None,
+        watermark: Optional[Dict[str, Any]] = None,
+        target_config: Optional[Dict[str, Any]] = None,
+        write_config: Optional[Dict[str, Any]] = None,
+        metrics_config: Optional[Dict[str, Any]] = None,
+        profile: Union[bool, Dict[str, Any]] = False,
+        memory_profile: Union[bool, Dict[str, Any]] = False
     ):
         """
         Инициализирует исполнитель ETL процесса.
@@ -36,16 +77,63 @@ class DtrtRunner:
             notifier_type: Тип нотификатора (по умолчанию "console")
             source_data: Исходные данные для обработки (опционально)
             db_config: Конфигурация подключения к БД (опционально)
+            source_config: Параметры getter'а источника, например batch_size (опционально);
+                prefetch_depth и prefetch_bytes включают упреждающее чтение пачек;
+                adaptive_batch включает адаптивный размер пачки (границы min_batch_size,
+                max_batch_size, бюджет memory_budget в байтах, target_latency в секундах)
+            watermark: Инкрементальное чтение (опционально): {"field": "updated_at",
+                "state_path": ".dtrt_state.json", "key": "..."}; state_path с расширением
+                .db/.sqlite хранит контрольные точки в SQLite
+            target_config: Параметры writer'ов, например batch_size (опционально);
+                вложенный словарь по ключу таргета переопределяет их для этого таргета;
+                adaptive_batch и его границы — как в source_config (postgres, sqlite);
+                skip_validation отключает проверку строк postgres по типам из DSL
+            write_config: Параметры записи таргетов (опционально): concurrency — сколько
+                таргетов пишется одновременно, all_or_nothing — фиксировать все таргеты
+                или ни одного (таргеты SQLite — в разных файлах); change_state — файл хэшей строк (.db — SQLite, иначе dbm):
+                таргеты с ключами (из DSL или change_keys {таргет: [поля]}) получают
+                только новые и изменившиеся строки, таблицы обновляются по этим ключам; dedup — отбрасывание повторов по ключам
+                таргета (из DSL или dedup_keys): "exact" (точно, с вытеснением на диск) или
+                "bloom" (фильтр Блума, dedup_error_rate и dedup_capacity), память ограничена
+                dedup_memory байт на все таргеты
+            metrics_config: Метрики запуска (опционально): счетчики шагов, событий и замен
+                при приведении типов, гистограммы длительности шагов и стадий; path —
+                папка для metrics.json и metrics.prom, buckets — границы корзин в секундах
+            profile: Профилирование запуска (EXPLAIN ANALYZE): True или параметры —
+                pstats (файл статистики cProfile), collapsed (файл collapsed stacks для
+                flame graph), sample_size (выборка длительностей шага для p99)
+            memory_profile: Учет памяти по стадиям через tracemalloc: True или параметры —
+                path (JSON-файл отчета), top (число мест выделения на стадию, 0 — без
+                снимков), frames (глубина трассировки), snapshot_calls (для скольких
+                первых вызовов стадии снимать места выделения, по умолчанию 1, None —
+                для всех); стадии — инициализация и чтение
+                источника, обработка каждого таргета, запись каждого таргета (таргеты
+                пишутся по одному, упреждающее чтение отключается)
         """
         self.config = config
         self.user_functions_path = user_functions_path
         self.notifier_type = notifier_type
         self.source_data = source_data
         self.db_config = db_config or {}
+        self.source_config = source_config or {}
+        self.watermark = watermark or {}
+        self.target_config = target_config or {}
+        self.write_config = write_config or {}
+        # Один пул соединений на базу для getter'а, writer'ов и пользовательских функций
+        self.pool_manager = PoolManager()
+        # Адаптивные размеры пачек: источника и writer'ов по ключу таргета
+        self.source_controller = None
+        self.batch_controllers = {}
+        self.change_stats = {}
+        self.deduplicators = {}
+        self._watermark_value = None
         
         # Инициализируем нотификатор
         self.notifier = self._init_notifier()
         
+        # Метрики, профиль и учет памяти запуска
+        self.hooks = RunHooks(self.notifier, metrics_config, profile, memory_profile)
+        
         # Анализируем конфигурацию
         self._analyze_config()
     
@@ -61,10 +149,11 @@ class DtrtRunner:
             if not notifier_module_path:
                 raise ConfigurationError("notifier", f"Неизвестный тип нотификатора: {self.notifier_type}")
             
-            module_name, class_name = notifier_module_path.rsplit(".", 1)
-            class_name = class_name.split('_')[0].capitalize() + "Notifier"
+            # Имя класса выводится из имени модуля: console_notifier -> ConsoleNotifier
+            module_name = notifier_module_path.rsplit(".", 1)[-1]
+            class_name = "".join(part.capitalize() for part in module_name.split("_"))
             
-            module = importlib.import_module(module_name)
+            module = importlib.import_module(notifier_module_path)
             notifier_class = getattr(module, class_name)
             
             return notifier_class(color=True)
@@ -81,8 +170,8 @@ class DtrtRunner:
                     print(f"[ERROR] {message}")
                 def critical(self, message):
                     print(f"[CRITICAL] {message}")
-                def event_notify(self, event_type, message=None):
-                    print(f"[EVENT: {event_type}] {message or ''}")
+                def event_notify(self, event_type, message=None, route=None):
+                    print(f"[EVENT: {event_type}]{f' [{route}]' if route else ''} {message or ''}")
             
             return SimpleNotifier()
     
@@ -132,40 +221,69 @@ class DtrtRunner:
         """
         # Логируем начало процесса
         self.notifier.info("Начало ETL процесса")
+        self.hooks.start()
         
         try:
             # Собираем необходимые поля из источника
             required_fields = self._collect_required_fields()
             
+            # Загружаем последнюю контрольную точку инкрементального чтения
+            last_watermark = self._load_watermark()
+            if self.watermark and self.watermark["field"] not in required_fields:
+                required_fields.append(self.watermark["field"])
+            
             # Инициализируем источник данных и проверяем его
             self.notifier.info("Инициализация источника данных...")
-            source_data = await self._init_source(required_fields)
+            with self.hooks.memory_stage("source init"):
+                source_getter = await self._init_source(required_fields, last_watermark)
             
             # Инициализируем целевые хранилища и проверяем их
             self.notifier.info("Инициализация целевых хранилищ...")
-            await self._init_targets()
+            try:
+                await self._init_targets()
+            except BaseException:
+                await self._close_source(source_getter)
+                raise
             
             # Выполняем пайплайны для обработки данных
             self.notifier.info("Выполнение пайплайнов...")
-            pipeline_executor = PipelineExecutor(
+            pipeline_executor = self.executor_class(
                 self.config,
                 STD_FUNCTIONS_PATH,
                 self.user_functions_path,
-                self.notifier
+                self.notifier,
+                RunContext(self.pool_manager, self.db_config, self.notifier),
+                self.hooks.metrics,
+                self.hooks.profiler,
+                self.hooks.memory_tracker
             )
-            results = await pipeline_executor.execute(source_data)
+            results = await self._execute_batches(source_getter, pipeline_executor)
             
             # Записываем результаты в целевые хранилища
             self.notifier.info("Запись результатов в целевые хранилища...")
-            await self._write_results(results)
+            self.hooks.record_target_rows(results)
+            with self.hooks.stage("write"):
+                await self._write_results(results)
+            
+            # Контрольная точка сдвигается только после успешной записи всех таргетов
+            self._save_watermark(last_watermark, pipeline_executor)
             
             # Логируем успешное завершение процесса
             self.notifier.info("ETL процесс успешно завершен")
             
-            return {
+            result = {
                 "status": "success",
                 "results": {target: len(data) for target, data in results.items()}
             }
+            if self.watermark:
+                result["watermark"] = {
+                    "field": self.watermark["field"],
+                    "previous": last_watermark,
+                    "current": self._watermark_value if self._watermark_value is not None else last_watermark
+                }
+            result.update(self._run_stats(source_getter))
+            self.hooks.report(result, self.config, self.user_functions_path)
+            return result
             
         except ETLException as e:
             # Логируем ошибку и возвращаем информацию о ней
@@ -174,6 +292,89 @@ class DtrtRunner:
                 "status": "error",
                 "error": str(e)
             }
+        finally:
+            # Отчеты о памяти и метрики записываются и для неудачного запуска
+            self.hooks.finish()
+            await self.pool_manager.close()
+            # Неблокирующий нотификатор выводит сводку и дописывает очередь сообщений
+            if hasattr(self.notifier, 'close'):
+                self.notifier.close()
+    
+    async def _execute_batches(self, source_getter: Any, pipeline_executor: Any) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Читает источник пачками и обрабатывает их пайплайнами.
+        
+        Источник читается пачками, но строки таргетов накапливаются до конца
+        чтения и пишутся одной стадией write: ошибка источника или пайплайна
+        не оставляет таргеты записанными частично. Поэтому пиковая память
+        запуска растет линейно с числом строк таргетов (O(строк)), ее
+        измеряет benchmarks.runtime_bench (раздел memory каждого случая).
+        
+        Returns:
+            Строки для записи по ключу таргета
+        """
+        results = {target_key: [] for target_key in pipeline_executor.pipeline_builders}
+        try:
+            self._init_deduplicators(list(results))
+            started = time.perf_counter()
+            async for batch in self._iter_source(source_getter):
+                fetched = time.perf_counter()
+                self._track_watermark(batch)
+                batch_results = await pipeline_executor.execute(batch)
+                for target_key, warehouse in batch_results.items():
+                    if target_key in self.deduplicators:
+                        warehouse = self.deduplicators[target_key].filter(warehouse)
+                    results[target_key].extend(warehouse)
+                finished = time.perf_counter()
+                # Время пачки — от запроса у источника до конца обработки пайплайнами
+                if self.source_controller and batch:
+                    self.source_controller.record(len(batch), finished - started, batch[0])
+                self.hooks.record_batch(len(batch), fetched - started, finished - fetched)
+                started = time.perf_counter()
+        finally:
+            await self._close_source(source_getter)
+            for deduplicator in self.deduplicators.values():
+                deduplicator.close()
+        return results
+    
+    def _run_stats(self, source_getter: Any) -> Dict[str, Any]:
+        """Собирает разделы результата о компонентах запуска: источнике, writer'ах, пулах, состоянии"""
+        stats = {}
+        if isinstance(source_getter, PrefetchGetter):
+            stats["source_timing"] = source_getter.stats
+        write_stats = {
+            target_key: target_writer.stats
+            for target_key, target_writer in self.target_writers.items()
+            if hasattr(target_writer, 'stats')
+        }
+        if write_stats:
+            stats["write_stats"] = write_stats
+        if self.pool_manager.pools:
+            stats["pools"] = self.pool_manager.stats()
+        if self.change_stats:
+            stats["change_detection"] = self.change_stats
+        if hasattr(self.notifier, 'summary'):
+            stats["events"] = self.notifier.summary()
+        if self.deduplicators:
+            stats["dedup"] = {
+                target_key: deduplicator.stats for target_key, deduplicator in self.deduplicators.items()
+            }
+        if self.source_controller or self.batch_controllers:
+            stats["batch_sizes"] = {
+                "source": self.source_controller.stats() if self.source_controller else None,
+                "targets": {
+                    target_key: controller.stats() for target_key, controller in self.batch_controllers.items()
+                }
+            }
+        # Результаты таргетов dict отдаются без копирования
+        in_memory = {
+            target_key: target_writer.rows
+            for target_key, target_writer in self.target_writers.items()
+            if isinstance(target_writer, DictTargetWriter)
+        }
+        if in_memory:
+            stats["data"] = in_memory
+        return stats
     
     def _collect_required_fields(self) -> List[str]:
         """
@@ -196,28 +397,105 @@ class DtrtRunner:
         
         return list(required_fields)
     
-    async def _init_source(self, required_fields: List[str]) -> List[Dict[str, Any]]:
+    def _watermark_key(self) -> str:
+        """Возвращает ключ контрольной точки: источник и поле водяного знака"""
+        if "key" in self.watermark:
+            return self.watermark["key"]
+        target_info = next(iter(self.targets.values()), {})
+        return f"{target_info.get('source_type')}/{target_info.get('source_name')}:{self.watermark['field']}"
+    
+    def _load_watermark(self) -> Any:
+        """
+        Загружает последнее сохраненное значение водяного знака.
+        
+        Returns:
+            Значение или None, если инкрементальное чтение не настроено или еще не запускалось
+        """
+        self._watermark_value = None
+        if not self.watermark:
+            return None
+        if not self.watermark.get("field"):
+            raise ConfigurationError("watermark", "Не указано поле водяного знака (field)")
+        
+        store = open_checkpoint_store(self.watermark.get("state_path", ".dtrt_state.json"))
+        try:
+            value = store.get(self._watermark_key())
+        finally:
+            store.close()
+        
+        if value is not None:
+            self.notifier.info(f"Инкрементальное чтение: {self.watermark['field']} > {value}")
+        return value
+    
+    def _track_watermark(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Запоминает максимальное значение водяного знака среди прочитанных записей.
+        
+        Args:
+            batch: Пачка прочитанных записей
+        """
+        if not self.watermark:
+            return
+        field = self.watermark["field"]
+        batch_max = max((record[field] for record in batch if record.get(field) is not None), default=None)
+        if batch_max is not None and (self._watermark_value is None or batch_max > self._watermark_value):
+            self._watermark_value = batch_max
+    
+    def _save_watermark(self, last_watermark: Any, pipeline_executor: PipelineExecutor) -> None:
+        """
+        Сохраняет новую контрольную точку после успешной записи.
+        
+        Args:
+            last_watermark: Значение, с которого начиналось чтение
+            pipeline_executor: Исполнитель пайплайнов (для проверки ROLLBACK)
+        
+        Если таргет отбросил строки (не прошли валидацию или отклонены при
+        записи), контрольная точка не сдвигается: иначе эти строки больше не
+        будут прочитаны. Следующий запуск перечитает тот же диапазон.
+        """
+        if not self.watermark or self._watermark_value is None:
+            return
+        if pipeline_executor.rolled_back_targets:
+            self.notifier.warning("Контрольная точка не сдвинута: процесс был отменен (ROLLBACK)")
+            return
+        dropped = {
+            target_key: len(target_writer.dropped_rows)
+            for target_key, target_writer in self.target_writers.items()
+            if getattr(target_writer, 'dropped_rows', None)
+        }
+        if dropped:
+            self.notifier.warning(
+                "Контрольная точка не сдвинута: строки не записаны в "
+                + ", ".join(f"{target_key} ({count})" for target_key, count in dropped.items())
+            )
+            return
+        if last_watermark is not None and self._watermark_value <= last_watermark:
+            return
+        
+        store = open_checkpoint_store(self.watermark.get("state_path", ".dtrt_state.json"))
+        try:
+            store.set(self._watermark_key(), self._watermark_value)
+        finally:
+            store.close()
+        self.notifier.info(f"Контрольная точка сохранена: {self.watermark['field']} = {self._watermark_value}")
+    
+    async def _init_source(self, required_fields: List[str], last_watermark: Any = None) -> Any:
         """
         Инициализирует источник данных и проверяет его.
         
         Args:
             required_fields: Список необходимых полей
+            last_watermark: Последнее обработанное значение водяного знака
             
         Returns:
-            Исходные данные для обработки
+            Getter источника, отдающий данные пачками
         """
-        # Если исходные данные переданы напрямую, используем их
-        if self.source_data:
-            source_data = self.source_data
-        else:
-            # Иначе загружаем данные из источника
-            self.notifier.info("Загрузка данных из источника не реализована в демо-версии")
-            source_data = []
-        
         # Определяем тип источника и создаем соответствующий getter
         source_type = None
+        source_name = None
         for target_config in self.targets.values():
             source_type = target_config["source_type"]
+            source_name = target_config["source_name"]
             break
         
         if not source_type:
@@ -228,19 +506,112 @@ class DtrtRunner:
         if not source_getter_class:
             raise ConfigurationError("source", f"Неизвестный тип источника: {source_type}")
         
-        source_getter = source_getter_class(source_data, required_fields)
+        # Записи, которые пропустят все таргеты, отбрасываются еще при чтении
+        predicate = SkipPredicate.from_config(self.config)
+        if predicate:
+            self.notifier.info(f"Условия пропуска записей переданы источнику: {', '.join(predicate.fields)}")
+        
+        watermark = (self.watermark["field"], last_watermark) if last_watermark is not None else None
+        
+        if source_type == "dict":
+            # Если исходные данные переданы напрямую, используем их
+            if self.source_data:
+                source_data = self.source_data
+            else:
+                self.notifier.info("Загрузка данных из источника не реализована в демо-версии")
+                source_data = []
+            source_getter = source_getter_class(source_data, required_fields, predicate, watermark)
+        else:
+            # Остальные getter'ы сами читают данные по имени источника из DSL
+            options = {
+                key: value for key, value in self.source_config.items()
+                if key not in ("prefetch_depth", "prefetch_bytes") + ADAPTIVE_OPTIONS
+            }
+            if source_type == "postgres":
+                options.setdefault("db_config", self.db_config)
+                options.setdefault("pool_manager", self.pool_manager)
+            try:
+                source_getter = source_getter_class(source_name, required_fields, predicate, watermark, **options)
+            except SOURCE_OPEN_ERRORS as e:
+                raise ConfigurationError("source", f"{source_type}/{source_name}: {type(e).__name__}: {e}")
+        
+        # Асинхронные getter'ы подключаются и формируют отчет при открытии
+        if hasattr(source_getter, 'open') and callable(source_getter.open):
+            try:
+                await source_getter.open()
+            except SOURCE_OPEN_ERRORS as e:
+                await self._close_source(source_getter)
+                raise ConfigurationError("source", f"{source_type}/{source_name}: {type(e).__name__}: {e}")
         
         # Проверяем валидность источника
         report = source_getter.report
         if not report["fully_valid"]:
+            await self._close_source(source_getter)
             raise SourceValidationError(report)
         
-        return source_data
+        # Размер пачек источника подбирается по времени их обработки
+        self.source_controller = BatchSizeController.from_options(self.source_config)
+        source_getter.batch_controller = self.source_controller
+        
+        # Упреждающее чтение: следующие пачки читаются, пока обрабатывается текущая
+        prefetch_depth = self.source_config.get("prefetch_depth", 0)
+        if prefetch_depth and self.hooks.memory_tracker is not None:
+            # Фоновое чтение пересекалось бы со стадиями учета памяти
+            self.notifier.warning("Упреждающее чтение отключено: включен учет памяти по стадиям")
+        elif prefetch_depth:
+            return PrefetchGetter(source_getter, prefetch_depth, self.source_config.get("prefetch_bytes"))
+        
+        return source_getter
+    
+    async def _iter_source(self, source_getter: Any) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Отдает данные источника пачками.
+        
+        Args:
+            source_getter: Getter источника
+            
+        Yields:
+            Пачка записей для обработки
+        """
+        batch_size = self.source_config.get("batch_size")
+        if hasattr(source_getter, 'aiter_batches'):
+            next_batch = source_getter.aiter_batches(batch_size).__anext__
+        else:
+            batches = iter(source_getter.iter_batches(batch_size))
+            
+            async def next_batch():
+                try:
+                    return next(batches)
+                except StopIteration:
+                    raise StopAsyncIteration
+        
+        while True:
+            # Чтение каждой пачки — отдельная стадия учета памяти
+            with self.hooks.memory_stage("source read"):
+                try:
+                    batch = await next_batch()
+                except StopAsyncIteration:
+                    return
+            yield batch
+    
+    async def _close_source(self, source_getter: Any) -> None:
+        """
+        Закрывает соединение getter'а источника (синхронного или асинхронного).
+        
+        Args:
+            source_getter: Getter источника
+        """
+        if hasattr(source_getter, 'close') and callable(source_getter.close):
+            closing = source_getter.close()
+            if asyncio.iscoroutine(closing):
+                await closing
     
     async def _init_targets(self) -> None:
         """
         Инициализирует целевые хранилища и проверяет их.
         """
+        self._check_shared_target_options()
+        
         # Для каждой цели создаем соответствующий writer
         for target_key, target_info in self.targets.items():
             target_type = target_info["target_type"]
@@ -255,55 +626,328 @@ class DtrtRunner:
             target_config = self.config[target_key]
             routes = target_config.get("routes", {})
             field_names = []
+            field_types = {}
             for route_data in routes.values():
                 final_name = route_data.get("final_name")
                 if final_name and not final_name.startswith("$"):
                     field_names.append(final_name)
+                    field_types[final_name] = route_data.get("final_type")
             
             # Создаем writer и добавляем его в словарь
+            options = self._target_options(target_key, target_writer_class)
+            adaptive = {key: options.pop(key) for key in ADAPTIVE_OPTIONS if key in options}
+            if target_type in ("postgres", "sqlite"):
+                controller = BatchSizeController.from_options(adaptive, options.get("batch_size"))
+                if controller:
+                    options["batch_controller"] = controller
+                    self.batch_controllers[target_key] = controller
             if target_type == "postgres":
-                target_writer = target_writer_class(target_name, field_names, self.db_config, skip_validation=True)
-            else:
-                target_writer = target_writer_class(target_name, field_names, self.db_config)
+                options.setdefault("pool_manager", self.pool_manager)
+            if target_type in ("postgres", "sqlite"):
+                options.setdefault("field_types", field_types)
+                # Изменившиеся строки обновляются по ключу: без upsert они бы дублировались
+                upsert_keys = target_config.get("target_keys") or self._change_keys(target_key)
+                if upsert_keys:
+                    options.setdefault("upsert_keys", upsert_keys)
+            try:
+                target_writer = target_writer_class(target_name, field_names, self.db_config, **options)
+            except (ValueError, TypeError) as e:
+                # Несовместимые параметры target_config или ключи таргета
+                raise ConfigurationError("target", f"{target_key}: {e}")
             
             self.target_writers[target_key] = target_writer
+            self._check_change_keys(target_key, target_writer)
+            
+            # Столбцы таблицы и их типы проверяются до чтения данных источника
+            if hasattr(target_writer, 'check_schema') and callable(target_writer.check_schema):
+                try:
+                    missing_fields, type_mismatches = await target_writer.check_schema()
+                except SCHEMA_CHECK_ERRORS as e:
+                    raise TargetValidationError(target_type, target_name, [], error=e)
+                if missing_fields or type_mismatches:
+                    raise TargetValidationError(target_type, target_name, missing_fields, type_mismatches)
+        
+        if self.write_config.get("all_or_nothing", False):
+            self._check_all_or_nothing()
+    
+    def _check_all_or_nothing(self) -> None:
+        """Проверяет до чтения источника, что таргеты можно зафиксировать вместе"""
+        unsupported = [
+            target_key for target_key, writer in self.target_writers.items() if not hasattr(writer, 'prepare')
+        ]
+        if unsupported:
+            raise ConfigurationError(
+                "target", f"Запись «все или ничего» не поддерживается таргетами: {', '.join(unsupported)}"
+            )
+        # Подготовленная транзакция SQLite держит блокировку записи всей базы до фиксации,
+        # поэтому второй таргет в том же файле не смог бы подготовить свою
+        sqlite_files = {}
+        for target_key, target_info in self.targets.items():
+            if target_info["target_type"] == "sqlite" and target_key in self.target_writers:
+                path = os.path.realpath(self.target_writers[target_key].db_path)
+                sqlite_files.setdefault(path, []).append(target_key)
+        shared = [target_keys for target_keys in sqlite_files.values() if len(target_keys) > 1]
+        if shared:
+            raise ConfigurationError(
+                "target",
+                f"Запись «все или ничего» несовместима с таргетами SQLite в одном файле: {', '.join(shared[0])}"
+            )
+    
+    @staticmethod
+    def _writer_parameters(target_writer_class: Any) -> Set[str]:
+        """Возвращает имена параметров writer'а (**options наследника передаются в __init__ базового класса)"""
+        return {
+            name
+            for cls in target_writer_class.__mro__ if "__init__" in vars(cls) and cls is not object
+            for name in inspect.signature(cls.__init__).parameters
+        }
+    
+    def _check_shared_target_options(self) -> None:
+        """Проверяет, что каждый общий параметр target_config принимает хотя бы один writer запуска"""
+        accepted = set(ADAPTIVE_OPTIONS)
+        for target_info in self.targets.values():
+            target_writer_class = TARGET_TYPE_MAPPING.get(target_info["target_type"])
+            if target_writer_class:
+                accepted |= self._writer_parameters(target_writer_class)
+        unknown = [
+            key for key, value in self.target_config.items()
+            if not isinstance(value, dict) and key not in accepted
+        ]
+        if unknown:
+            raise ConfigurationError("target", f"Неизвестные параметры target_config: {', '.join(unknown)}")
+    
+    def _target_options(self, target_key: str, target_writer_class: Any) -> Dict[str, Any]:
+        """
+        Возвращает параметры writer'а таргета.
+        
+        Общие параметры относятся ко всем таргетам, поэтому writer получает
+        только те из них, которые принимает (и параметры адаптивной пачки);
+        параметры таргета передаются все, и неизвестные из них — ошибка.
+        
+        Args:
+            target_key: Ключ таргета в IC
+            target_writer_class: Класс writer'а таргета
+        
+        Returns:
+            Общие параметры target_config, дополненные параметрами таргета
+        """
+        parameters = self._writer_parameters(target_writer_class)
+        options = {
+            key: value for key, value in self.target_config.items()
+            if not isinstance(value, dict) and (key in parameters or key in ADAPTIVE_OPTIONS)
+        }
+        options.update(self.target_config.get(target_key, {}))
+        return options
+    
+    def _init_deduplicators(self, target_keys: List[str]) -> None:
+        """
+        Создает отбрасывание повторяющихся записей для таргетов с ключевыми полями.
+        
+        Args:
+            target_keys: Ключи таргетов
+        """
+        mode = self.write_config.get("dedup")
+        if not mode:
+            return
+        if mode not in ("exact", "bloom"):
+            raise ConfigurationError("dedup", f"Неизвестный режим: {mode} (ожидается exact или bloom)")
+        
+        dedup_keys = self.write_config.get("dedup_keys", {})
+        keyed = {
+            target_key: dedup_keys.get(target_key) or self.config[target_key].get("target_keys")
+            for target_key in target_keys
+        }
+        keyed = {target_key: key_fields for target_key, key_fields in keyed.items() if key_fields}
+        if not keyed:
+            self.notifier.warning("Отбрасывание повторов не применено: ни у одного таргета нет ключевых полей")
+            return
+        
+        # Бюджет памяти делится поровну между таргетами
+        memory_limit = self.write_config.get("dedup_memory", 64 * 1024 * 1024) // len(keyed)
+        for target_key, key_fields in keyed.items():
+            if mode == "exact":
+                seen = SpillingHashSet(memory_limit, self.write_config.get("dedup_spill_dir"))
+            else:
+                seen = BloomFilter(
+                    self.write_config.get("dedup_capacity", 1000000),
+                    self.write_config.get("dedup_error_rate", 0.01),
+                    memory_limit
+                )
+            self.deduplicators[target_key] = Deduplicator(target_key, key_fields, seen)
+    
+    def _change_keys(self, target_key: str) -> Optional[List[str]]:
+        """Возвращает ключевые поля отбора изменившихся строк из write_config["change_keys"]"""
+        if not self.write_config.get("change_state"):
+            return None
+        return self.write_config.get("change_keys", {}).get(target_key)
+    
+    def _check_change_keys(self, target_key: str, target_writer: Any) -> None:
+        """
+        Проверяет до чтения источника, что writer обновляет строки по ключам отбора.
+        
+        Отбор передает таргету только новые и изменившиеся строки. Таблица,
+        которая не обновляется по тем же ключам (upsert), получила бы
+        изменившуюся строку второй копией. Файловые таргеты и dict
+        перезаписываются целиком и не проверяются.
+        """
+        if not self.write_config.get("change_state") or not hasattr(target_writer, 'upsert_keys'):
+            return
+        key_fields = self._change_keys(target_key) or self.config[target_key].get("target_keys")
+        if key_fields and set(key_fields) != set(target_writer.upsert_keys):
+            raise ConfigurationError(
+                "change_state",
+                f"{target_key}: ключи отбора {list(key_fields)} не совпадают с ключами upsert "
+                f"{target_writer.upsert_keys}, изменившиеся строки были бы записаны повторно"
+            )
+    
+    def _init_change_detectors(self, target_keys: List[str]) -> Tuple[Any, Dict[str, ChangeDetector]]:
+        """
+        Создает отбор изменившихся строк для таргетов с бизнес-ключом.
+        
+        Args:
+            target_keys: Ключи записываемых таргетов
             
-            # Для демонстрационных целей отключаем проверку валидации полей
-            if hasattr(target_writer, 'validate_fields') and callable(target_writer.validate_fields):
-                # Отключаем валидацию для тестирования
-                target_writer.validate_fields = lambda: (True, [])
+        Returns:
+            Кортеж (хранилище хэшей или None, {таргет: ChangeDetector})
+        """
+        state_path = self.write_config.get("change_state")
+        if not state_path:
+            return None, {}
+        
+        store = open_hash_store(state_path)
+        detectors = {}
+        try:
+            for target_key in target_keys:
+                target_config = self.config[target_key]
+                key_fields = self._change_keys(target_key) or target_config.get("target_keys")
+                if not key_fields:
+                    continue
+                field_names = [
+                    route_data["final_name"] for route_data in target_config.get("routes", {}).values()
+                    if route_data.get("final_name") and not route_data["final_name"].startswith("$")
+                ]
+                detectors[target_key] = ChangeDetector(store, target_key, key_fields, field_names)
+        except ValueError as e:
+            store.close()
+            raise ConfigurationError("change_state", str(e))
+        
+        if not detectors:
+            self.notifier.warning("Отбор изменившихся строк не применен: ни у одного таргета нет ключевых полей")
+        return store, detectors
     
     async def _write_results(self, results: Dict[str, List[Dict[str, Dict[str, Any]]]]) -> None:
         """
         Записывает результаты в целевые хранилища.
         
+        Таргеты пишутся параллельно (не более write_config["concurrency"]
+        одновременно). Ошибка одного таргета не прерывает запись остальных.
+        С write_config["all_or_nothing"] таргеты только подготавливают
+        транзакции (двухфазный коммит) и фиксируются, если записались все.
+        
         Args:
             results: Результаты выполнения пайплайнов
         """
-        # Для каждой цели записываем результаты
-        for target_key, warehouse in results.items():
-            target_writer = self.target_writers.get(target_key)
-            if not target_writer:
-                continue
-            
-            # Записываем результаты в целевое хранилище
+        all_or_nothing = self.write_config.get("all_or_nothing", False)
+        # При учете памяти таргеты пишутся по одному, чтобы стадии записи не пересекались
+        concurrency = self.write_config.get("concurrency", 4) if self.hooks.memory_tracker is None else 1
+        semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+        
+        writers = {
+            target_key: self.target_writers[target_key]
+            for target_key in results
+            if target_key in self.target_writers
+        }
+        
+        # Неизменившиеся с прошлого запуска строки не записываются
+        store, detectors = self._init_change_detectors(writers)
+        rows = {target_key: results[target_key] for target_key in writers}
+        for target_key, detector in detectors.items():
+            rows[target_key] = detector.filter(rows[target_key])
+            self.change_stats[target_key] = detector.stats
+        
+        async def write_target(target_key: str) -> None:
+            target_writer = writers[target_key]
+            if semaphore:
+                await semaphore.acquire()
+            started = time.perf_counter()
             try:
-                await target_writer.write(warehouse)
-            except Exception as e:
-                target_info = self.targets[target_key]
-                raise TargetWriteError(target_info["target_type"], target_info["target_name"], e)
-            
-            # Закрываем соединение с целевым хранилищем
-            if hasattr(target_writer, 'close') and callable(target_writer.close):
-                await target_writer.close()
-
+                with self.hooks.memory_stage(f"write {target_key}"):
+                    if all_or_nothing:
+                        await target_writer.prepare(rows[target_key])
+                    else:
+                        await target_writer.write(rows[target_key])
+            finally:
+                self.hooks.record_write(target_key, time.perf_counter() - started)
+                if semaphore:
+                    semaphore.release()
+        
+        outcomes = await asyncio.gather(*(write_target(target_key) for target_key in writers), return_exceptions=True)
+        errors = {
+            target_key: outcome
+            for target_key, outcome in zip(writers, outcomes)
+            if isinstance(outcome, BaseException)
+        }
+        
+        try:
+            if all_or_nothing:
+                for target_writer in writers.values():
+                    if errors:
+                        await target_writer.rollback_prepared()
+                    else:
+                        await target_writer.commit_prepared()
+            # Хэши строк сохраняются только для зафиксированных таргетов и
+            # только для записанных строк: отброшенные writer'ом пишутся повторно
+            for target_key, detector in detectors.items():
+                if target_key not in errors and not (all_or_nothing and errors):
+                    detector.discard(getattr(writers[target_key], 'dropped_rows', []))
+                    detector.commit()
+        finally:
+            # Закрываем соединения с целевыми хранилищами
+            for target_writer in writers.values():
+                if hasattr(target_writer, 'close') and callable(target_writer.close):
+                    await target_writer.close()
+            if store:
+                store.close()
+        
+        for target_key, target_writer in writers.items():
+            # Строки, не прошедшие валидацию, не записываются
+            failed_rows = getattr(target_writer, 'failed_rows', None)
+            if failed_rows:
+                self.notifier.warning(
+                    f"{target_key}: {len(failed_rows)} строк не прошли валидацию, "
+                    f"например: {failed_rows[0]['errors']}"
+                )
+            # Строки, отклоненные базой при делении пачки, также не записываются
+            rejected_rows = getattr(target_writer, 'rejected_rows', None)
+            if rejected_rows:
+                self.notifier.warning(
+                    f"{target_key}: {len(rejected_rows)} строк отклонены при записи, "
+                    f"например: {rejected_rows[0]['error']}"
+                )
+        
+        if errors:
+            for target_key, error in errors.items():
+                self.notifier.error(f"Ошибка записи в {target_key}: {error}")
+                self.hooks.record_write_error(target_key)
+            if all_or_nothing:
+                self.notifier.error("Запись всех таргетов отменена (all_or_nothing)")
+            target_key, error = next(iter(errors.items()))
+            target_info = self.targets[target_key]
+            raise TargetWriteError(target_info["target_type"], target_info["target_name"], error)
 
 async def run_etl(
     config: Union[Dict[str, Any], str],
     user_functions_path: Optional[str] = None,
     notifier_type: str = "console",
     source_data: Optional[List[Dict[str, Any]]] = None,
-    db_config: Optional[Dict[str, Any]] = None
+    db_config: Optional[Dict[str, Any]] = None,
+    source_config: Optional[Dict[str, Any]] = None,
+    watermark: Optional[Dict[str, Any]] = None,
+    target_config: Optional[Dict[str, Any]] = None,
+    write_config: Optional[Dict[str, Any]] = None,
+    metrics_config: Optional[Dict[str, Any]] = None,
+    profile: Union[bool, Dict[str, Any]] = False,
+    memory_profile: Union[bool, Dict[str, Any]] = False
 ) -> Dict[str, Any]:
     """
     Запускает ETL процесс с заданной конфигурацией.
@@ -314,6 +958,13 @@ async def run_etl(
         notifier_type: Тип нотификатора (по умолчанию "console")
         source_data: Исходные данные для обработки (опционально)
         db_config: Конфигурация подключения к БД (опционально)
+        source_config: Параметры getter'а источника (опционально)
+        watermark: Настройки инкрементального чтения (опционально)
+        target_config: Параметры writer'ов (опционально)
+        write_config: Параметры записи таргетов (опционально)
+        metrics_config: Параметры метрик запуска (опционально)
+        profile: Профилирование запуска: True или параметры (опционально)
+        memory_profile: Учет памяти по стадиям: True или параметры (опционально)
         
     Returns:
         Результаты выполнения процесса
@@ -335,7 +986,14 @@ async def run_etl(
         user_functions_path,
         notifier_type,
         source_data,
-        db_config
+        db_config,
+        source_config,
+        watermark,
+        target_config,
+        write_config,
+        metrics_config,
+        profile,
+        memory_profile
     )
     
     return await runner.run()
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 
 class ETLException(Exception):
@@ -34,19 +34,32 @@ class SourceValidationError(ETLException):
 class TargetValidationError(ETLException):
     """Исключение при ошибке валидации целевого хранилища"""
     
-    def __init__(self, target_type: str, target_name: str, missing_fields: List[str]):
+    def __init__(
+        self,
+        target_type: str,
+        target_name: str,
+        missing_fields: List[str],
+        type_mismatches: Optional[List[str]] = None,
+        error: Optional[Exception] = None
+    ):
         self.target_type = target_type
         self.target_name = target_name
         self.missing_fields = missing_fields
+        self.type_mismatches = type_mismatches or []
+        self.error = error
         self.message = self._format_message()
         super().__init__(self.message)
     
     def _format_message(self) -> str:
         """Форматирует сообщение об ошибке валидации целевого хранилища"""
-        return (
-            f"Ошибка валидации целевого хранилища '{self.target_type}/{self.target_name}':\n"
-            f"Отсутствующие поля: {', '.join(self.missing_fields)}"
-        )
+        message = f"Ошибка валидации целевого хранилища '{self.target_type}/{self.target_name}':"
+        if self.missing_fields:
+            message += f"\nОтсутствующие поля: {', '.join(self.missing_fields)}"
+        if self.type_mismatches:
+            message += f"\nТипы DSL не совпадают с типами столбцов: {', '.join(self.type_mismatches)}"
+        if self.error is not None:
+            message += f"\nНе удалось проверить таблицу: {type(self.error).__name__}: {str(self.error)}"
+        return message
 
 
 class PipelineExecutionError(ETLException):
@@ -0,0 +1,193 @@
+"""
+План выполнения IC в духе EXPLAIN / EXPLAIN ANALYZE.
+
+Для каждого таргета выводятся уровни execution_plan, маршруты, шаги и функции,
+к которым разрешаются вызовы. Если передан профиль запуска (RunProfiler),
+строки маршрутов и шагов дополняются числом вызовов, суммарным, средним и p99
+временем и долей во времени запуска.
+"""
+
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import os
+
+from src.generator.python.config import STD_FUNCTIONS_PATH
+from src.generator.python.pipeline.pipeline_builder import PipelineBuilder
+
+
+def build_plan(
+    config: Dict[str, Any],
+    std_functions_path: str = STD_FUNCTIONS_PATH,
+    user_functions_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Строит план выполнения для всех таргетов IC.
+
+    Args:
+        config: IC (JSON-конфигурация ETL процесса)
+        std_functions_path: Путь к стандартным функциям
+        user_functions_path: Путь к пользовательским функциям
+
+    Returns:
+        Список таргетов с уровнями, маршрутами и шагами
+    """
+    plan = []
+    for target_key, target_config in config.items():
+        if target_key in ("lang", "global_vars"):
+            continue
+        builder = PipelineBuilder(target_config, std_functions_path, user_functions_path, target_key=target_key)
+        levels = []
+        for level in target_config.get("execution_plan", []):
+            routes = []
+            for source_name in level:
+                final_type, final_name = builder.get_final_type_and_name(source_name)
+                routes.append({
+                    "route": source_name,
+                    "final_name": final_name,
+                    "final_type": final_type,
+                    "depends_on": sorted(builder.get_field_dependencies(source_name)),
+                    "steps": [step.describe() for step in builder.build_pipeline(source_name)],
+                })
+            levels.append(routes)
+        plan.append({
+            "target": target_key,
+            "source_type": target_config.get("source_type"),
+            "target_type": target_config.get("target_type"),
+            "levels": levels,
+        })
+    return plan
+
+
+def annotate_plan(plan: List[Dict[str, Any]], profiler: Any) -> List[Dict[str, Any]]:
+    """Дополняет маршруты и шаги плана статистикой профиля запуска"""
+    for target in plan:
+        for level in target["levels"]:
+            for route in level:
+                route["stats"] = profiler.route_stats(target["target"], route["route"])
+                for step in route["steps"]:
+                    step["stats"] = profiler.step_stats(target["target"], route["route"], step["step"])
+    return plan
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.1f}us"
+
+
+def _format_stats(stats: Optional[Dict[str, Any]]) -> str:
+    if not stats:
+        return ""
+    parts = [f"calls={stats['calls']}", f"total={_format_seconds(stats['total'])}", f"mean={_format_seconds(stats['mean'])}"]
+    if "p99" in stats:
+        parts.append(f"p99={_format_seconds(stats['p99'])}")
+    parts.append(f"share={stats['share'] * 100:.1f}%")
+    return "  ".join(parts)
+
+
+def _storage(storage: Any) -> str:
+    if isinstance(storage, dict):
+        return f"{storage.get('type')}/{storage.get('name')}"
+    return str(storage)
+
+
+def format_plan(plan: List[Dict[str, Any]], elapsed: Optional[float] = None) -> str:
+    """
+    Форматирует план в текстовую таблицу.
+
+    Args:
+        plan: План из build_plan (при наличии — со статистикой из annotate_plan)
+        elapsed: Время запуска в секундах (для заголовка)
+
+    Returns:
+        Текст плана
+    """
+    rows = []
+    for target in plan:
+        rows.append((f"Таргет {target['target']} ({_storage(target['source_type'])} -> {_storage(target['target_type'])})", ""))
+        for number, level in enumerate(target["levels"], 1):
+            rows.append((f"  Уровень {number}", ""))
+            for route in level:
+                final = f"{route['final_name']}({route['final_type']})" if route["final_type"] else str(route["final_name"])
+                depends = f" [зависит от: {', '.join(route['depends_on'])}]" if route["depends_on"] else ""
+                rows.append((f"    {route['route']} -> {final}{depends}", _format_stats(route.get("stats"))))
+                for step in route["steps"]:
+                    rows.append((
+                        f"      {step['step']}. {step['type']}: {step['expression']}",
+                        _format_stats(step.get("stats"))
+                    ))
+                    for function in step["functions"]:
+                        rows.append((f"           {function['name']} = {function['resolved']}", ""))
+
+    width = max((len(left) for left, right in rows if right), default=0)
+    lines = [f"{left.ljust(width)}  {right}" if right else left for left, right in rows]
+    if elapsed is not None:
+        lines.insert(0, f"Время запуска: {_format_seconds(elapsed)}")
+    return "\n".join(lines)
+
+
+def explain(
+    config: Dict[str, Any],
+    user_functions_path: Optional[str] = None,
+    profiler: Optional[Any] = None
+) -> str:
+    """
+    Возвращает текст плана выполнения (со статистикой, если передан профиль).
+
+    Args:
+        config: IC (JSON-конфигурация ETL процесса)
+        user_functions_path: Путь к пользовательским функциям
+        profiler: Профиль запуска RunProfiler (опционально)
+    """
+    plan = build_plan(config, STD_FUNCTIONS_PATH, user_functions_path)
+    if profiler is None:
+        return format_plan(plan)
+    return format_plan(annotate_plan(plan, profiler), profiler.elapsed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="План выполнения маршрутов Data Route (EXPLAIN)")
+    parser.add_argument('input', help='DSL-файл или JSON-файл с IC')
+    parser.add_argument('-f', '--funcs', help='Путь к папке с пользовательскими функциями')
+    parser.add_argument('-v', '--vars', help='Путь к папке с внешними переменными (JSON)')
+    parser.add_argument('-a', '--analyze', action='store_true', help='Выполнить запуск и показать время шагов')
+    parser.add_argument('-d', '--data', help='JSON-файл с записями источника для --analyze')
+    parser.add_argument('--db', help='JSON-файл с конфигурацией подключения к БД для --analyze')
+    parser.add_argument('--pstats', help='Сохранить статистику cProfile в файл (--analyze)')
+    parser.add_argument('--collapsed', help='Сохранить collapsed stacks для flame graph в файл (--analyze)')
+
+    args = parser.parse_args()
+
+    if args.input.endswith('.json'):
+        with open(args.input, 'r', encoding='utf-8') as f:
+            ic = json.load(f)
+    else:
+        from dataroute import DataRoute
+        ic = DataRoute(args.input, vars_folder=args.vars, func_folder=args.funcs).compile_ic()
+
+    if not (args.analyze or args.data):
+        print(explain(ic, args.funcs))
+    else:
+        from src.generator.python.dtrt_runner import DtrtRunner
+
+        source_data = None
+        if args.data:
+            with open(args.data, 'r', encoding='utf-8') as f:
+                source_data = json.load(f)
+        db_config = None
+        if args.db:
+            with open(args.db, 'r', encoding='utf-8') as f:
+                db_config = json.load(f)
+        profile = {"pstats": args.pstats, "collapsed": args.collapsed}
+        runner = DtrtRunner(ic, args.funcs, source_data=source_data, db_config=db_config, profile=profile)
+        result = asyncio.run(runner.run())
+        if result["status"] != "success":
+            print(f"Ошибка запуска: {result['error']}")
+        print(explain(ic, args.funcs, runner.hooks.profiler))
+        for kind, path in result.get("profile", {}).get("files", {}).items():
+            print(f"{kind}: {os.path.abspath(path)}")
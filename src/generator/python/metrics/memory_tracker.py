@@ -0,0 +1,114 @@
+from typing import Dict, Any, List, Optional, Tuple
+from contextlib import contextmanager
+import json
+import tracemalloc
+
+
+class MemoryTracker:
+    """
+    Учет памяти по стадиям запуска ETL через tracemalloc.
+
+    Для каждой стадии запоминаются пик (сколько байт сверх начала стадии было
+    выделено в максимуме) и удержанная память (насколько выросло выделенное
+    к концу стадии), а по снимкам до и после стадии — места, где выделено
+    больше всего удержанной памяти. Стадии одного имени (например, обработка
+    таргета в каждой пачке) суммируются: пик — максимум, удержанная память
+    и места выделения — сумма. Снимки дороги (обходят все выделенные блоки),
+    поэтому по умолчанию снимаются только для первого вызова каждой стадии.
+
+    Стадии не должны пересекаться: пик отсчитывается заново в начале каждой.
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1, snapshot_calls: Optional[int] = 1):
+        """
+        Args:
+            top: Сколько мест выделения памяти выводить для стадии (0 — без снимков)
+            frames: Глубина трассировки выделений (tracemalloc.start)
+            snapshot_calls: Для скольких первых вызовов каждой стадии снимать места
+                выделения (None — для всех)
+        """
+        self.top = top
+        self.frames = frames
+        self.snapshot_calls = snapshot_calls
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.peak = 0
+        self._sites: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._started_tracing = False
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ]
+
+    def start(self) -> None:
+        """Включает tracemalloc (если он еще не включен)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Выключает tracemalloc, если его включал этот трекер"""
+        if self._started_tracing:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def begin(self, name: str) -> Tuple[str, int, Optional[tracemalloc.Snapshot]]:
+        """Начинает стадию; возвращает состояние, которое передается в end"""
+        # Снимок берется до замера, чтобы память самого снимка не попала в стадию
+        calls = self.stages[name]["calls"] if name in self.stages else 0
+        sampled = self.top and (self.snapshot_calls is None or calls < self.snapshot_calls)
+        snapshot = tracemalloc.take_snapshot() if sampled else None
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        return name, current, snapshot
+
+    def end(self, state: Tuple[str, int, Optional[tracemalloc.Snapshot]]) -> None:
+        """Заканчивает стадию и учитывает ее пик, удержанную память и места выделения"""
+        name, started, before = state
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+
+        stage = self.stages.setdefault(name, {"calls": 0, "peak": 0, "retained": 0})
+        stage["calls"] += 1
+        stage["peak"] = max(stage["peak"], peak - started)
+        stage["retained"] += current - started
+
+        if before is not None:
+            after = tracemalloc.take_snapshot().filter_traces(self._filters)
+            sites = self._sites.setdefault(name, {})
+            for diff in after.compare_to(before.filter_traces(self._filters), "lineno")[:self.top]:
+                if diff.size_diff <= 0:
+                    continue
+                frame = diff.traceback[0]
+                site = f"{frame.filename}:{frame.lineno}"
+                size, count = sites.get(site, (0, 0))
+                sites[site] = (size + diff.size_diff, count + diff.count_diff)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Контекстный менеджер стадии (для кода, в котором стадии не пересекаются)"""
+        state = self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(state)
+
+    def report(self) -> Dict[str, Any]:
+        """Возвращает отчет: общий пик и показатели стадий с местами выделения"""
+        stages = {}
+        for name, stage in self.stages.items():
+            sites = sorted(self._sites.get(name, {}).items(), key=lambda item: -item[1][0])[:self.top]
+            stages[name] = {
+                **stage,
+                "top": [{"site": site, "size": size, "count": count} for site, (size, count) in sites],
+            }
+        return {"peak": self.peak, "stages": stages}
+
+    def write(self, path: str) -> None:
+        """Записывает отчет в JSON-файл"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
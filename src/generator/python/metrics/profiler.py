@@ -0,0 +1,203 @@
+from typing import Dict, Any, List, Optional, Tuple
+import cProfile
+import pstats
+import random
+import time
+
+
+class StepTimer:
+    """
+    Время одного шага пайплайна: число вызовов, суммарное время и выборка
+    длительностей для перцентилей (reservoir sampling ограниченного размера).
+    """
+
+    __slots__ = ("calls", "total", "samples", "sample_size", "_random")
+
+    def __init__(self, sample_size: int, rng: random.Random):
+        self.calls = 0
+        self.total = 0.0
+        self.samples = []
+        self.sample_size = sample_size
+        self._random = rng
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        if len(self.samples) < self.sample_size:
+            self.samples.append(seconds)
+        else:
+            index = self._random.randrange(self.calls)
+            if index < self.sample_size:
+                self.samples[index] = seconds
+
+    def percentile(self, share: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class RunProfiler:
+    """
+    Профиль запуска ETL в духе EXPLAIN ANALYZE: время каждого шага каждого
+    маршрута и его доля во времени запуска.
+
+    Таймеры создаются при построении пайплайнов (ProfiledStep), поэтому без
+    профилирования шаги не оборачиваются. Дополнительно может включаться
+    cProfile: результат сохраняется в файл pstats и в collapsed stacks
+    (формат flamegraph.pl и speedscope).
+    """
+
+    def __init__(
+        self,
+        sample_size: int = 10000,
+        pstats_path: Optional[str] = None,
+        collapsed_path: Optional[str] = None
+    ):
+        """
+        Args:
+            sample_size: Сколько длительностей шага хранить для перцентилей
+            pstats_path: Файл для статистики cProfile (опционально)
+            collapsed_path: Файл collapsed stacks для flame graph (опционально)
+        """
+        self.sample_size = sample_size
+        self.pstats_path = pstats_path
+        self.collapsed_path = collapsed_path
+        self.timers: Dict[Tuple[Optional[str], str, int], StepTimer] = {}
+        self.elapsed = 0.0
+        self._started = None
+        self._random = random.Random(0)
+        self._profile = cProfile.Profile() if pstats_path or collapsed_path else None
+
+    def timer(self, target_key: Optional[str], source_name: str, step_number: int) -> StepTimer:
+        """Возвращает таймер шага маршрута (создает при первом обращении)"""
+        key = (target_key, source_name, step_number)
+        timer = self.timers.get(key)
+        if timer is None:
+            timer = self.timers[key] = StepTimer(self.sample_size, self._random)
+        return timer
+
+    def start(self) -> None:
+        """Начинает отсчет времени запуска и включает cProfile"""
+        self._started = time.perf_counter()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self) -> None:
+        """Останавливает cProfile и запоминает время запуска (знаменатель долей)"""
+        if self._started is None:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+        self.elapsed = time.perf_counter() - self._started
+        self._started = None
+
+    def step_stats(self, target_key: Optional[str], source_name: str, step_number: int) -> Optional[Dict[str, Any]]:
+        """Статистика шага маршрута или None, если шаг не выполнялся"""
+        timer = self.timers.get((target_key, source_name, step_number))
+        if timer is None or not timer.calls:
+            return None
+        return {
+            "calls": timer.calls,
+            "total": timer.total,
+            "mean": timer.total / timer.calls,
+            "p99": timer.percentile(0.99),
+            "share": timer.total / self.elapsed if self.elapsed else 0.0,
+        }
+
+    def route_stats(self, target_key: Optional[str], source_name: str) -> Optional[Dict[str, Any]]:
+        """Суммарная статистика шагов маршрута"""
+        timers = [
+            timer for (target, route, _), timer in self.timers.items()
+            if target == target_key and route == source_name and timer.calls
+        ]
+        if not timers:
+            return None
+        calls = max(timer.calls for timer in timers)
+        total = sum(timer.total for timer in timers)
+        return {
+            "calls": calls,
+            "total": total,
+            "mean": total / calls,
+            "share": total / self.elapsed if self.elapsed else 0.0,
+        }
+
+    def dump(self) -> Dict[str, str]:
+        """Сохраняет результаты cProfile в заданные файлы и возвращает их пути"""
+        paths = {}
+        if self._profile is None:
+            return paths
+        stats = pstats.Stats(self._profile)
+        if self.pstats_path:
+            stats.dump_stats(self.pstats_path)
+            paths["pstats"] = self.pstats_path
+        if self.collapsed_path:
+            with open(self.collapsed_path, "w", encoding="utf-8") as f:
+                for stack, value in collapsed_stacks(stats.stats):
+                    f.write(f"{stack} {value}\n")
+            paths["collapsed"] = self.collapsed_path
+        return paths
+
+    def to_dict(self) -> Dict[str, Any]:
+        steps = []
+        for (target_key, source_name, step_number) in sorted(self.timers, key=lambda key: (str(key[0]), key[1], key[2])):
+            stats = self.step_stats(target_key, source_name, step_number)
+            if stats:
+                steps.append({"target": target_key, "route": source_name, "step": step_number, **stats})
+        return {"elapsed": self.elapsed, "steps": steps}
+
+
+def _frame_label(func: Tuple[str, int, str]) -> str:
+    file_name, line, name = func
+    if file_name == "~":
+        return name
+    return f"{file_name.rsplit('/', 1)[-1]}:{name}:{line}"
+
+
+def collapsed_stacks(stats: Dict[Any, Any], min_microseconds: int = 1, max_depth: int = 256) -> List[Tuple[str, int]]:
+    """
+    Строит collapsed stacks (стек;стек;функция время_в_мкс) из статистики cProfile.
+
+    cProfile хранит только пары «вызывающий → вызываемый», поэтому собственное
+    время функции распределяется по путям пропорционально накопленному времени
+    вызовов с каждого пути (как в flameprof). Рекурсивные вызовы обрываются.
+
+    Args:
+        stats: Словарь pstats.Stats.stats
+        min_microseconds: Пути с меньшим временем отбрасываются
+        max_depth: Максимальная глубина стека
+
+    Returns:
+        Список пар (стек, время в микросекундах)
+    """
+    callees: Dict[Any, Dict[Any, Tuple]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge
+
+    totals: Dict[str, float] = {}
+
+    def walk(func: Any, path: Tuple[Any, ...], share: float) -> None:
+        _, _, own_time, cumulative, _ = stats[func]
+        path = path + (func,)
+        stack = ";".join(_frame_label(frame) for frame in path)
+        totals[stack] = totals.get(stack, 0.0) + own_time * share
+        if len(path) >= max_depth:
+            return
+        for child, edge in callees.get(func, {}).items():
+            child_cumulative = stats[child][3]
+            if child in path or child_cumulative <= 0:
+                continue
+            child_share = share * edge[3] / child_cumulative
+            if child_share * child_cumulative * 1e6 >= min_microseconds:
+                walk(child, path, child_share)
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(func, (), 1.0)
+
+    return [
+        (stack, int(seconds * 1e6))
+        for stack, seconds in sorted(totals.items())
+        if seconds * 1e6 >= min_microseconds
+    ]
@@ -0,0 +1,123 @@
+from typing import Dict, List, Any, Optional, Union
+from contextlib import contextmanager, nullcontext
+import time
+
+from src.generator.python.explain import explain
+from src.generator.python.metrics.memory_tracker import MemoryTracker
+from src.generator.python.metrics.profiler import RunProfiler
+from src.generator.python.metrics.run_metrics import RunMetrics
+
+
+class RunHooks:
+    """
+    Инструментирование запуска: метрики, профиль и учет памяти по стадиям.
+
+    Строится один раз вместе с runner'ом, как обертки шагов InstrumentedStep
+    и ProfiledStep при построении пайплайна: runner вызывает хуки стадий,
+    не проверяя, что из инструментирования включено. Выключенные замеры
+    ничего не делают.
+    """
+
+    def __init__(
+        self,
+        notifier: Any,
+        metrics_config: Optional[Dict[str, Any]] = None,
+        profile: Union[bool, Dict[str, Any]] = False,
+        memory_profile: Union[bool, Dict[str, Any]] = False
+    ):
+        """
+        Args:
+            notifier: Нотификатор запуска (сообщения о записанных отчетах)
+            metrics_config: Параметры метрик (см. DtrtRunner), None — без метрик
+            profile: Профилирование запуска: True или параметры (см. DtrtRunner)
+            memory_profile: Учет памяти по стадиям: True или параметры (см. DtrtRunner)
+        """
+        self.notifier = notifier
+        self.metrics_config = metrics_config or {}
+        # Без metrics_config шаги и нотификаторы маршрутов строятся без замеров
+        self.metrics = RunMetrics(metrics_config.get("buckets")) if metrics_config is not None else None
+        profile_options = profile if isinstance(profile, dict) else {}
+        self.profiler = RunProfiler(
+            profile_options.get("sample_size", 10000),
+            profile_options.get("pstats"),
+            profile_options.get("collapsed")
+        ) if profile else None
+        self.memory_options = memory_profile if isinstance(memory_profile, dict) else {}
+        self.memory_tracker = MemoryTracker(
+            self.memory_options.get("top", 10),
+            self.memory_options.get("frames", 1),
+            self.memory_options.get("snapshot_calls", 1)
+        ) if memory_profile else None
+
+    def start(self) -> None:
+        """Включает профилировщик и трассировку памяти"""
+        if self.profiler is not None:
+            self.profiler.start()
+        if self.memory_tracker is not None:
+            self.memory_tracker.start()
+
+    def memory_stage(self, name: str) -> Any:
+        """Стадия учета памяти (без учета памяти — пустой контекст)"""
+        return self.memory_tracker.stage(name) if self.memory_tracker else nullcontext()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Замеряет длительность стадии запуска (и при ошибке)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("dtrt_stage_duration_seconds", time.perf_counter() - started, stage=name)
+
+    def record_batch(self, records: int, read_seconds: float, transform_seconds: float) -> None:
+        """Учитывает пачку источника: чтение и обработку пайплайнами"""
+        if self.metrics is not None:
+            self.metrics.inc("dtrt_source_records_total", records)
+            self.metrics.observe("dtrt_stage_duration_seconds", read_seconds, stage="read")
+            self.metrics.observe("dtrt_stage_duration_seconds", transform_seconds, stage="transform")
+
+    def record_target_rows(self, results: Dict[str, List[Any]]) -> None:
+        """Учитывает количество строк, переданных каждому таргету"""
+        if self.metrics is not None:
+            for target_key, warehouse in results.items():
+                self.metrics.inc("dtrt_target_rows_total", len(warehouse), target=target_key)
+
+    def record_write(self, target_key: str, seconds: float) -> None:
+        if self.metrics is not None:
+            self.metrics.observe("dtrt_write_duration_seconds", seconds, target=target_key)
+
+    def record_write_error(self, target_key: str) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("dtrt_write_errors_total", target=target_key)
+
+    def report(self, result: Dict[str, Any], config: Dict[str, Any], user_functions_path: Optional[str]) -> None:
+        """
+        Добавляет в результат успешного запуска разделы metrics, profile и memory.
+
+        Args:
+            result: Результат запуска (дополняется)
+            config: IC запуска (для плана выполнения)
+            user_functions_path: Путь к пользовательским функциям
+        """
+        if self.metrics is not None:
+            result["metrics"] = self.metrics.to_dict()
+        if self.profiler is not None:
+            self.profiler.stop()
+            result["profile"] = {**self.profiler.to_dict(), "files": self.profiler.dump()}
+            self.notifier.info(f"План выполнения:\n{explain(config, user_functions_path, self.profiler)}")
+        if self.memory_tracker is not None:
+            result["memory"] = self.memory_tracker.report()
+
+    def finish(self) -> None:
+        """Останавливает замеры и записывает отчеты (и для неудачного запуска)"""
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self.memory_tracker is not None:
+            self.memory_tracker.stop()
+            if self.memory_options.get("path"):
+                self.memory_tracker.write(self.memory_options["path"])
+                self.notifier.info(f"Отчет о памяти записан: {self.memory_options['path']}")
+        if self.metrics is not None and self.metrics_config.get("path"):
+            paths = self.metrics.export(self.metrics_config["path"])
+            self.notifier.info(f"Метрики записаны: {', '.join(paths.values())}")
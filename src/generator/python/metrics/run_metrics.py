@@ -0,0 +1,204 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+import json
+import math
+import os
+
+
+# Границы корзин гистограмм длительности в секундах
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Описания метрик для экспорта в формате Prometheus
+METRIC_HELP = {
+    "dtrt_step_invocations_total": "Вызовы шагов пайплайна",
+    "dtrt_step_errors_total": "Ошибки шагов пайплайна",
+    "dtrt_step_duration_seconds": "Длительность шагов пайплайна по типу шага",
+    "dtrt_events_total": "События пайплайнов (SKIP, NOTIFY, ROLLBACK)",
+    "dtrt_cast_fallbacks_total": "Значения, замененные значением по умолчанию при приведении типа",
+    "dtrt_source_records_total": "Записи, прочитанные из источника",
+    "dtrt_target_rows_total": "Строки таргета после пайплайнов",
+    "dtrt_write_errors_total": "Ошибки записи таргета",
+    "dtrt_stage_duration_seconds": "Длительность стадий запуска (read и transform — на пачку, write — на запуск)",
+    "dtrt_write_duration_seconds": "Длительность записи таргета",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """Счетчик метрики с фиксированным набором меток"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Histogram:
+    """Гистограмма метрики с фиксированным набором меток"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # Последняя корзина — значения больше всех границ (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Накопленные количества по корзинам (как le-корзины Prometheus)"""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class RunMetrics:
+    """
+    Метрики запуска ETL: счетчики и гистограммы с метками.
+
+    Счетчик или гистограмма создается один раз на набор меток и дальше
+    обновляется напрямую, поэтому инструментированные шаги получают свои
+    объекты при построении пайплайна и не ищут их при каждом вызове.
+    Экспорт — в JSON и в текстовый формат Prometheus.
+    """
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        """
+        Args:
+            buckets: Границы корзин гистограмм в секундах
+        """
+        self.buckets = tuple(sorted(buckets or DEFAULT_BUCKETS))
+        self.counters: Dict[Tuple[str, Labels], Counter] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Labels]:
+        return name, tuple((label, "" if value is None else str(value)) for label, value in labels.items())
+
+    def counter(self, name: str, **labels: Any) -> Counter:
+        """Возвращает счетчик с указанными метками (создает при первом обращении)"""
+        key = self._key(name, labels)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = Counter()
+        return counter
+
+    def histogram(self, name: str, **labels: Any) -> Histogram:
+        """Возвращает гистограмму с указанными метками (создает при первом обращении)"""
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        return histogram
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        self.counter(name, **labels).inc(amount)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        self.histogram(name, **labels).observe(value)
+
+    def stages(self) -> Dict[str, float]:
+        """Суммарное время стадий запуска в секундах"""
+        return {
+            dict(labels)["stage"]: histogram.sum
+            for (name, labels), histogram in self.histograms.items()
+            if name == "dtrt_stage_duration_seconds"
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает метрики в виде, пригодном для JSON"""
+        return {
+            "stages": self.stages(),
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": counter.value}
+                for (name, labels), counter in sorted(self.counters.items())
+            ],
+            "histograms": [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "buckets": dict(zip([*map(_format_value, histogram.buckets), "+Inf"], histogram.cumulative())),
+                    "sum": histogram.sum,
+                    "count": histogram.count,
+                }
+                for (name, labels), histogram in sorted(self.histograms.items())
+            ],
+        }
+
+    def to_prometheus(self) -> str:
+        """Возвращает метрики в текстовом формате Prometheus"""
+        lines = []
+        described = set()
+
+        def describe(name: str, metric_type: str) -> None:
+            if name not in described:
+                described.add(name)
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), counter in sorted(self.counters.items()):
+            describe(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(counter.value)}")
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            describe(name, "histogram")
+            bounds = [*map(_format_value, histogram.buckets), "+Inf"]
+            for bound, count in zip(bounds, histogram.cumulative()):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> Dict[str, str]:
+        """
+        Записывает метрики в папку path: metrics.json и metrics.prom.
+
+        Файлы заменяются атомарно, поэтому сборщик (например, textfile
+        collector node_exporter) не прочитает наполовину записанный файл.
+
+        Returns:
+            Пути записанных файлов по формату
+        """
+        os.makedirs(path, exist_ok=True)
+        files = {
+            "json": (os.path.join(path, "metrics.json"), json.dumps(self.to_dict(), ensure_ascii=False, indent=2)),
+            "prometheus": (os.path.join(path, "metrics.prom"), self.to_prometheus()),
+        }
+        for file_path, content in files.values():
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, file_path)
+        return {file_format: file_path for file_format, (file_path, _) in files.items()}
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
@@ -0,0 +1,125 @@
+from typing import Dict, Any, List, Optional, Tuple
+import queue
+import threading
+import time
+
+from src.generator.python.notifiers.console_notifier import ConsoleNotifier
+
+
+class AggregatedNotifier:
+    """
+    Неблокирующий нотификатор с агрегацией событий.
+
+    Сообщения кладутся в очередь и выводятся фоновым потоком через
+    обернутый нотификатор, поэтому вывод в консоль не задерживает event loop.
+    События пайплайнов (SKIP, NOTIFY, ROLLBACK) считаются по маршруту,
+    типу и тексту: первые sample_first повторений выводятся как есть, дальше —
+    не чаще одного примера с текущим счетчиком в sample_interval секунд.
+    В конце запуска close выводит сводку по всем событиям.
+    """
+
+    def __init__(
+        self,
+        color: bool = True,
+        notifier: Optional[Any] = None,
+        sample_first: int = 3,
+        sample_interval: float = 5.0
+    ):
+        """
+        Args:
+            color: Цветной вывод (для нотификатора по умолчанию)
+            notifier: Нотификатор, которым выводятся сообщения (по умолчанию консольный)
+            sample_first: Сколько первых повторений события выводить полностью
+            sample_interval: Минимальный интервал между примерами повторяющегося события в секундах
+        """
+        self.notifier = notifier or ConsoleNotifier(color=color)
+        self.sample_first = sample_first
+        self.sample_interval = sample_interval
+        self.counts = {}
+        self._sampled_at = {}
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _put(self, method: str, *args: Any) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._handle, name="dtrt-notifier", daemon=True)
+                    self._thread.start()
+        self._queue.put((method, args))
+
+    def _handle(self) -> None:
+        """Фоновый обработчик очереди сообщений"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            method, args = item
+            try:
+                getattr(self.notifier, method)(*args)
+            except Exception:
+                # Ошибка вывода одного сообщения не должна останавливать обработчик
+                pass
+
+    def info(self, message: str) -> None:
+        self._put("info", message)
+
+    def warning(self, message: str) -> None:
+        self._put("warning", message)
+
+    def error(self, message: str) -> None:
+        self._put("error", message)
+
+    def critical(self, message: str) -> None:
+        self._put("critical", message)
+
+    def notify(self, message: str, level: str = "INFO") -> None:
+        self._put("notify", message, level)
+
+    def event_notify(self, event_type: str, message: Optional[str] = None, route: Optional[str] = None) -> None:
+        """
+        Учитывает событие пайплайна и при необходимости выводит его пример.
+
+        Args:
+            event_type: Тип события (NOTIFY, SKIP, ROLLBACK)
+            message: Сообщение события
+            route: Маршрут, в котором произошло событие
+        """
+        key = (route, event_type, message)
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+
+        if count <= self.sample_first:
+            if count == self.sample_first:
+                self._sampled_at[key] = time.monotonic()
+            self._put("event_notify", event_type, message, route)
+            return
+
+        now = time.monotonic()
+        if now - self._sampled_at.get(key, 0.0) >= self.sample_interval:
+            self._sampled_at[key] = now
+            self._put("event_notify", event_type, f"{message} (повторений: {count})", route)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Возвращает счетчики событий, начиная с самых частых"""
+        items: List[Tuple[Tuple[Any, ...], int]] = sorted(self.counts.items(), key=lambda item: -item[1])
+        return [
+            {"route": route, "event": event_type, "message": message, "count": count}
+            for (route, event_type, message), count in items
+        ]
+
+    def close(self) -> None:
+        """Выводит сводку событий, дожидается вывода очереди и останавливает обработчик"""
+        for item in self.summary():
+            if item["count"] > self.sample_first:
+                route = f" [{item['route']}]" if item["route"] else ""
+                self._put("info", f"Сводка событий{route}: {item['event']} «{item['message']}» — {item['count']} раз")
+        self.counts = {}
+        self._sampled_at = {}
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
@@ -87,13 +87,14 @@ class ConsoleNotifier:
         else:
             self.info(message)
     
-    def event_notify(self, event_type: str, message: Optional[str] = None) -> None:
+    def event_notify(self, event_type: str, message: Optional[str] = None, route: Optional[str] = None) -> None:
         """
         Обрабатывает уведомление о событии.
         
         Args:
             event_type: Тип события (NOTIFY, SKIP, ROLLBACK)
             message: Дополнительное сообщение
+            route: Маршрут, в котором произошло событие
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
@@ -110,5 +111,7 @@ class ConsoleNotifier:
             level = "INFO"
             prefix = "СОБЫТИЕ"
         
+        if route:
+            prefix = f"{prefix} [{route}]"
         msg = f"{prefix}: {message}" if message else prefix
         self.notify(msg, level=level)
@@ -0,0 +1,27 @@
+from typing import Any, Optional
+
+from src.generator.python.notifiers.route_notifier import RouteNotifier
+
+
+class MetricsNotifier(RouteNotifier):
+    """
+    Нотификатор маршрута, считающий события пайплайна (SKIP, NOTIFY, ROLLBACK)
+    в метриках запуска. Используется вместо RouteNotifier, если метрики включены.
+    """
+
+    def __init__(self, notifier: Any, route: str, metrics: Any, target_key: Optional[str], source_name: str):
+        super().__init__(notifier, route)
+        self.metrics = metrics
+        self.target_key = target_key
+        self.source_name = source_name
+        self._counters = {}
+
+    def event_notify(self, event_type: str, message: Optional[str] = None) -> None:
+        counter = self._counters.get(event_type)
+        if counter is None:
+            counter = self._counters[event_type] = self.metrics.counter(
+                "dtrt_events_total", target=self.target_key, route=self.source_name, event=event_type
+            )
+        counter.value += 1
+        if self.notifier is not None:
+            super().event_notify(event_type, message)
@@ -0,0 +1,18 @@
+from typing import Any, Optional
+
+
+class RouteNotifier:
+    """
+    Нотификатор маршрута: передает события пайплайна вместе с маршрутом,
+    в котором они произошли. Остальные методы берутся у обернутого нотификатора.
+    """
+
+    def __init__(self, notifier: Any, route: str):
+        self.notifier = notifier
+        self.route = route
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.notifier, name)
+
+    def event_notify(self, event_type: str, message: Optional[str] = None) -> None:
+        self.notifier.event_notify(event_type, message, route=self.route)
@@ -0,0 +1,81 @@
+from typing import Dict, Any, Optional
+import time
+
+from src.generator.python.exeptions import EventSkipException, EventRollbackException
+
+
+class InstrumentedStep:
+    """
+    Шаг пайплайна с метриками: считает вызовы и ошибки и замеряет длительность.
+
+    Оборачивает PipelineStep при построении пайплайна, только если метрики
+    включены; счетчики и гистограмма берутся из реестра один раз.
+    События SKIP и ROLLBACK ошибками не считаются (их учитывает MetricsNotifier).
+    """
+
+    def __init__(self, step: Any, metrics: Any, target_key: Optional[str], source_name: str):
+        """
+        Args:
+            step: Оборачиваемый шаг
+            metrics: Реестр метрик RunMetrics
+            target_key: Ключ таргета
+            source_name: Имя исходного поля маршрута
+        """
+        self.step = step
+        labels = {
+            "target": target_key,
+            "route": source_name,
+            "step": step.step_number,
+            "type": step.type.value,
+        }
+        self.invocations = metrics.counter("dtrt_step_invocations_total", **labels)
+        self.errors = metrics.counter("dtrt_step_errors_total", **labels)
+        self.duration = metrics.histogram("dtrt_step_duration_seconds", type=step.type.value)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.step, name)
+
+    async def execute(
+        self,
+        input_value: Any,
+        final_frame: Dict[str, Dict[str, Any]],
+        notifier: Optional[Any] = None
+    ) -> Any:
+        self.invocations.value += 1
+        started = time.perf_counter()
+        try:
+            return await self.step.execute(input_value, final_frame, notifier)
+        except (EventSkipException, EventRollbackException):
+            raise
+        except Exception:
+            self.errors.value += 1
+            raise
+        finally:
+            self.duration.observe(time.perf_counter() - started)
+
+
+class ProfiledStep:
+    """
+    Шаг пайплайна с замером времени для профиля запуска (RunProfiler).
+
+    Оборачивает шаг при построении пайплайна, только если запуск профилируется.
+    """
+
+    def __init__(self, step: Any, profiler: Any, target_key: Optional[str], source_name: str):
+        self.step = step
+        self.timer = profiler.timer(target_key, source_name, step.step_number)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.step, name)
+
+    async def execute(
+        self,
+        input_value: Any,
+        final_frame: Dict[str, Dict[str, Any]],
+        notifier: Optional[Any] = None
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self.step.execute(input_value, final_frame, notifier)
+        finally:
+            self.timer.add(time.perf_counter() - started)
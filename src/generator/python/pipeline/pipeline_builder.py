@@ -1,5 +1,6 @@
 from typing import Dict, List, Any, Optional, Set
 from src.generator.python.pipeline.pipeline_step import PipelineStep
+from src.generator.python.pipeline.instrumented_step import InstrumentedStep, ProfiledStep
 
 
 class PipelineBuilder:
@@ -9,7 +10,11 @@ class PipelineBuilder:
         self,
         route_config: Dict[str, Any],
         std_functions_path: str,
-        user_functions_path: Optional[str] = None
+        user_functions_path: Optional[str] = None,
+        context: Optional[Any] = None,
+        target_key: Optional[str] = None,
+        metrics: Optional[Any] = None,
+        profiler: Optional[Any] = None
     ):
         """
         Инициализирует построитель пайплайна.
@@ -18,10 +23,20 @@ class PipelineBuilder:
             route_config: Конфигурация маршрута из JSON
             std_functions_path: Путь к стандартным функциям
             user_functions_path: Путь к пользовательским функциям
+            context: Контекст запуска для пользовательских функций
+            target_key: Ключ таргета (для меток метрик и событий)
+            metrics: Реестр метрик; если задан, шаги строятся с замером времени и счетчиками
+            profiler: Профиль запуска RunProfiler; если задан, время шагов замеряется для EXPLAIN
         """
         self.route_config = route_config
         self.std_functions_path = std_functions_path
         self.user_functions_path = user_functions_path
+        self.context = context
+        self.target_key = target_key
+        self.metrics = metrics
+        self.profiler = profiler
+        # Построенные пайплайны по исходному полю: шаги не хранят состояния между записями
+        self._pipelines = {}
     
     def build_pipeline(self, source_name: str) -> List[PipelineStep]:
         """
@@ -33,6 +48,13 @@ class PipelineBuilder:
         Returns:
             Список шагов пайплайна
         """
+        pipeline = self._pipelines.get(source_name)
+        if pipeline is None:
+            pipeline = self._pipelines[source_name] = self._build_pipeline(source_name)
+        return pipeline
+    
+    def _build_pipeline(self, source_name: str) -> List[PipelineStep]:
+        """Строит шаги пайплайна поля (с метриками, если они включены)"""
         # Получаем конфигурацию пайплайна для данного поля
         route_data = self.route_config["routes"].get(source_name)
         if not route_data or not route_data.get("pipeline"):
@@ -49,8 +71,13 @@ class PipelineBuilder:
                     step_data, 
                     step_number,
                     self.std_functions_path,
-                    self.user_functions_path
+                    self.user_functions_path,
+                    self.context
                 )
+                if self.metrics is not None:
+                    step = InstrumentedStep(step, self.metrics, self.target_key, source_name)
+                if self.profiler is not None:
+                    step = ProfiledStep(step, self.profiler, self.target_key, source_name)
                 steps.append(step)
         
         return steps
@@ -1,9 +1,12 @@
 from typing import Dict, List, Any, Optional, Set, Tuple
 import asyncio
+import contextlib
 from pydantic import BaseModel, create_model, ValidationError
 
 from src.generator.python.pipeline.pipeline_builder import PipelineBuilder
 from src.generator.python.pipeline.pipeline_step import PipelineStep
+from src.generator.python.notifiers.route_notifier import RouteNotifier
+from src.generator.python.notifiers.metrics_notifier import MetricsNotifier
 from src.generator.python.exeptions import PipelineExecutionError, EventSkipException, EventRollbackException
 
 
@@ -15,7 +18,11 @@ class PipelineExecutor:
         config: Dict[str, Any],
         std_functions_path: str,
         user_functions_path: Optional[str] = None,
-        notifier: Optional[Any] = None
+        notifier: Optional[Any] = None,
+        context: Optional[Any] = None,
+        metrics: Optional[Any] = None,
+        profiler: Optional[Any] = None,
+        memory_tracker: Optional[Any] = None
     ):
         """
         Инициализирует исполнитель пайплайнов.
@@ -25,12 +32,22 @@ class PipelineExecutor:
             std_functions_path: Путь к стандартным функциям
             user_functions_path: Путь к пользовательским функциям
             notifier: Объект для отправки уведомлений
+            context: Контекст запуска для пользовательских функций
+            metrics: Реестр метрик RunMetrics (по умолчанию метрики не собираются)
+            profiler: Профиль запуска RunProfiler (по умолчанию время шагов не замеряется)
+            memory_tracker: Учет памяти MemoryTracker: обработка каждого таргета — отдельная стадия
         """
         self.config = config
         self.std_functions_path = std_functions_path
         self.user_functions_path = user_functions_path
         self.notifier = notifier
+        self.metrics = metrics
+        self.memory_tracker = memory_tracker
         self.pipeline_builders = {}
+        # Таргеты, для которых произошел ROLLBACK: следующие пачки для них не обрабатываются
+        self.rolled_back_targets = set()
+        # Нотификаторы маршрутов: события пайплайна передаются вместе с маршрутом
+        self._route_notifiers = {}
         
         # Инициализируем построители пайплайнов для каждого таргета
         for target_key, target_config in config.items():
@@ -38,15 +55,20 @@ class PipelineExecutor:
                 self.pipeline_builders[target_key] = PipelineBuilder(
                     target_config,
                     std_functions_path,
-                    user_functions_path
+                    user_functions_path,
+                    context,
+                    target_key,
+                    metrics,
+                    profiler
                 )
     
     async def execute(self, source_data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Dict[str, Any]]]]:
         """
         Выполняет ETL процесс для указанных исходных данных.
+        Может вызываться многократно для последовательных пачек одного источника.
         
         Args:
-            source_data: Исходные данные для обработки
+            source_data: Исходные данные (пачка) для обработки
             
         Returns:
             Словарь с результатами для каждого таргета
@@ -55,8 +77,13 @@ class PipelineExecutor:
         
         # Обрабатываем каждый таргет
         for target_key, builder in self.pipeline_builders.items():
+            if target_key in self.rolled_back_targets:
+                results[target_key] = []
+                continue
             target_config = self.config[target_key]
-            results[target_key] = await self._process_target(target_config, builder, source_data)
+            stage = self.memory_tracker.stage(f"transform {target_key}") if self.memory_tracker else contextlib.nullcontext()
+            with stage:
+                results[target_key] = await self._process_target(target_config, builder, source_data, target_key)
             
         return results
     
@@ -64,7 +91,8 @@ class PipelineExecutor:
         self,
         target_config: Dict[str, Any],
         pipeline_builder: PipelineBuilder,
-        source_data: List[Dict[str, Any]]
+        source_data: List[Dict[str, Any]],
+        target_key: Optional[str] = None
     ) -> List[Dict[str, Dict[str, Any]]]:
         """
         Обрабатывает данные для указанного таргета.
@@ -73,6 +101,7 @@ class PipelineExecutor:
             target_config: Конфигурация таргета
             pipeline_builder: Построитель пайплайнов для таргета
             source_data: Исходные данные для обработки
+            target_key: Ключ таргета (для запоминания ROLLBACK между пачками)
             
         Returns:
             Список с обработанными данными для таргета
@@ -86,15 +115,14 @@ class PipelineExecutor:
                 final_frame = await self._process_record(record, target_config, pipeline_builder)
                 if final_frame:
                     warehouse.append(final_frame)
-            except EventSkipException as e:
-                # Пропускаем текущую запись
-                if self.notifier:
-                    self.notifier.warning(f"Пропуск записи: {str(e)}")
+            except EventSkipException:
+                # Пропускаем текущую запись (о пропуске уже сообщило событие SKIP)
                 continue
             except EventRollbackException as e:
                 # Прерываем весь процесс ETL
                 if self.notifier:
                     self.notifier.critical(f"Отмена процесса ETL: {str(e)}")
+                self.rolled_back_targets.add(target_key)
                 break
         
         return warehouse
@@ -184,9 +212,10 @@ class PipelineExecutor:
         else:
             # Выполняем пайплайн
             try:
+                notifier = self._route_notifier(pipeline_builder, source_name)
                 final_value = input_value
                 for step in pipeline:
-                    final_value = await step.execute(final_value, final_frame, self.notifier)
+                    final_value = await step.execute(final_value, final_frame, notifier)
             except Exception as e:
                 # Обрабатываем ошибки выполнения пайплайна
                 if not isinstance(e, (EventSkipException, EventRollbackException)):
@@ -197,16 +226,40 @@ class PipelineExecutor:
         final_frame[final_name] = {
             'source_name': source_name,
             'final_type': final_type,
-            'final_value': self._cast_value(final_value, final_type)
+            'final_value': self._cast_value(final_value, final_type, pipeline_builder.target_key, source_name)
         }
     
-    def _cast_value(self, value: Any, type_name: Optional[str]) -> Any:
+    def _route_notifier(self, pipeline_builder: PipelineBuilder, source_name: str) -> Optional[RouteNotifier]:
+        """Возвращает нотификатор маршрута (создается один раз на маршрут)"""
+        if self.notifier is None and self.metrics is None:
+            return None
+        key = (id(pipeline_builder), source_name)
+        notifier = self._route_notifiers.get(key)
+        if notifier is None:
+            target_key = pipeline_builder.target_key
+            route = f"{target_key}: {source_name}" if target_key else source_name
+            if self.metrics is not None:
+                notifier = MetricsNotifier(self.notifier, route, self.metrics, target_key, source_name)
+            else:
+                notifier = RouteNotifier(self.notifier, route)
+            self._route_notifiers[key] = notifier
+        return notifier
+    
+    def _cast_value(
+        self,
+        value: Any,
+        type_name: Optional[str],
+        target_key: Optional[str] = None,
+        source_name: Optional[str] = None
+    ) -> Any:
         """
         Преобразует значение к указанному типу.
         
         Args:
             value: Значение для преобразования
             type_name: Имя типа
+            target_key: Ключ таргета (для счетчика замен значением по умолчанию)
+            source_name: Имя исходного поля (для счетчика замен значением по умолчанию)
             
         Returns:
             Преобразованное значение
@@ -236,6 +289,8 @@ class PipelineExecutor:
                 return value
         except (ValueError, TypeError):
             # В случае ошибки преобразования возвращаем значение по умолчанию для типа
+            if self.metrics is not None:
+                self.metrics.inc("dtrt_cast_fallbacks_total", target=target_key, route=source_name, type=type_name)
             if type_name == "int":
                 return 0
             elif type_name == "float":
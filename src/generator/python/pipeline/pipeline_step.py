@@ -7,6 +7,48 @@ import os
 import sys
 import importlib.util
 
+from src.generator.python.exeptions import EventSkipException, EventRollbackException
+
+
+_CONTEXT_PARAMS = {}
+
+
+def _accepts_context(func: Callable) -> bool:
+    """Проверяет, объявляет ли функция параметр context (результат кэшируется по коду функции)"""
+    key = getattr(func, "__code__", func)
+    if key not in _CONTEXT_PARAMS:
+        try:
+            _CONTEXT_PARAMS[key] = "context" in inspect.signature(func).parameters
+        except (TypeError, ValueError):
+            _CONTEXT_PARAMS[key] = False
+    return _CONTEXT_PARAMS[key]
+
+
+def _function_names(step_data: Dict[str, Any]) -> List[str]:
+    """Возвращает имена функций, вызываемых шагом и ветками его условия"""
+    names = []
+    if step_data.get("type") == "py_func":
+        match = re.match(r"([a-zA-Z0-9_]+)", step_data.get("full_str", "").lstrip("*"))
+        if match:
+            names.append(match.group(1))
+    for value in step_data.values():
+        if isinstance(value, dict):
+            names.extend(name for name in _function_names(value) if name not in names)
+    return names
+
+
+def _function_origin(func_name: str, func: Optional[Callable]) -> str:
+    """Описывает, откуда загружена функция шага"""
+    if func_name in ("get", "s1"):
+        return "встроенная"
+    if func is None or (getattr(func, "__name__", "") == "<lambda>" and func.__module__ == __name__):
+        return "не найдена: значение передается без изменений"
+    try:
+        location = f"{inspect.getsourcefile(func)}:{func.__code__.co_firstlineno}"
+    except (TypeError, AttributeError):
+        location = "?"
+    return f"{func.__module__}.{func.__qualname__} ({location})"
+
 
 class StepType(Enum):
     """Типы шагов пайплайна"""
@@ -38,7 +80,8 @@ class PipelineStep:
         step_data: Dict[str, Any],
         step_number: int,
         std_functions_path: str,
-        user_functions_path: Optional[str] = None
+        user_functions_path: Optional[str] = None,
+        context: Optional[Any] = None
     ):
         """
         Инициализирует шаг пайплайна.
@@ -48,11 +91,13 @@ class PipelineStep:
             step_number: Номер шага в пайплайне
             std_functions_path: Путь к стандартным функциям
             user_functions_path: Путь к пользовательским функциям
+            context: Контекст запуска для функций с параметром context
         """
         self.step_data = step_data
         self.step_number = step_number
         self.std_functions_path = std_functions_path
         self.user_functions_path = user_functions_path
+        self.context = context
         self.type = self._determine_step_type()
         
     def _determine_step_type(self) -> StepType:
@@ -88,7 +133,7 @@ class PipelineStep:
         if self.type == StepType.PYTHON_FUNCTION:
             return await self._execute_python_function(input_value, final_frame)
         elif self.type == StepType.CONDITION:
-            return await self._execute_condition(input_value, final_frame)
+            return await self._execute_condition(input_value, final_frame, notifier)
         elif self.type == StepType.EVENT:
             return await self._execute_event(input_value, final_frame, notifier)
         else:
@@ -139,16 +184,20 @@ class PipelineStep:
             parsed_params = self._prepare_arguments(param, final_frame)
             args.extend(parsed_params)
         
+        # Функции, объявившие параметр context, получают контекст запуска
+        kwargs = {"context": self.context} if self.context is not None and _accepts_context(func) else {}
+        
         # Выполнение функции (может быть асинхронной или синхронной)
         if inspect.iscoroutinefunction(func):
-            return await func(*args)
+            return await func(*args, **kwargs)
         else:
-            return func(*args)
+            return func(*args, **kwargs)
     
     async def _execute_condition(
         self,
         input_value: Any,
-        final_frame: Dict[str, Dict[str, Any]]
+        final_frame: Dict[str, Dict[str, Any]],
+        notifier: Optional[Any] = None
     ) -> Any:
         """
         Выполняет условную конструкцию.
@@ -156,6 +205,7 @@ class PipelineStep:
         Args:
             input_value: Входное значение
             final_frame: Текущий кадр результатов
+            notifier: Объект для отправки уведомлений о событиях в ветках
 
         Returns:
             Результат выполнения условия
@@ -180,9 +230,13 @@ class PipelineStep:
                         action_data, 
                         self.step_number, 
                         self.std_functions_path,
-                        self.user_functions_path
+                        self.user_functions_path,
+                        self.context
                     )
-                    return await action_step.execute(input_value, final_frame)
+                    return await action_step.execute(input_value, final_frame, notifier)
+            except (EventSkipException, EventRollbackException):
+                # События из веток условия должны дойти до исполнителя
+                raise
             except Exception as e:
                 # В случае ошибки просто возвращаем входное значение
                 pass
@@ -208,9 +262,10 @@ class PipelineStep:
                         action_data, 
                         self.step_number, 
                         self.std_functions_path,
-                        self.user_functions_path
+                        self.user_functions_path,
+                        self.context
                     )
-                    return await action_step.execute(input_value, final_frame)
+                    return await action_step.execute(input_value, final_frame, notifier)
                 else:
                     # Выполняем действие else
                     action_data = else_data.get("do", {})
@@ -218,9 +273,13 @@ class PipelineStep:
                         action_data, 
                         self.step_number, 
                         self.std_functions_path,
-                        self.user_functions_path
+                        self.user_functions_path,
+                        self.context
                     )
-                    return await action_step.execute(input_value, final_frame)
+                    return await action_step.execute(input_value, final_frame, notifier)
+            except (EventSkipException, EventRollbackException):
+                # События из веток условия должны дойти до исполнителя
+                raise
             except Exception as e:
                 # В случае ошибки просто возвращаем входное значение
                 pass
@@ -245,9 +304,10 @@ class PipelineStep:
                         action_data, 
                         self.step_number, 
                         self.std_functions_path,
-                        self.user_functions_path
+                        self.user_functions_path,
+                        self.context
                     )
-                    return await action_step.execute(input_value, final_frame)
+                    return await action_step.execute(input_value, final_frame, notifier)
                 
                 # Проверяем все elif блоки
                 elif_index = 1
@@ -267,9 +327,12 @@ class PipelineStep:
                                 action_data, 
                                 self.step_number, 
                                 self.std_functions_path,
-                                self.user_functions_path
+                                self.user_functions_path,
+                                self.context
                             )
-                            return await action_step.execute(input_value, final_frame)
+                            return await action_step.execute(input_value, final_frame, notifier)
+                    except (EventSkipException, EventRollbackException):
+                        raise
                     except Exception:
                         pass
                     
@@ -283,10 +346,14 @@ class PipelineStep:
                         action_data, 
                         self.step_number, 
                         self.std_functions_path,
-                        self.user_functions_path
+                        self.user_functions_path,
+                        self.context
                     )
-                    return await action_step.execute(input_value, final_frame)
+                    return await action_step.execute(input_value, final_frame, notifier)
                 
+            except (EventSkipException, EventRollbackException):
+                # События из веток условия должны дойти до исполнителя
+                raise
             except Exception as e:
                 # В случае ошибки просто возвращаем входное значение
                 pass
@@ -314,8 +381,6 @@ class PipelineStep:
         Returns:
             Результат обработки события
         """
-        from src.generator.python.exeptions import EventSkipException, EventRollbackException
-        
         sub_type = self.step_data.get("sub_type", "")
         message = self.step_data.get("param", "")
         
@@ -336,6 +401,25 @@ class PipelineStep:
         # Для NOTIFY и других типов просто возвращаем входное значение
         return input_value
     
+    def describe(self) -> Dict[str, Any]:
+        """
+        Описывает шаг для плана выполнения: тип, выражение и функции,
+        к которым разрешаются вызовы шага (в том числе в ветках условия).
+
+        Returns:
+            Словарь с номером, типом, выражением и списком функций
+        """
+        functions = []
+        for func_name in _function_names(self.step_data):
+            func = self._load_function(func_name)
+            functions.append({"name": func_name, "resolved": _function_origin(func_name, func)})
+        return {
+            "step": self.step_number,
+            "type": self.type.value,
+            "expression": self.step_data.get("full_str", ""),
+            "functions": functions,
+        }
+    
     def _load_function(self, func_name: str) -> Optional[Callable]:
         """
         Загружает функцию из пользовательских или стандартных модулей.
@@ -356,9 +440,8 @@ class PipelineStep:
         if self.user_functions_path:
             try:
                 # Пытаемся найти файл с функцией в папке пользовательских функций
-                import os
-                import sys
-                import importlib.util
+                # (модули os и importlib импортированы на уровне модуля: локальный импорт
+                # делал importlib локальным именем и ломал поиск стандартных функций)
                 
                 # Если указан относительный путь, добавляем текущую директорию
                 if not os.path.isabs(self.user_functions_path):
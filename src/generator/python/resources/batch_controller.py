@@ -0,0 +1,142 @@
+from typing import Dict, Any, Optional
+import sys
+
+
+# Параметры, которыми в source_config/target_config настраивается адаптивный размер пачки
+ADAPTIVE_OPTIONS = ("adaptive_batch", "min_batch_size", "max_batch_size", "memory_budget", "target_latency")
+
+
+def estimate_row_bytes(row: Any) -> int:
+    """Грубо оценивает размер одной строки (словаря или кортежа) в памяти"""
+    values = row.values() if isinstance(row, dict) else row
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
+
+
+class BatchSizeController:
+    """
+    Адаптивный размер пачки по схеме AIMD.
+
+    Getter источника и writer'ы таргетов сообщают после каждой пачки ее
+    размер, время обработки и пример строки. Пока пропускная способность
+    (строк в секунду) не падает больше чем на tolerance от лучшей, размер
+    растет аддитивно на step; при ее падении или превышении target_latency
+    размер уменьшается мультипликативно. Размер всегда лежит в
+    [min_size, max_size] и не превышает memory_budget, деленный на
+    оценку размера строки.
+    """
+
+    def __init__(
+        self,
+        initial: int = 1000,
+        min_size: int = 100,
+        max_size: int = 100000,
+        step: Optional[int] = None,
+        decrease: float = 0.5,
+        tolerance: float = 0.1,
+        target_latency: Optional[float] = None,
+        memory_budget: Optional[int] = None
+    ):
+        """
+        Args:
+            initial: Начальный размер пачки
+            min_size: Минимальный размер пачки
+            max_size: Максимальный размер пачки
+            step: Аддитивное увеличение (по умолчанию начальный размер)
+            decrease: Множитель уменьшения
+            tolerance: Допустимое падение пропускной способности относительно лучшей
+            target_latency: Максимальное время обработки одной пачки в секундах
+            memory_budget: Бюджет памяти одной пачки в байтах
+        """
+        if min_size < 1 or max_size < min_size:
+            raise ValueError(f"Некорректные границы размера пачки: {min_size}..{max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.step = max(1, step or initial)
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.target_latency = target_latency
+        self.memory_budget = memory_budget
+        self.bytes_per_row = None
+        self.size = self._clamp(initial)
+        self.smallest = self.largest = self.size
+        self.batches = self.rows = self.increases = self.decreases = 0
+        self.seconds = 0.0
+        self._best = None
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any], initial: Optional[int] = None) -> Optional["BatchSizeController"]:
+        """
+        Создает контроллер по параметрам source_config/target_config.
+
+        Returns:
+            Контроллер или None, если adaptive_batch не включен
+        """
+        if not options.get("adaptive_batch"):
+            return None
+        min_size = options.get("min_batch_size", 100)
+        return cls(
+            initial=initial or options.get("batch_size") or 1000,
+            min_size=min_size,
+            max_size=options.get("max_batch_size", max(100000, min_size)),
+            target_latency=options.get("target_latency"),
+            memory_budget=options.get("memory_budget")
+        )
+
+    def _clamp(self, size: int) -> int:
+        limit = self.max_size
+        if self.memory_budget and self.bytes_per_row:
+            limit = min(limit, int(self.memory_budget // self.bytes_per_row))
+        return max(self.min_size, min(limit, int(size)))
+
+    def record(self, rows: int, seconds: float, sample: Any = None) -> int:
+        """
+        Учитывает обработанную пачку и пересчитывает размер следующей.
+
+        Args:
+            rows: Количество строк в пачке
+            seconds: Время обработки пачки
+            sample: Пример строки пачки для оценки расхода памяти
+
+        Returns:
+            Размер следующей пачки
+        """
+        if rows <= 0:
+            return self.size
+        self.batches += 1
+        self.rows += rows
+        self.seconds += seconds
+        if sample is not None:
+            self.bytes_per_row = estimate_row_bytes(sample)
+
+        # Слишком быстрые пачки не дают осмысленной оценки пропускной способности
+        throughput = rows / seconds if seconds > 0 else None
+        congested = (
+            (self.target_latency is not None and seconds > self.target_latency)
+            or (throughput is not None and self._best is not None and throughput < self._best * (1 - self.tolerance))
+        )
+        if congested:
+            self.size = self._clamp(self.size * self.decrease)
+            self._best = throughput
+            self.decreases += 1
+        else:
+            self.size = self._clamp(self.size + self.step)
+            if throughput is not None:
+                self._best = max(self._best or 0.0, throughput)
+            self.increases += 1
+
+        self.smallest = min(self.smallest, self.size)
+        self.largest = max(self.largest, self.size)
+        return self.size
+
+    def stats(self) -> Dict[str, Any]:
+        """Возвращает выбранные размеры пачек для отчета о запуске"""
+        return {
+            "size": self.size,
+            "smallest": self.smallest,
+            "largest": self.largest,
+            "batches": self.batches,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "rows_per_second": self.rows / self.seconds if self.seconds else None,
+            "bytes_per_row": self.bytes_per_row,
+        }
@@ -0,0 +1,95 @@
+from typing import Dict, Any, Optional
+import asyncio
+import asyncpg
+
+
+class PoolManager:
+    """
+    Общие пулы соединений на время одного запуска ETL.
+
+    Для каждой базы (DSN без пароля) создается один пул asyncpg, который
+    используют getter источника, writer'ы таргетов и пользовательские
+    функции. Пулы закрывает только сам менеджер в конце запуска.
+    """
+
+    def __init__(self):
+        self.pools = {}
+        self.requests = {}
+        self._locks = {}
+
+    @staticmethod
+    def pool_key(db_config: Dict[str, Any]) -> str:
+        """Возвращает ключ пула: DSN без пароля"""
+        return (
+            f"postgresql://{db_config.get('user', 'postgres')}@{db_config.get('host', 'localhost')}:"
+            f"{db_config.get('port', 5432)}/{db_config.get('database', 'postgres')}"
+        )
+
+    async def get_pool(self, db_config: Optional[Dict[str, Any]] = None, min_max_size: int = 1) -> Any:
+        """
+        Возвращает пул для базы, создавая его при первом обращении.
+
+        Args:
+            db_config: Конфигурация подключения к базе данных
+            min_max_size: Сколько соединений нужно потребителю одновременно
+
+        Returns:
+            Пул соединений asyncpg
+        """
+        db_config = db_config or {}
+        key = self.pool_key(db_config)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self.pools:
+                self.pools[key] = await asyncpg.create_pool(
+                    user=db_config.get('user', 'postgres'),
+                    password=db_config.get('password', ''),
+                    database=db_config.get('database', 'postgres'),
+                    host=db_config.get('host', 'localhost'),
+                    port=db_config.get('port', 5432),
+                    min_size=db_config.get('min_connections', 1),
+                    max_size=max(min_max_size, db_config.get('max_connections', 10))
+                )
+        self.requests[key] = self.requests.get(key, 0) + 1
+        return self.pools[key]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает состояние пулов для отчета о запуске"""
+        return {
+            key: {
+                "requests": self.requests.get(key, 0),
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size(),
+            }
+            for key, pool in self.pools.items()
+        }
+
+    async def close(self) -> None:
+        """Закрывает все пулы"""
+        pools, self.pools = self.pools, {}
+        for pool in pools.values():
+            await pool.close()
+
+
+class RunContext:
+    """
+    Контекст запуска, передаваемый пользовательским функциям.
+
+    Функция получает его, если объявляет параметр context:
+
+        async def func(value, context=None):
+            pool = await context.get_pool()
+            async with pool.acquire() as conn:
+                ...
+    """
+
+    def __init__(self, pool_manager: PoolManager, db_config: Optional[Dict[str, Any]] = None, notifier: Optional[Any] = None):
+        self.pool_manager = pool_manager
+        self.db_config = db_config or {}
+        self.notifier = notifier
+
+    async def get_pool(self, db_config: Optional[Dict[str, Any]] = None) -> Any:
+        """Возвращает общий пул (по умолчанию для db_config запуска)"""
+        return await self.pool_manager.get_pool(db_config or self.db_config)
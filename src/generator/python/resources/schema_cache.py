@@ -0,0 +1,60 @@
+from typing import Dict, Any, Optional
+import json
+import os
+import tempfile
+import time
+
+
+class SchemaCache:
+    """
+    Кэш схем целевых таблиц в локальном JSON-файле.
+
+    Ключ — DSN базы (без пароля) и имя таблицы, значение — столбцы таблицы
+    с их типами PostgreSQL. Запись старше ttl секунд считается устаревшей,
+    и схема читается из базы заново.
+    """
+
+    def __init__(self, path: str = ".dtrt_schema_cache.json", ttl: float = 3600.0):
+        self.path = path
+        self.ttl = ttl
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Поврежденный кэш не мешает запуску: схема будет прочитана из базы
+            return {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """Атомарно перезаписывает файл кэша"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".dtrt_schema_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Возвращает столбцы {имя: тип} или None, если записи нет или она устарела"""
+        entry = self._read().get(key)
+        if not entry or time.time() - entry.get("loaded_at", 0) > self.ttl:
+            return None
+        return entry["columns"]
+
+    def set(self, key: str, columns: Dict[str, str]) -> None:
+        """Сохраняет столбцы таблицы"""
+        data = self._read()
+        data[key] = {"columns": columns, "loaded_at": time.time()}
+        self._write(data)
+
+    def invalidate(self, key: str) -> None:
+        """Удаляет запись о таблице (например, после изменения ее структуры)"""
+        data = self._read()
+        if data.pop(key, None) is not None:
+            self._write(data)
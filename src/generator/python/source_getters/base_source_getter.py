@@ -0,0 +1,102 @@
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Tuple
+from abc import ABC, abstractmethod
+
+from src.generator.python.source_getters.skip_predicate import SkipPredicate
+
+
+class BaseSourceGetter(ABC):
+    """
+    Базовый интерфейс getter'а источника данных.
+
+    Getter получает проекцию (список необходимых полей) и необязательный
+    предикат пропуска записей. Getter'ы, которые умеют применять их при
+    чтении (supports_pushdown), вовсе не читают пропускаемые записи,
+    остальные отбрасывают их в памяти через filter_batch до выполнения
+    пайплайнов. Также применяется водяной знак инкрементального чтения:
+    читаются только записи, у которых поле водяного знака больше сохраненного.
+
+    Чтение пачками объявляют наследники: синхронные getter'ы —
+    SyncSourceGetter, асинхронные — AsyncSourceGetter. Если задан
+    batch_controller, размер каждой следующей пачки берется у него.
+    """
+
+    supports_pushdown = False
+    batch_controller = None
+
+    def __init__(
+        self,
+        required_keys: List[str],
+        predicate: Optional[SkipPredicate] = None,
+        watermark: Optional[Tuple[str, Any]] = None
+    ):
+        """
+        Args:
+            required_keys: Список необходимых полей (проекция)
+            predicate: Предикат записей, которые пропустят все таргеты
+            watermark: Кортеж (поле, последнее обработанное значение)
+        """
+        self.required_keys = list(dict.fromkeys(required_keys))
+        self.predicate = predicate
+        self.watermark = watermark
+        self.report = None
+
+    def filter_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        apply_watermark: bool = True,
+        apply_predicate: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Отбрасывает записи пачки, которые не нужно обрабатывать.
+
+        Args:
+            batch: Пачка записей
+            apply_watermark: Фильтровать по водяному знаку (False, если это сделал источник)
+            apply_predicate: Фильтровать по предикату пропуска (False, если это сделал источник)
+        """
+        if apply_watermark and self.watermark is not None:
+            field, value = self.watermark
+            batch = [record for record in batch if record.get(field) is not None and record[field] > value]
+        if apply_predicate and self.predicate is not None:
+            batch = [record for record in batch if not self.predicate.matches(record)]
+        return batch
+
+    def next_batch_size(self, default: int) -> int:
+        """Возвращает размер следующей пачки: выбранный контроллером или заданный"""
+        if self.batch_controller is not None:
+            return self.batch_controller.size
+        return default
+
+    def watermark_sql(self, quote, dialect: str, params: List[Any]) -> Optional[str]:
+        """Формирует SQL-условие водяного знака (дополняет params)"""
+        if self.watermark is None:
+            return None
+        field, value = self.watermark
+        params.append(value)
+        placeholder = f"${len(params)}" if dialect == "postgres" else f"?{len(params)}"
+        return f"{quote(field)} > {placeholder}"
+
+
+
+class SyncSourceGetter(BaseSourceGetter):
+    """Getter, который читает источник синхронно (в потоке упреждающей загрузки)"""
+
+    @abstractmethod
+    def iter_batches(self, batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Отдает данные источника пачками"""
+
+
+class AsyncSourceGetter(BaseSourceGetter):
+    """Getter, который открывается, читает и закрывается в цикле событий"""
+
+    @abstractmethod
+    async def open(self) -> None:
+        """Подключается к источнику и проверяет его (заполняет report)"""
+
+    @abstractmethod
+    def aiter_batches(self, batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Отдает данные источника пачками"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Освобождает соединения с источником"""
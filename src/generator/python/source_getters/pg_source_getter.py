@@ -0,0 +1,250 @@
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+import asyncio
+import asyncpg
+
+from src.generator.python.source_getters.base_source_getter import AsyncSourceGetter
+from src.generator.python.source_getters.skip_predicate import SkipPredicate
+
+
+class PgSourceGetter(AsyncSourceGetter):
+    """Getter для потокового чтения данных из PostgreSQL через серверные курсоры"""
+
+    supports_pushdown = True
+
+    def __init__(
+        self,
+        source_name: str,
+        required_keys: List[str],
+        predicate: Optional[SkipPredicate] = None,
+        watermark: Optional[Tuple[str, Any]] = None,
+        db_config: Optional[Dict[str, Any]] = None,
+        batch_size: int = 10000,
+        prefetch: int = 1000,
+        partitions: int = 1,
+        partition_key: Optional[str] = None,
+        queue_size: int = 4,
+        pool_manager: Optional[Any] = None
+    ):
+        """
+        Инициализирует PostgreSQL getter.
+
+        Args:
+            source_name: Имя таблицы в формате "schema.table"
+            required_keys: Список необходимых полей (проекция)
+            predicate: Предикат пропуска, применяемый в WHERE
+            watermark: Кортеж (поле, значение): читаются только строки с полем больше значения
+            db_config: Конфигурация подключения к базе данных
+            batch_size: Количество записей в одной отдаваемой пачке
+            prefetch: Количество строк, подгружаемых курсором за один запрос к серверу
+            partitions: Количество диапазонов ключа, читаемых параллельно
+            partition_key: Числовой столбец для разбиения на диапазоны (обязателен при partitions > 1)
+            queue_size: Сколько готовых пачек может ожидать обработки
+            pool_manager: Общий менеджер пулов запуска (иначе getter создает свой пул)
+        """
+        super().__init__(required_keys, predicate, watermark)
+        self.source_name = source_name
+        self.db_config = db_config or {}
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.partitions = max(1, partitions)
+        self.partition_key = partition_key
+        self.queue_size = queue_size
+        self.pool_manager = pool_manager
+        self.schema, self.table = self._parse_schema_table(source_name)
+        self.connection_pool = None
+        self.column_types = {}
+
+        if self.partitions > 1 and not partition_key:
+            raise ValueError("Для параллельного чтения необходимо указать partition_key")
+
+    def _parse_schema_table(self, schema_table: str) -> tuple:
+        """Разбирает имя таблицы на схему и таблицу"""
+        parts = schema_table.split('.')
+        if len(parts) == 2:
+            return parts[0], parts[1]
+        return 'public', parts[0]
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Экранирует идентификатор PostgreSQL"""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @property
+    def relation(self) -> str:
+        return f"{self._quote(self.schema)}.{self._quote(self.table)}"
+
+    async def connect(self) -> None:
+        """Создает пул соединений: по одному соединению на каждую партицию"""
+        if not self.connection_pool and self.pool_manager:
+            self.connection_pool = await self.pool_manager.get_pool(self.db_config, self.partitions)
+        if not self.connection_pool:
+            self.connection_pool = await asyncpg.create_pool(
+                user=self.db_config.get('user', 'postgres'),
+                password=self.db_config.get('password', ''),
+                database=self.db_config.get('database', 'postgres'),
+                host=self.db_config.get('host', 'localhost'),
+                port=self.db_config.get('port', 5432),
+                min_size=self.db_config.get('min_connections', 1),
+                max_size=max(self.partitions, self.db_config.get('max_connections', 10))
+            )
+
+    async def open(self) -> None:
+        """Подключается к базе и проверяет наличие необходимых столбцов"""
+        await self.connect()
+        self.report = await self._run_validation()
+
+    async def close(self) -> None:
+        """Закрывает пул соединений с базой данных (общий пул закрывает менеджер)"""
+        if self.connection_pool:
+            if not self.pool_manager:
+                await self.connection_pool.close()
+            self.connection_pool = None
+
+    async def _run_validation(self) -> Dict[str, Any]:
+        async with self.connection_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT column_name, udt_name
+                FROM information_schema.columns
+                WHERE table_schema = $1 AND table_name = $2
+                """,
+                self.schema, self.table
+            )
+            columns = {row['column_name'] for row in rows}
+            # Типы столбцов нужны, чтобы переводить в SQL только сравнения с литералом того же вида
+            self.column_types = {row['column_name']: row['udt_name'] for row in rows}
+            missing_keys = [key for key in self.required_keys if key not in columns]
+
+            if not missing_keys:
+                return {
+                    "source": "postgres",
+                    "fully_valid": True,
+                    "total_received": None,
+                    "valid_count": None,
+                    "invalid_count": 0,
+                    "percent_valid": 100.0,
+                    "invalid_examples": []
+                }
+
+            total = await conn.fetchval(f"SELECT COUNT(*) FROM {self.relation}") if columns else 0
+
+        return {
+            "source": "postgres",
+            "fully_valid": False,
+            "total_received": total,
+            "valid_count": 0,
+            "invalid_count": total,
+            "percent_valid": 0.0,
+            "invalid_examples": [{"index": 0, "missing_keys": missing_keys}] if total else []
+        }
+
+    def build_query(self, key_range: Tuple[Any, ...] = (), null_keys: bool = False) -> Tuple[str, List[Any], bool]:
+        """
+        Формирует запрос с проекцией, предикатом и, при необходимости, диапазоном ключа.
+
+        Args:
+            key_range: Диапазон partition_key [начало, конец) для партиции
+            null_keys: Читать только строки с пустым partition_key (они не попадают ни в один диапазон)
+
+        Returns:
+            Кортеж (запрос, параметры, применен ли предикат в WHERE)
+        """
+        projection = ", ".join(self._quote(key) for key in self.required_keys) or "*"
+        conditions = []
+        params = list(key_range)
+        if key_range:
+            key = self._quote(self.partition_key)
+            conditions.append(f"{key} >= $1 AND {key} < $2")
+        if null_keys:
+            conditions.append(f"{self._quote(self.partition_key)} IS NULL")
+        watermark_sql = self.watermark_sql(self._quote, "postgres", params)
+        if watermark_sql:
+            conditions.append(watermark_sql)
+
+        pushed_down = False
+        if self.predicate is not None:
+            skip_sql = self.predicate.to_sql(self._quote, "postgres", params, self.column_types)
+            if skip_sql is not None:
+                conditions.append(f"NOT {skip_sql}")
+                pushed_down = True
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return f"SELECT {projection} FROM {self.relation}{where}", params, pushed_down
+
+    async def _partition_ranges(self) -> List[Tuple[int, int]]:
+        """Делит диапазон значений partition_key на равные части"""
+        key = self._quote(self.partition_key)
+        async with self.connection_pool.acquire() as conn:
+            low, high = await conn.fetchrow(f"SELECT MIN({key}), MAX({key}) FROM {self.relation}")
+        if low is None:
+            return []
+
+        step = (high - low) // self.partitions + 1
+        return [(low + i * step, low + (i + 1) * step) for i in range(self.partitions)]
+
+    async def _read_partition(
+        self, queue: asyncio.Queue, key_range: Tuple[Any, ...], batch_size: int, null_keys: bool = False
+    ) -> None:
+        """Читает одну партицию серверным курсором и кладет пачки в очередь"""
+        query, params, pushed_down = self.build_query(key_range, null_keys)
+        async with self.connection_pool.acquire() as conn:
+            # Серверный курсор в PostgreSQL существует только внутри транзакции
+            async with conn.transaction(readonly=True):
+                batch = []
+                limit = self.next_batch_size(batch_size)
+                async for record in conn.cursor(query, *params, prefetch=self.prefetch):
+                    batch.append(dict(record))
+                    if len(batch) >= limit:
+                        await queue.put(self.filter_batch(batch, apply_watermark=False, apply_predicate=not pushed_down))
+                        batch = []
+                        limit = self.next_batch_size(batch_size)
+                if batch:
+                    await queue.put(self.filter_batch(batch, apply_watermark=False, apply_predicate=not pushed_down))
+
+    async def aiter_batches(self, batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Потоково читает источник пачками.
+
+        Партиции читаются фоновыми задачами по отдельным соединениям пула,
+        поэтому чтение следующих пачек идет параллельно с их обработкой.
+        Строки с пустым partition_key читаются отдельной партицией.
+
+        Args:
+            batch_size: Размер пачки (по умолчанию self.batch_size)
+
+        Yields:
+            Список записей в виде словарей
+        """
+        await self.connect()
+        size = batch_size or self.batch_size
+        if self.partitions > 1:
+            partitions = [(key_range, False) for key_range in await self._partition_ranges()]
+            partitions.append(((), True))
+        else:
+            partitions = [((), False)]
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        done = object()
+
+        async def worker(key_range, null_keys):
+            try:
+                await self._read_partition(queue, key_range, size, null_keys)
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+
+        tasks = [asyncio.create_task(worker(key_range, null_keys)) for key_range, null_keys in partitions]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
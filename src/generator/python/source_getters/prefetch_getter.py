@@ -0,0 +1,134 @@
+from typing import List, Dict, Any, Optional, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import sys
+import time
+
+
+def estimate_batch_bytes(batch: List[Dict[str, Any]]) -> int:
+    """Грубо оценивает размер пачки в памяти по первой записи"""
+    if not batch:
+        return 0
+    record = batch[0]
+    record_size = sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+    return sys.getsizeof(batch) + record_size * len(batch)
+
+
+class PrefetchGetter:
+    """
+    Обертка упреждающего чтения для любого getter'а источника.
+
+    Пока текущая пачка обрабатывается пайплайнами, следующие пачки уже
+    читаются: синхронные getter'ы (файлы, SQLite) — в отдельном потоке,
+    асинхронные (asyncpg) — фоновой задачей в том же event loop.
+    Количество пачек в полете ограничено depth, их суммарный размер — max_bytes
+    (одна пачка читается всегда, даже если она больше бюджета).
+
+    Остальные атрибуты (report, open, close и т.д.) берутся у обернутого getter'а.
+    """
+
+    def __init__(self, getter: Any, depth: int = 2, max_bytes: Optional[int] = None):
+        """
+        Args:
+            getter: Обертываемый getter источника
+            depth: Сколько прочитанных пачек может ожидать обработки
+            max_bytes: Бюджет памяти на ожидающие пачки (None — без ограничения)
+        """
+        self.getter = getter
+        self.depth = max(1, depth)
+        self.max_bytes = max_bytes
+        self._buffered_bytes = 0
+        self.stats = {
+            "batches": 0,
+            "source_wait_seconds": 0.0,
+            "compute_seconds": 0.0,
+            "read_seconds": 0.0,
+            "max_buffered_bytes": 0,
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.getter, name)
+
+    async def _produce(self, queue: asyncio.Queue, budget: asyncio.Condition, batch_size: Optional[int]) -> None:
+        """Читает пачки источника и складывает их в очередь с учетом бюджета памяти"""
+
+        async def put(batch):
+            size = estimate_batch_bytes(batch)
+            if self.max_bytes is not None:
+                async with budget:
+                    await budget.wait_for(lambda: self._buffered_bytes == 0 or self._buffered_bytes + size <= self.max_bytes)
+            self._buffered_bytes += size
+            self.stats["max_buffered_bytes"] = max(self.stats["max_buffered_bytes"], self._buffered_bytes)
+            await queue.put((batch, size))
+
+        if hasattr(self.getter, 'aiter_batches'):
+            started = time.perf_counter()
+            async for batch in self.getter.aiter_batches(batch_size):
+                self.stats["read_seconds"] += time.perf_counter() - started
+                await put(batch)
+                started = time.perf_counter()
+            return
+
+        # Синхронный getter читается в одном выделенном потоке: итератор
+        # нельзя продвигать из разных потоков одновременно
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dtrt-prefetch")
+        iterator = iter(self.getter.iter_batches(batch_size))
+        finished = object()
+        try:
+            while True:
+                started = time.perf_counter()
+                batch = await loop.run_in_executor(executor, next, iterator, finished)
+                self.stats["read_seconds"] += time.perf_counter() - started
+                if batch is finished:
+                    break
+                await put(batch)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                await loop.run_in_executor(executor, close)
+            executor.shutdown(wait=False)
+
+    async def aiter_batches(self, batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Отдает пачки источника, заранее читая следующие.
+
+        Args:
+            batch_size: Размер пачки, передается обернутому getter'у
+
+        Yields:
+            Список записей в виде словарей
+        """
+        queue = asyncio.Queue(maxsize=self.depth)
+        budget = asyncio.Condition()
+        done = object()
+
+        async def producer():
+            try:
+                await self._produce(queue, budget, batch_size)
+                await queue.put((done, 0))
+            except Exception as e:
+                await queue.put((e, 0))
+
+        task = asyncio.create_task(producer())
+        try:
+            while True:
+                started = time.perf_counter()
+                item, size = await queue.get()
+                self.stats["source_wait_seconds"] += time.perf_counter() - started
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                async with budget:
+                    self._buffered_bytes -= size
+                    budget.notify_all()
+
+                self.stats["batches"] += 1
+                started = time.perf_counter()
+                yield item
+                self.stats["compute_seconds"] += time.perf_counter() - started
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -1,10 +1,20 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from copy import deepcopy
 
-class PydictSourceGetter:
-    def __init__(self, data: List[Dict[str, Any]], required_keys: List[str]):
+from src.generator.python.source_getters.base_source_getter import SyncSourceGetter
+from src.generator.python.source_getters.skip_predicate import SkipPredicate
+
+
+class PydictSourceGetter(SyncSourceGetter):
+    def __init__(
+        self,
+        data: List[Dict[str, Any]],
+        required_keys: List[str],
+        predicate: Optional[SkipPredicate] = None,
+        watermark: Optional[Tuple[str, Any]] = None
+    ):
+        super().__init__(required_keys, predicate, watermark)
         self.data = deepcopy(data)
-        self.required_keys = set(required_keys)
         self.report = self._run_validation()
 
     def _run_validation(self) -> Dict[str, Any]:
@@ -12,10 +22,11 @@ class PydictSourceGetter:
         valid = 0
         invalid = 0
         invalid_examples = []
+        required_keys = set(self.required_keys)
 
         for idx, item in enumerate(self.data):
             item_keys = set(item.keys())
-            missing_keys = list(self.required_keys - item_keys)
+            missing_keys = list(required_keys - item_keys)
 
             if not missing_keys:
                 valid += 1
@@ -39,6 +50,15 @@ class PydictSourceGetter:
             "invalid_examples": invalid_examples
         }
 
+    def iter_batches(self, batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Отдает данные пачками заданного размера (по умолчанию одной пачкой)"""
+        size = batch_size or len(self.data) or 1
+        start = 0
+        while start < len(self.data):
+            end = start + self.next_batch_size(size)
+            yield self.filter_batch(self.data[start:end])
+            start = end
+
 
 # data = [
 #     {"name": "Bob"},
@@ -0,0 +1,278 @@
+from typing import List, Dict, Any, Optional, Tuple
+import ast
+
+
+class SkipCondition:
+    """Условие IF(...): SKIP(...) по одному полю источника"""
+
+    COMPARE_SQL = {
+        ast.Lt: "<",
+        ast.LtE: "<=",
+        ast.Gt: ">",
+        ast.GtE: ">=",
+    }
+    FLIPPED = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE}
+    # Виды значений SQLite (typeof), сравнимые в Python с литералом
+    SQLITE_KINDS = {
+        "bool": ("integer", "real"),
+        "int": ("integer", "real"),
+        "float": ("integer", "real"),
+        "str": ("text",),
+    }
+    # Типы столбцов PostgreSQL (udt_name), к которым привязывается параметр литерала
+    PG_KINDS = {
+        "bool": ("bool",),
+        "int": ("int2", "int4", "int8", "numeric"),
+        "float": ("float4", "float8"),
+        "str": ("text", "varchar"),
+    }
+    ALLOWED_NODES = (
+        ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd, ast.Compare,
+        ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Is, ast.IsNot, ast.In, ast.NotIn,
+        ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List, ast.Set
+    )
+
+    def __init__(self, field: str, expression: str):
+        """
+        Разбирает выражение условия.
+
+        Args:
+            field: Имя поля источника
+            expression: Выражение из IC (например '$this == None')
+
+        Raises:
+            ValueError: Если выражение зависит не только от $this
+        """
+        self.field = field
+        self.expression = expression
+        self.tree = self._parse(expression)
+        self.code = compile(self.tree, f"<skip:{field}>", "eval")
+
+    def _parse(self, expression: str) -> ast.Expression:
+        if "$" in expression.replace("$this", ""):
+            raise ValueError(f"Условие зависит от других переменных: {expression}")
+        try:
+            tree = ast.parse(expression.replace("$this", "this"), mode="eval")
+        except SyntaxError:
+            raise ValueError(f"Условие не является выражением Python: {expression}")
+
+        for node in ast.walk(tree):
+            if not isinstance(node, self.ALLOWED_NODES):
+                raise ValueError(f"Недопустимая конструкция в условии: {expression}")
+            if isinstance(node, ast.Name) and node.id != "this":
+                raise ValueError(f"Недопустимое имя в условии: {node.id}")
+        return tree
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """Проверяет, будет ли запись пропущена (как при выполнении пайплайна)"""
+        try:
+            return bool(eval(self.code, {"__builtins__": {}}, {"this": record.get(self.field)}))
+        except Exception:
+            # В пайплайне ошибка вычисления условия означает, что SKIP не срабатывает
+            return False
+
+    def to_sql(self, column: str, dialect: str, params: List[Any], column_type: Optional[str] = None) -> Optional[str]:
+        """
+        Переводит условие в SQL, повторяя семантику Python.
+
+        Args:
+            column: Экранированное имя столбца
+            dialect: "sqlite" или "postgres"
+            params: Список параметров запроса (дополняется)
+            column_type: Тип столбца PostgreSQL (udt_name); без него в SQL
+                переводятся только сравнения с None
+
+        Returns:
+            SQL-выражение, истинное для пропускаемых строк, или None
+        """
+        try:
+            ok, value = self._node_sql(self.tree.body, column, dialect, params, column_type)
+        except ValueError:
+            return None
+        return f"(CASE WHEN {ok} THEN {value} ELSE FALSE END)"
+
+    # == ТРАНСЛЯЦИЯ В SQL ==
+    # Каждый узел переводится в пару (ok, value): ok ложно, если Python упал бы
+    # на этом узле (например None < 5), value имеет смысл только при истинном ok.
+
+    def _node_sql(
+        self, node: ast.AST, column: str, dialect: str, params: List[Any], column_type: Optional[str]
+    ) -> Tuple[str, str]:
+        if isinstance(node, ast.BoolOp):
+            parts = [self._node_sql(value, column, dialect, params, column_type) for value in node.values]
+            ok, value = parts[-1]
+            for part_ok, part_value in reversed(parts[:-1]):
+                short_circuit = part_value if isinstance(node.op, ast.Or) else f"NOT {part_value}"
+                ok = f"(CASE WHEN NOT {part_ok} THEN FALSE WHEN {short_circuit} THEN TRUE ELSE {ok} END)"
+                joiner = " OR " if isinstance(node.op, ast.Or) else " AND "
+                value = f"({part_value}{joiner}{value})"
+            return ok, value
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            ok, value = self._node_sql(node.operand, column, dialect, params, column_type)
+            return ok, f"(NOT {value})"
+
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            op, left, right = node.ops[0], node.left, node.comparators[0]
+            if isinstance(right, ast.Name) and not isinstance(left, ast.Name):
+                if type(op) not in (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE):
+                    raise ValueError("Неподдерживаемое сравнение")
+                op, left, right = self.FLIPPED.get(type(op), type(op))(), right, left
+            if isinstance(left, ast.Name) and not isinstance(right, ast.Name):
+                return self._compare_sql(op, ast.literal_eval(right), column, dialect, params, column_type)
+
+        raise ValueError("Неподдерживаемое выражение")
+
+    def _compare_sql(
+        self, op: ast.AST, literal: Any, column: str, dialect: str, params: List[Any], column_type: Optional[str]
+    ) -> Tuple[str, str]:
+        if isinstance(op, (ast.Eq, ast.Is, ast.NotEq, ast.IsNot)):
+            if isinstance(literal, (list, tuple, set, dict)):
+                raise ValueError("Сравнение с коллекцией не поддерживается")
+            if isinstance(op, (ast.Is, ast.IsNot)) and literal is not None:
+                raise ValueError("Оператор is поддерживается только для None")
+            negate = isinstance(op, (ast.NotEq, ast.IsNot))
+            if literal is None:
+                return "TRUE", f"({column} IS {'NOT ' if negate else ''}NULL)"
+            equal = self._equal_sql(literal, column, dialect, params, column_type)
+            return "TRUE", f"(NOT {equal})" if negate else equal
+
+        if isinstance(op, (ast.In, ast.NotIn)):
+            if not isinstance(literal, (list, tuple, set)):
+                raise ValueError("Оператор in поддерживается только для коллекций")
+            checks = [
+                f"({column} IS NULL)" if item is None else self._equal_sql(item, column, dialect, params, column_type)
+                for item in literal
+            ]
+            value = "(" + " OR ".join(checks) + ")" if checks else "FALSE"
+            return "TRUE", f"(NOT {value})" if isinstance(op, ast.NotIn) else value
+
+        if type(op) in self.COMPARE_SQL:
+            if literal is None or isinstance(literal, (list, tuple, set, dict)):
+                return "FALSE", "FALSE"
+            # Python сравнивает на больше/меньше только значения одного вида, иначе TypeError
+            guard = self._type_guard(literal, column, dialect, column_type)
+            # Строки в PostgreSQL сравниваются по кодам символов, как в Python
+            collate = ' COLLATE "C"' if dialect == "postgres" and isinstance(literal, str) else ""
+            return guard, f"({column}{collate} {self.COMPARE_SQL[type(op)]} {self._param(literal, dialect, params)})"
+
+        raise ValueError("Неподдерживаемый оператор")
+
+    def _equal_sql(self, literal: Any, column: str, dialect: str, params: List[Any], column_type: Optional[str]) -> str:
+        """Равенство столбца значению: значения другого вида (и NULL) не равны, как в Python"""
+        guard = self._type_guard(literal, column, dialect, column_type)
+        return f"({guard} AND {column} = {self._param(literal, dialect, params)})"
+
+    def _type_guard(self, literal: Any, column: str, dialect: str, column_type: Optional[str]) -> str:
+        """
+        Возвращает SQL-условие, истинное, когда значение столбца того же вида, что и литерал.
+
+        В SQLite вид значения проверяется в каждой строке через typeof: иначе
+        SQLite сравнил бы TEXT с INTEGER там, где Python выдал бы TypeError.
+        В PostgreSQL тип столбца должен совпадать с видом литерала, иначе
+        параметр не привяжется к столбцу.
+
+        Raises:
+            ValueError: Если вид литерала не поддерживается или не совпадает с типом столбца
+        """
+        kind = self._literal_kind(literal)
+        if dialect == "postgres":
+            if column_type not in self.PG_KINDS[kind]:
+                raise ValueError(f"Тип столбца {column_type} не совпадает с видом значения {literal!r}")
+            return f"({column} IS NOT NULL)"
+        return f"(typeof({column}) IN ({', '.join(repr(name) for name in self.SQLITE_KINDS[kind])}))"
+
+    @staticmethod
+    def _literal_kind(literal: Any) -> str:
+        if isinstance(literal, bool):
+            return "bool"
+        if isinstance(literal, (int, float)):
+            return type(literal).__name__
+        if isinstance(literal, str):
+            return "str"
+        raise ValueError(f"Неподдерживаемое значение: {literal!r}")
+
+    @staticmethod
+    def _param(value: Any, dialect: str, params: List[Any]) -> str:
+        # Нумерованные параметры: одно значение может встречаться в SQL несколько раз
+        params.append(value)
+        return f"${len(params)}" if dialect == "postgres" else f"?{len(params)}"
+
+
+class SkipPredicate:
+    """
+    Предикат пропуска записей источника.
+
+    Компилятор выносит в IC (ключ skip_predicates таргета) маршруты, пайплайн
+    которых начинается с безусловного IF(...): SKIP(...) по полю источника.
+    Источник общий для всех таргетов, поэтому запись можно не читать только
+    если ее пропустит каждый таргет: предикат — это И по таргетам от ИЛИ
+    по условиям внутри таргета.
+    """
+
+    def __init__(self, groups: List[List[SkipCondition]]):
+        self.groups = groups
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SkipPredicate"]:
+        """
+        Строит предикат по IC.
+
+        Returns:
+            Предикат или None, если хотя бы один таргет не пропускает записи
+        """
+        groups = []
+        for target_key, target_config in config.items():
+            if target_key == "lang" or target_key == "global_vars" or not isinstance(target_config, dict):
+                continue
+            if "routes" not in target_config:
+                continue
+
+            conditions = []
+            for item in target_config.get("skip_predicates", []):
+                try:
+                    conditions.append(SkipCondition(item["field"], item["exp"]))
+                except ValueError:
+                    continue
+            if not conditions:
+                return None
+            groups.append(conditions)
+
+        return cls(groups) if groups else None
+
+    @property
+    def fields(self) -> List[str]:
+        return list(dict.fromkeys(condition.field for group in self.groups for condition in group))
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """Проверяет, будет ли запись пропущена всеми таргетами"""
+        return all(any(condition.matches(record) for condition in group) for group in self.groups)
+
+    def to_sql(
+        self, quote, dialect: str, params: List[Any], column_types: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """
+        Формирует SQL-условие, истинное для пропускаемых строк.
+
+        Args:
+            quote: Функция экранирования идентификаторов
+            dialect: "sqlite" или "postgres"
+            params: Список параметров запроса (дополняется)
+            column_types: Типы столбцов источника PostgreSQL (udt_name по имени столбца)
+
+        Returns:
+            SQL-условие или None, если хотя бы одно условие не переводится в SQL
+        """
+        predicate_params = list(params)
+        groups_sql = []
+        for group in self.groups:
+            conditions_sql = []
+            for condition in group:
+                column_type = (column_types or {}).get(condition.field)
+                sql = condition.to_sql(quote(condition.field), dialect, predicate_params, column_type)
+                if sql is None:
+                    return None
+                conditions_sql.append(sql)
+            groups_sql.append("(" + " OR ".join(conditions_sql) + ")")
+        params[:] = predicate_params
+        return " AND ".join(groups_sql)
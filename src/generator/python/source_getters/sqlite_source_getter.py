@@ -0,0 +1,197 @@
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from pathlib import Path
+import re
+import sqlite3
+
+from src.generator.python.source_getters.base_source_getter import SyncSourceGetter
+from src.generator.python.source_getters.skip_predicate import SkipPredicate
+
+
+class SqliteSourceGetter(SyncSourceGetter):
+    """Getter для потокового чтения данных из SQLite"""
+
+    QUERY_PREFIX = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+    supports_pushdown = True
+
+    def __init__(
+        self,
+        source_name: str,
+        required_keys: List[str],
+        predicate: Optional[SkipPredicate] = None,
+        watermark: Optional[Tuple[str, Any]] = None,
+        batch_size: int = 10000,
+        partition: Optional[Tuple[int, int]] = None,
+        partition_key: str = "rowid"
+    ):
+        """
+        Инициализирует SQLite getter.
+
+        Args:
+            source_name: Источник в формате "путь/к/базе.db:таблица_или_запрос"
+            required_keys: Список необходимых полей (проекция)
+            predicate: Предикат пропуска, применяемый в WHERE
+            watermark: Кортеж (поле, значение): читаются только строки с полем больше значения
+            batch_size: Количество строк, читаемых за один fetchmany
+            partition: Кортеж (номер, всего) для чтения своей части таблицы
+            partition_key: Числовой ключ для разбиения на диапазоны (по умолчанию rowid)
+        """
+        super().__init__(required_keys, predicate, watermark)
+        self.source_name = source_name
+        self.batch_size = batch_size
+        self.partition = partition
+        self.partition_key = partition_key
+        self.db_path, self.relation = self._parse_source_name(source_name)
+        self.is_query = bool(self.QUERY_PREFIX.match(self.relation))
+        # Источник открывается только для чтения: иначе по опечатке в пути
+        # SQLite создал бы пустую базу. Чтение может идти в потоке упреждающей
+        # загрузки (PrefetchGetter)
+        self.connection = sqlite3.connect(
+            f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        try:
+            self.report = self._run_validation()
+        except BaseException:
+            self.close()
+            raise
+
+    def _parse_source_name(self, source_name: str) -> Tuple[str, str]:
+        """Разбирает имя источника на путь к базе и таблицу/запрос"""
+        query_start = re.search(r":(?=\s*(?:select|with)\b)", source_name, re.IGNORECASE)
+        if query_start:
+            db_path, relation = source_name[:query_start.start()], source_name[query_start.end():]
+        else:
+            db_path, _, relation = source_name.rpartition(":")
+        if not db_path or not relation:
+            raise ValueError(f"Ожидается источник вида 'путь.db:таблица', получено: {source_name}")
+        return db_path, relation
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Экранирует идентификатор SQLite"""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def _from_clause(self) -> str:
+        """Возвращает FROM-часть запроса для таблицы или подзапроса"""
+        if self.is_query:
+            return f"({self.relation}) AS _src"
+        return self._quote(self.relation)
+
+    def _source_columns(self) -> List[str]:
+        """Возвращает список столбцов источника без чтения данных"""
+        cursor = self.connection.execute(f"SELECT * FROM {self._from_clause()} LIMIT 0")
+        return [column[0] for column in cursor.description]
+
+    def _partition_clause(self) -> Tuple[str, List[Any]]:
+        """
+        Формирует условие для диапазона своей партиции.
+
+        Строки с пустым ключом не попадают ни в один диапазон, поэтому их
+        читает последняя партиция.
+        """
+        if not self.partition:
+            return "", []
+
+        index, total = self.partition
+        if total < 1 or not 0 <= index < total:
+            raise ValueError(f"Некорректная партиция: {self.partition}")
+        if self.is_query and self.partition_key == "rowid":
+            raise ValueError("Для запроса необходимо указать partition_key отличный от rowid")
+
+        key = self.partition_key if self.partition_key == "rowid" else self._quote(self.partition_key)
+        low, high = self.connection.execute(
+            f"SELECT MIN({key}), MAX({key}) FROM {self._from_clause()}"
+        ).fetchone()
+        last = index == total - 1
+        if low is None:
+            return (f"{key} IS NULL" if last else "0"), []
+
+        step = (high - low) // total + 1
+        lower = low + index * step
+        upper = lower + step
+        null_keys = f" OR {key} IS NULL" if last else ""
+        return f"({key} >= ? AND {key} < ?{null_keys})", [lower, upper]
+
+    def _run_validation(self) -> Dict[str, Any]:
+        columns = set(self._source_columns())
+        missing_keys = [key for key in self.required_keys if key not in columns]
+
+        if not missing_keys:
+            return {
+                "source": "sqlite",
+                "fully_valid": True,
+                "total_received": None,
+                "valid_count": None,
+                "invalid_count": 0,
+                "percent_valid": 100.0,
+                "invalid_examples": []
+            }
+
+        # Все строки невалидны одинаково, поэтому считаем их только для отчета
+        partition, params = self._partition_clause()
+        where = f" WHERE {partition}" if partition else ""
+        total = self.connection.execute(
+            f"SELECT COUNT(*) FROM {self._from_clause()}{where}", params
+        ).fetchone()[0]
+        return {
+            "source": "sqlite",
+            "fully_valid": False,
+            "total_received": total,
+            "valid_count": 0,
+            "invalid_count": total,
+            "percent_valid": 0.0,
+            "invalid_examples": [{"index": 0, "missing_keys": missing_keys}] if total else []
+        }
+
+    def build_query(self) -> Tuple[str, List[Any], bool]:
+        """
+        Формирует запрос с проекцией только на необходимые поля.
+
+        Returns:
+            Кортеж (запрос, параметры, применен ли предикат в WHERE)
+        """
+        projection = ", ".join(self._quote(key) for key in self.required_keys) or "*"
+        partition, params = self._partition_clause()
+        conditions = [partition] if partition else []
+        watermark_sql = self.watermark_sql(self._quote, "sqlite", params)
+        if watermark_sql:
+            conditions.append(watermark_sql)
+
+        pushed_down = False
+        if self.predicate is not None:
+            skip_sql = self.predicate.to_sql(self._quote, "sqlite", params)
+            if skip_sql is not None:
+                conditions.append(f"NOT {skip_sql}")
+                pushed_down = True
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return f"SELECT {projection} FROM {self._from_clause()}{where}", params, pushed_down
+
+    def iter_batches(self, batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Потоково читает источник пачками через cursor.fetchmany.
+
+        Args:
+            batch_size: Размер пачки (по умолчанию self.batch_size)
+
+        Yields:
+            Список записей в виде словарей
+        """
+        query, params, pushed_down = self.build_query()
+        cursor = self.connection.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        size = batch_size or self.batch_size
+        try:
+            while True:
+                rows = cursor.fetchmany(self.next_batch_size(size))
+                if not rows:
+                    break
+                batch = [dict(zip(columns, row)) for row in rows]
+                yield self.filter_batch(batch, apply_watermark=False, apply_predicate=not pushed_down)
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        """Закрывает соединение с базой"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,74 @@
+from typing import Dict, Any, List, Optional
+import math
+
+
+class BloomFilter:
+    """
+    Фильтр Блума для ключей-хэшей (bytes длиной не меньше 16).
+
+    Позиции битов получаются двойным хэшированием из двух половин ключа,
+    поэтому ключ не хэшируется повторно. Размер битового массива
+    подбирается по ожидаемому количеству ключей и доле ложных срабатываний
+    и ограничивается max_bytes (доля ложных срабатываний тогда растет).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, max_bytes: Optional[int] = None):
+        """
+        Args:
+            capacity: Ожидаемое количество ключей
+            error_rate: Допустимая доля ложных срабатываний
+            max_bytes: Ограничение размера битового массива в байтах
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"Доля ложных срабатываний должна быть в (0, 1): {error_rate}")
+        capacity = max(1, capacity)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        if max_bytes:
+            bits = min(bits, max(8, max_bytes * 8))
+        self.capacity = capacity
+        self.bits = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self.array = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes) -> List[int]:
+        first = int.from_bytes(key[:8], "little")
+        second = int.from_bytes(key[8:16], "little") | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: bytes) -> bool:
+        array = self.array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key: bytes) -> bool:
+        """
+        Добавляет ключ.
+
+        Returns:
+            True, если ключа точно не было (хотя бы один бит был сброшен)
+        """
+        array = self.array
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not array[position >> 3] & mask:
+                array[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def add_many(self, keys: List[bytes]) -> List[bool]:
+        """Добавляет ключи; для каждого возвращает, был ли он новым"""
+        return [self.add(key) for key in keys]
+
+    @property
+    def error_rate(self) -> float:
+        """Оценка доли ложных срабатываний при текущем заполнении"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def stats(self) -> Dict[str, Any]:
+        return {"bytes": len(self.array), "hashes": self.hashes, "error_rate": self.error_rate}
+
+    def close(self) -> None:
+        pass
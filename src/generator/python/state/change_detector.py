@@ -0,0 +1,89 @@
+from typing import Dict, Any, List
+import hashlib
+
+
+class ChangeDetector:
+    """
+    Отбор новых и изменившихся строк таргета перед записью.
+
+    Для каждой строки считается хэш final_value записываемых полей, ключом
+    служат значения бизнес-ключа (ключевые поля таргета). Writer получает
+    только строки, хэш которых отличается от сохраненного в прошлый раз.
+    Новые хэши сохраняются вызовом commit — только после успешной записи,
+    иначе при сбое изменения были бы потеряны в следующем запуске.
+    """
+
+    def __init__(self, store: Any, target_key: str, key_fields: List[str], field_names: List[str]):
+        """
+        Args:
+            store: Хранилище хэшей (см. open_hash_store)
+            target_key: Ключ таргета в IC
+            key_fields: Поля бизнес-ключа
+            field_names: Записываемые поля таргета
+        """
+        missing_keys = [key for key in key_fields if key not in field_names]
+        if missing_keys:
+            raise ValueError(f"Ключевые поля отсутствуют среди полей таргета: {', '.join(missing_keys)}")
+        self.store = store
+        self.target_key = target_key
+        self.key_fields = list(key_fields)
+        self.field_names = list(field_names)
+        self.pending = {}
+        self.stats = {"rows": 0, "changed": 0, "unchanged": 0, "untracked": 0}
+
+    def _values(self, item: Dict[str, Dict[str, Any]], fields: List[str]) -> tuple:
+        return tuple(item[field]["final_value"] if field in item else None for field in fields)
+
+    def filter(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Отбрасывает строки, не изменившиеся с прошлой записи.
+
+        Строки без значения ключа не отслеживаются и записываются всегда.
+
+        Returns:
+            Строки для записи
+        """
+        rows = []
+        for item in warehouse:
+            key_values = self._values(item, self.key_fields)
+            if any(value is None for value in key_values):
+                rows.append((None, None, item))
+                continue
+            row_hash = hashlib.blake2b(repr(self._values(item, self.field_names)).encode("utf-8"), digest_size=16)
+            rows.append((repr(key_values), row_hash.digest(), item))
+
+        stored = self.store.get_many(self.target_key, list({key for key, _, _ in rows if key is not None}))
+        changed = []
+        for key, row_hash, item in rows:
+            if key is None:
+                self.stats["untracked"] += 1
+            elif stored.get(key) == row_hash:
+                self.stats["unchanged"] += 1
+                continue
+            else:
+                self.stats["changed"] += 1
+                self.pending[key] = row_hash
+            changed.append(item)
+
+        self.stats["rows"] += len(warehouse)
+        return changed
+
+    def discard(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Не сохраняет хэши строк, которые writer не записал.
+
+        Args:
+            rows: Значения отброшенных строк по именам полей (dropped_rows writer'а)
+        """
+        for row in rows:
+            self.pending.pop(repr(tuple(row.get(field) for field in self.key_fields)), None)
+
+    def commit(self) -> None:
+        """Сохраняет хэши записанных строк"""
+        if self.pending:
+            self.store.set_many(self.target_key, self.pending)
+            self.pending = {}
+
+    def rollback(self) -> None:
+        """Забывает хэши строк, которые не удалось записать"""
+        self.pending = {}
@@ -0,0 +1,110 @@
+from typing import Dict, Any, Optional
+from datetime import datetime, date
+from decimal import Decimal
+import json
+import os
+import sqlite3
+import tempfile
+
+
+def encode_value(value: Any) -> Dict[str, Any]:
+    """Сериализует значение водяного знака с сохранением типа"""
+    if isinstance(value, datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"type": "Decimal", "value": str(value)}
+    return {"type": type(value).__name__, "value": value}
+
+
+def decode_value(data: Dict[str, Any]) -> Any:
+    """Восстанавливает значение водяного знака"""
+    value_type, value = data.get("type"), data.get("value")
+    if value_type == "datetime":
+        return datetime.fromisoformat(value)
+    if value_type == "date":
+        return date.fromisoformat(value)
+    if value_type == "Decimal":
+        return Decimal(value)
+    return value
+
+
+class JsonCheckpointStore:
+    """Хранилище контрольных точек в локальном JSON-файле"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Возвращает сохраненное значение или None"""
+        data = self._read().get(key)
+        return decode_value(data) if data else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Атомарно сохраняет значение: файл подменяется только после полной записи"""
+        data = self._read()
+        data[key] = encode_value(value)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".dtrt_state_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteCheckpointStore:
+    """Хранилище контрольных точек в локальной базе SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS dtrt_checkpoints (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Возвращает сохраненное значение или None"""
+        row = self.connection.execute("SELECT value FROM dtrt_checkpoints WHERE key = ?", (key,)).fetchone()
+        return decode_value(json.loads(row[0])) if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Сохраняет значение в отдельной транзакции"""
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO dtrt_checkpoints (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(encode_value(value), ensure_ascii=False))
+            )
+
+    def close(self) -> None:
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+
+def open_checkpoint_store(path: str) -> Any:
+    """
+    Открывает хранилище контрольных точек по расширению файла.
+
+    Args:
+        path: Путь к файлу состояния (.db/.sqlite — SQLite, иначе JSON)
+    """
+    if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteCheckpointStore(path)
+    return JsonCheckpointStore(path)
@@ -0,0 +1,56 @@
+from typing import Dict, Any, List
+import hashlib
+
+
+class Deduplicator:
+    """
+    Отбрасывание повторяющихся записей таргета между пайплайнами и writer'ом.
+
+    Ключ записи — хэш final_value ключевых полей. Множество виденных ключей
+    либо точное (SpillingHashSet), либо приближенное (BloomFilter: изредка
+    уникальная запись ошибочно считается повтором). Записи без значения
+    ключа не отслеживаются.
+    """
+
+    def __init__(self, target_key: str, key_fields: List[str], seen: Any):
+        """
+        Args:
+            target_key: Ключ таргета в IC
+            key_fields: Поля, по которым записи считаются одинаковыми
+            seen: Множество ключей с методами add_many, stats и close
+        """
+        self.target_key = target_key
+        self.key_fields = list(key_fields)
+        self.seen = seen
+        self.counts = {"rows": 0, "duplicates": 0, "untracked": 0}
+
+    def filter(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> List[Dict[str, Dict[str, Any]]]:
+        """Возвращает записи пачки без повторов (в том числе с прошлыми пачками)"""
+        fields = self.key_fields
+        keys = []
+        for item in warehouse:
+            values = tuple(item[field]["final_value"] if field in item else None for field in fields)
+            if any(value is None for value in values):
+                keys.append(None)
+            else:
+                keys.append(hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).digest())
+
+        added = iter(self.seen.add_many([key for key in keys if key is not None]))
+        unique = []
+        for key, item in zip(keys, warehouse):
+            if key is None:
+                self.counts["untracked"] += 1
+            elif not next(added):
+                self.counts["duplicates"] += 1
+                continue
+            unique.append(item)
+
+        self.counts["rows"] += len(warehouse)
+        return unique
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counts, **self.seen.stats()}
+
+    def close(self) -> None:
+        self.seen.close()
@@ -0,0 +1,91 @@
+from typing import Dict, Any, List
+import dbm
+import sqlite3
+
+
+class SqliteHashStore:
+    """Хэши записанных строк в локальной базе SQLite"""
+
+    # Ограничение SQLite на количество параметров запроса
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS dtrt_row_hashes "
+            "(target TEXT NOT NULL, key TEXT NOT NULL, hash BLOB NOT NULL, PRIMARY KEY (target, key))"
+        )
+        self.connection.commit()
+
+    def get_many(self, target: str, keys: List[str]) -> Dict[str, bytes]:
+        """Возвращает сохраненные хэши по ключам строк"""
+        found = {}
+        for start in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[start:start + self.LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT key, hash FROM dtrt_row_hashes WHERE target = ? AND key IN ({placeholders})",
+                [target, *chunk]
+            )
+            found.update(rows)
+        return found
+
+    def set_many(self, target: str, hashes: Dict[str, bytes]) -> None:
+        """Сохраняет хэши в одной транзакции"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO dtrt_row_hashes (target, key, hash) VALUES (?, ?, ?) "
+                "ON CONFLICT(target, key) DO UPDATE SET hash = excluded.hash",
+                [(target, key, value) for key, value in hashes.items()]
+            )
+
+    def close(self) -> None:
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+
+class DbmHashStore:
+    """Хэши записанных строк в файле dbm"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = dbm.open(path, "c")
+
+    @staticmethod
+    def _key(target: str, key: str) -> bytes:
+        return f"{target}\0{key}".encode("utf-8")
+
+    def get_many(self, target: str, keys: List[str]) -> Dict[str, bytes]:
+        """Возвращает сохраненные хэши по ключам строк"""
+        found = {}
+        for key in keys:
+            value = self.db.get(self._key(target, key))
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, target: str, hashes: Dict[str, bytes]) -> None:
+        """Сохраняет хэши"""
+        for key, value in hashes.items():
+            self.db[self._key(target, key)] = value
+        if hasattr(self.db, "sync"):
+            self.db.sync()
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+def open_hash_store(path: str) -> Any:
+    """
+    Открывает хранилище хэшей строк по расширению файла.
+
+    Args:
+        path: Путь к файлу состояния (.db/.sqlite — SQLite, иначе dbm)
+    """
+    if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteHashStore(path)
+    return DbmHashStore(path)
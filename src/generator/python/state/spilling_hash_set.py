@@ -0,0 +1,99 @@
+from typing import Dict, Any, List, Optional
+import os
+import sqlite3
+import tempfile
+
+from src.generator.python.state.bloom_filter import BloomFilter
+
+
+class SpillingHashSet:
+    """
+    Точное множество ключей-хэшей с вытеснением на диск.
+
+    Пока ключи помещаются в memory_limit, они хранятся в обычном множестве.
+    При переполнении множество сбрасывается во временную базу SQLite, а
+    сброшенные ключи дополнительно заносятся в фильтр Блума: на диск идут
+    только проверки ключей, которые фильтр считает возможно виденными,
+    поэтому новые ключи почти никогда не требуют чтения с диска.
+    """
+
+    # Примерный расход памяти на один 16-байтный ключ в множестве Python
+    ENTRY_BYTES = 100
+    # Ограничение SQLite на количество параметров запроса
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, memory_limit: int = 64 * 1024 * 1024, spill_dir: Optional[str] = None):
+        """
+        Args:
+            memory_limit: Бюджет памяти множества в байтах
+            spill_dir: Каталог временного файла (по умолчанию системный)
+        """
+        self.capacity = max(1, memory_limit // self.ENTRY_BYTES)
+        self.spill_dir = spill_dir
+        self.memory = set()
+        self.filters = []
+        self.spilled = 0
+        self.spills = 0
+        self.connection = None
+        self.path = None
+
+    def _on_disk(self, keys: List[bytes]) -> set:
+        """Возвращает ключи, которые есть среди сброшенных на диск"""
+        candidates = [key for key in keys if any(key in bloom for bloom in self.filters)]
+        found = set()
+        for start in range(0, len(candidates), self.LOOKUP_CHUNK):
+            chunk = candidates[start:start + self.LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(f"SELECT key FROM dtrt_seen WHERE key IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def _spill(self) -> None:
+        if self.connection is None:
+            fd, self.path = tempfile.mkstemp(dir=self.spill_dir, prefix="dtrt_dedup_", suffix=".db")
+            os.close(fd)
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute("PRAGMA journal_mode = OFF")
+            self.connection.execute("PRAGMA synchronous = OFF")
+            self.connection.execute("CREATE TABLE dtrt_seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        bloom = BloomFilter(len(self.memory), 0.01)
+        for key in self.memory:
+            bloom.add(key)
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO dtrt_seen (key) VALUES (?)", ((key,) for key in self.memory))
+        self.filters.append(bloom)
+        self.spilled += len(self.memory)
+        self.spills += 1
+        self.memory = set()
+
+    def add_many(self, keys: List[bytes]) -> List[bool]:
+        """
+        Добавляет ключи пачки.
+
+        Returns:
+            Для каждого ключа: True, если он встретился впервые
+        """
+        memory = self.memory
+        on_disk = self._on_disk([key for key in keys if key not in memory]) if self.filters else ()
+        added = []
+        for key in keys:
+            if key in memory or key in on_disk:
+                added.append(False)
+            else:
+                memory.add(key)
+                added.append(True)
+        if len(memory) > self.capacity:
+            self._spill()
+        return added
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_memory": len(self.memory), "spilled": self.spilled, "spills": self.spills}
+
+    def close(self) -> None:
+        """Удаляет временный файл"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+            self.path = None
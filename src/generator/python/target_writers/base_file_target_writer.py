@@ -0,0 +1,143 @@
+from typing import Dict, List, Any, Optional, BinaryIO
+from abc import ABC, abstractmethod
+import gzip
+import os
+import tempfile
+
+
+class BaseFileTargetWriter(ABC):
+    """
+    Базовый writer для записи таргета в файл.
+
+    Данные пишутся во временный файл рядом с целевым крупными блоками
+    (одна запись в буфер на пачку), при закрытии файл атомарно
+    переименовывается в целевой. Если запись завершилась ошибкой,
+    временный файл удаляется и целевой файл не меняется.
+    Имя с расширением .gz (или compress=True) включает сжатие gzip.
+
+    Наследники реализуют _encode_batch и, при необходимости, _header.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        field_names: List[str],
+        db_config: Optional[Dict[str, Any]] = None,
+        buffer_size: int = 1024 * 1024,
+        compress: Optional[bool] = None,
+        compress_level: int = 6,
+        atomic: bool = True
+    ):
+        """
+        Args:
+            path: Путь к файлу таргета
+            field_names: Список имен полей для записи
+            db_config: Не используется (общая сигнатура writer'ов)
+            buffer_size: Размер буфера записи в байтах
+            compress: Сжимать gzip (по умолчанию — если путь оканчивается на .gz)
+            compress_level: Уровень сжатия gzip
+            atomic: Писать во временный файл и переименовывать при закрытии
+        """
+        self.path = path
+        self.field_names = field_names
+        self.buffer_size = buffer_size
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.compress_level = compress_level
+        self.atomic = atomic
+        self.stats = {"rows": 0, "bytes": 0}
+        self._file = None
+        self._raw_file = None
+        self._tmp_path = None
+        self._failed = False
+        self._prepared = False
+        self._finished = False
+
+    def _open(self) -> BinaryIO:
+        """Открывает (временный) файл при первой записи"""
+        if self._file is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            if self.atomic:
+                fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix=".dtrt_", suffix=".tmp")
+                self._raw_file = os.fdopen(fd, "wb", buffering=self.buffer_size)
+            else:
+                self._raw_file = open(self.path, "wb", buffering=self.buffer_size)
+            self._file = self._raw_file
+            if self.compress:
+                self._file = gzip.GzipFile(fileobj=self._raw_file, mode="wb", compresslevel=self.compress_level)
+            header = self._header()
+            if header:
+                self._file.write(header.encode("utf-8"))
+        return self._file
+
+    def _header(self) -> str:
+        """Возвращает заголовок файла"""
+        return ""
+
+    @abstractmethod
+    def _encode_batch(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> str:
+        """Кодирует пачку строк в текст"""
+
+    async def write(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Дописывает пачку строк в файл.
+
+        Args:
+            warehouse: Список словарей с данными для записи
+        """
+        try:
+            data = self._encode_batch(warehouse).encode("utf-8")
+            self._open().write(data)
+        except BaseException:
+            self._failed = True
+            raise
+        self.stats["rows"] += len(warehouse)
+        self.stats["bytes"] += len(data)
+
+    async def prepare(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """Пишет данные во временный файл, не переименовывая его до commit_prepared"""
+        self._prepared = True
+        await self.write(warehouse)
+
+    async def commit_prepared(self) -> None:
+        """Фиксирует подготовленную запись"""
+        self._prepared = False
+        self._finish(commit=True)
+
+    async def rollback_prepared(self) -> None:
+        """Отменяет подготовленную запись"""
+        self._prepared = False
+        self._finish(commit=False)
+
+    def _finish(self, commit: bool) -> None:
+        """Закрывает файл и переименовывает (или удаляет) временный файл"""
+        if self._finished:
+            return
+        self._finished = True
+        if self._file is None:
+            if not commit or self._failed:
+                return
+            # Пустой результат тоже создает файл (с заголовком)
+            self._open()
+        try:
+            if self._file is not self._raw_file:
+                self._file.close()
+            self._raw_file.flush()
+            if commit and self.atomic:
+                os.fsync(self._raw_file.fileno())
+            self._raw_file.close()
+        finally:
+            self._file = self._raw_file = None
+
+        if self._tmp_path:
+            tmp_path, self._tmp_path = self._tmp_path, None
+            if commit:
+                os.replace(tmp_path, self.path)
+            else:
+                os.unlink(tmp_path)
+
+    async def close(self) -> None:
+        """Завершает запись: при ошибке временный файл удаляется"""
+        if self._prepared:
+            return
+        self._finish(commit=not self._failed)
@@ -0,0 +1,42 @@
+from typing import Dict, List, Any, Optional
+import csv
+import io
+
+from src.generator.python.target_writers.base_file_target_writer import BaseFileTargetWriter
+
+
+class CsvTargetWriter(BaseFileTargetWriter):
+    """Writer для записи таргета в CSV-файл с заголовком из имен полей"""
+
+    def __init__(
+        self,
+        path: str,
+        field_names: List[str],
+        db_config: Optional[Dict[str, Any]] = None,
+        delimiter: str = ",",
+        **options
+    ):
+        """
+        Args:
+            delimiter: Разделитель столбцов
+            options: Параметры BaseFileTargetWriter (buffer_size, compress, atomic)
+        """
+        super().__init__(path, field_names, db_config, **options)
+        self.delimiter = delimiter
+
+    def _header(self) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, delimiter=self.delimiter, lineterminator="\n").writerow(self.field_names)
+        return buffer.getvalue()
+
+    def _encode_batch(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> str:
+        buffer = io.StringIO()
+        field_names = self.field_names
+        csv.writer(buffer, delimiter=self.delimiter, lineterminator="\n").writerows(
+            [
+                item[field_name]['final_value'] if field_name in item else None
+                for field_name in field_names
+            ]
+            for item in warehouse
+        )
+        return buffer.getvalue()
@@ -0,0 +1,48 @@
+from typing import Dict, List, Any, Optional, Iterator
+
+
+class DictTargetWriter:
+    """
+    Writer, оставляющий результат таргета в памяти процесса.
+
+    Строки не копируются: rows содержит те же объекты, что вернули
+    пайплайны ({поле: {"final_value": ...}}). Используется при встраивании
+    DataRoute в приложение и для замеров без внешнего хранилища.
+    """
+
+    def __init__(self, name: str, field_names: List[str], db_config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            name: Имя таргета из DSL
+            field_names: Список имен полей
+            db_config: Не используется (общая сигнатура writer'ов)
+        """
+        self.name = name
+        self.field_names = field_names
+        self.rows = []
+        self.stats = {"rows": 0}
+        self._pending = []
+
+    async def write(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """Добавляет пачку строк в результат"""
+        self.rows.extend(warehouse)
+        self.stats["rows"] += len(warehouse)
+
+    async def prepare(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """Откладывает пачку до commit_prepared (запись «все или ничего»)"""
+        self._pending.extend(warehouse)
+
+    async def commit_prepared(self) -> None:
+        pending, self._pending = self._pending, []
+        await self.write(pending)
+
+    async def rollback_prepared(self) -> None:
+        self._pending = []
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Отдает строки в виде {поле: значение}"""
+        for item in self.rows:
+            yield {field_name: item[field_name]['final_value'] for field_name in self.field_names if field_name in item}
+
+    async def close(self) -> None:
+        pass
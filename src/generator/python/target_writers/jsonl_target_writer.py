@@ -0,0 +1,34 @@
+from typing import Dict, List, Any, Optional
+import json
+
+from src.generator.python.target_writers.base_file_target_writer import BaseFileTargetWriter
+
+
+class JsonlTargetWriter(BaseFileTargetWriter):
+    """Writer для записи таргета в файл JSON Lines (по объекту на строку)"""
+
+    def __init__(self, path: str, field_names: List[str], db_config: Optional[Dict[str, Any]] = None, **options):
+        super().__init__(path, field_names, db_config, **options)
+        # Ключи объекта кодируются один раз: строка собирается из готовых фрагментов
+        self._prefixes = [
+            ("{" if index == 0 else ", ") + json.dumps(field_name, ensure_ascii=False) + ": "
+            for index, field_name in enumerate(field_names)
+        ]
+        self._encoder = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+    def _encode_batch(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> str:
+        encode = self._encoder
+        fields = list(zip(self._prefixes, self.field_names))
+        if not fields:
+            return "{}\n" * len(warehouse)
+
+        lines = []
+        for item in warehouse:
+            parts = []
+            for prefix, field_name in fields:
+                field_data = item.get(field_name)
+                parts.append(prefix)
+                parts.append(encode(field_data['final_value']) if field_data is not None else "null")
+            parts.append("}\n")
+            lines.append("".join(parts))
+        return "".join(lines)
@@ -1,19 +1,122 @@
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterator, AsyncIterator, Callable, Awaitable
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from decimal import Decimal
 import asyncpg
 import json
 import asyncio
-from pydantic import create_model, Field
+import time
+import uuid
+from pydantic import create_model, Field, TypeAdapter, ValidationError
+
+from src.generator.python.resources.batch_controller import BatchSizeController
+from src.generator.python.resources.pool_manager import PoolManager
+from src.generator.python.resources.schema_cache import SchemaCache
+
+
+# Ошибки соединения и конкурентного доступа: повторяются целиком с экспоненциальной задержкой
+TRANSIENT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    asyncpg.exceptions.OperatorInterventionError,
+    asyncpg.exceptions.TransactionRollbackError,
+)
+
+# Типы значений не кодируются в бинарный формат COPY: пачка пишется через executemany.
+# InternalClientError («no binary format encoder for type …») не наследует InterfaceError
+COPY_FALLBACK_ERRORS = (
+    asyncpg.InterfaceError,
+    asyncpg.exceptions._base.InternalClientError,
+    asyncpg.FeatureNotSupportedError,
+    ValueError,
+    TypeError,
+)
+
+# Ошибки данных конкретных строк: пачка делится пополам, пока не будут найдены строки-виновники
+ROW_ERRORS = (
+    asyncpg.IntegrityConstraintViolationError,
+    asyncpg.DataError,
+    ValueError,
+    TypeError,
+)
+
+
+def _to_json(value: Any) -> Any:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _to_text(value: Any) -> Any:
+    # Коллекции — как JSON (как в SQLite writer'е), bool — как в тексте PostgreSQL (bool::text)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list, tuple, set)):
+        return _to_json(list(value) if isinstance(value, set) else value)
+    return str(value)
+
+
+def _to_decimal(value: Any) -> Any:
+    return Decimal(str(value)) if isinstance(value, (int, float)) else value
+
+
+def _to_float(value: Any) -> Any:
+    return float(value) if isinstance(value, int) else value
+
+
+def _to_date(value: Any) -> Any:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _to_datetime(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _to_uuid(value: Any) -> Any:
+    return uuid.UUID(value) if isinstance(value, str) else value
 
 
 class PgTargetWriter:
     """Writer для записи данных в PostgreSQL"""
     
+    TEXT_TYPES = ("text", "varchar", "bpchar", "name", "citext")
+    # Типы столбцов (udt_name), в которые пишется значение с данным final_type из DSL
+    COMPATIBLE_TYPES = {
+        "int": ("int2", "int4", "int8", "numeric", "float4", "float8") + TEXT_TYPES + ("json", "jsonb"),
+        "float": ("float4", "float8", "numeric") + TEXT_TYPES + ("json", "jsonb"),
+        "bool": ("bool",) + TEXT_TYPES + ("json", "jsonb"),
+        "str": TEXT_TYPES + ("json", "jsonb", "uuid", "date", "timestamp", "timestamptz"),
+        "dict": ("json", "jsonb") + TEXT_TYPES,
+        "list": ("json", "jsonb") + TEXT_TYPES,
+        "tuple": ("json", "jsonb") + TEXT_TYPES,
+    }
+    # Типы столбцов, для которых известна совместимость с типами DSL
+    KNOWN_TYPES = frozenset(column_type for types in COMPATIBLE_TYPES.values() for column_type in types)
+    
     def __init__(
         self,
         schema_table: str,
         field_names: List[str],
         db_config: Optional[Dict[str, Any]] = None,
-        skip_validation: bool = False
+        skip_validation: bool = False,
+        batch_size: int = 10000,
+        use_copy: bool = True,
+        field_types: Optional[Dict[str, str]] = None,
+        upsert_keys: Optional[List[str]] = None,
+        skip_unchanged: bool = False,
+        use_merge: bool = False,
+        parallel: int = 1,
+        two_phase: bool = False,
+        pool_manager: Optional[Any] = None,
+        bisect_errors: bool = False,
+        reject_path: Optional[str] = None,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        batch_controller: Optional[BatchSizeController] = None,
+        schema_cache: Optional[str] = None,
+        schema_ttl: float = 3600.0
     ):
         """
         Инициализирует PostgreSQL writer.
@@ -22,7 +125,25 @@ class PgTargetWriter:
             schema_table: Имя таблицы в формате "schema.table"
             field_names: Список имен полей для записи
             db_config: Конфигурация подключения к базе данных
-            skip_validation: Флаг для пропуска валидации данных (для тестирования)
+            skip_validation: Не проверять строки по типам из DSL (в запуске — target_config)
+            batch_size: Количество строк в одной пачке COPY/executemany
+            use_copy: Использовать бинарный COPY (иначе только executemany)
+            field_types: Типы полей из DSL {final_name: final_type} для валидации
+            upsert_keys: Ключевые столбцы; если заданы, строки обновляются по ключу (upsert)
+            skip_unchanged: Не обновлять строки, значения которых не изменились
+            use_merge: Использовать MERGE (PostgreSQL 15+) вместо INSERT ... ON CONFLICT
+            parallel: Количество соединений пула для параллельной записи пачек
+            two_phase: Фиксировать параллельную запись двухфазным коммитом
+                (требует max_prepared_transactions > 0, несовместим с upsert)
+            pool_manager: Общий менеджер пулов запуска (иначе writer создает свой пул)
+            bisect_errors: При ошибке данных делить пачку пополам и отбраковывать
+                только строки, которые не записываются
+            reject_path: Файл JSON Lines для отбракованных строк (включает bisect_errors)
+            max_retries: Сколько раз повторять запись при ошибках соединения
+            retry_delay: Начальная задержка повтора в секундах (удваивается)
+            batch_controller: Адаптивный размер пачки (вместо постоянного batch_size)
+            schema_cache: Файл кэша схем таблиц (иначе схема читается из базы при каждом запуске)
+            schema_ttl: Время жизни записи кэша схем в секундах
         """
         self.schema_table = schema_table
         self.field_names = field_names
@@ -30,6 +151,42 @@ class PgTargetWriter:
         self.schema, self.table = self._parse_schema_table(schema_table)
         self.connection_pool = None
         self.skip_validation = skip_validation
+        self.batch_size = max(1, batch_size)
+        self.use_copy = use_copy
+        self.field_types = field_types or {}
+        self.upsert_keys = list(upsert_keys or [])
+        self.skip_unchanged = skip_unchanged
+        self.use_merge = use_merge
+        self.staging_table = f"dtrt_stage_{self.table}"
+        self.parallel = max(1, parallel)
+        self.two_phase = two_phase
+        self.pool_manager = pool_manager
+        self.bisect_errors = bisect_errors or reject_path is not None
+        self.reject_path = reject_path
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self.batch_controller = batch_controller
+        self.schema_cache = SchemaCache(schema_cache, schema_ttl) if schema_cache else None
+        self.table_columns = None
+        self.encoders = {}
+        self.rejected_rows = []
+        self.prepared_gids = []
+        self.stats = {
+            "rows": 0, "copy_batches": 0, "insert_batches": 0, "upsert_batches": 0, "failed_rows": 0,
+            "rejected_rows": 0, "bisections": 0, "retries": 0, "connections": []
+        }
+        self.failed_rows = []
+        # Исходные значения строк, не попавших в таблицу (не прошли валидацию или отклонены)
+        self.dropped_rows = []
+        self._record_sources = {}
+        self.validator = None if skip_validation else self._build_validator()
+        
+        missing_keys = [key for key in self.upsert_keys if key not in field_names]
+        if missing_keys:
+            raise ValueError(f"Ключевые поля отсутствуют среди полей таргета: {', '.join(missing_keys)}")
+        if two_phase and self.upsert_keys:
+            # Транзакцию, работавшую с временной таблицей, нельзя подготовить (PREPARE TRANSACTION)
+            raise ValueError("Двухфазный коммит несовместим с режимом upsert")
     
     def _parse_schema_table(self, schema_table: str) -> tuple:
         """Разбирает имя таблицы на схему и таблицу"""
@@ -39,7 +196,9 @@ class PgTargetWriter:
         return 'public', parts[0]
     
     async def connect(self) -> None:
-        """Создает пул соединений с базой данных"""
+        """Создает пул соединений с базой данных или берет общий пул запуска"""
+        if not self.connection_pool and self.pool_manager:
+            self.connection_pool = await self.pool_manager.get_pool(self.db_config, self.parallel)
         if not self.connection_pool:
             self.connection_pool = await asyncpg.create_pool(
                 user=self.db_config.get('user', 'postgres'),
@@ -48,15 +207,115 @@ class PgTargetWriter:
                 host=self.db_config.get('host', 'localhost'),
                 port=self.db_config.get('port', 5432),
                 min_size=self.db_config.get('min_connections', 1),
-                max_size=self.db_config.get('max_connections', 10)
+                max_size=max(self.parallel, self.db_config.get('max_connections', 10))
             )
     
     async def close(self) -> None:
-        """Закрывает пул соединений с базой данных"""
+        """Закрывает пул соединений с базой данных (общий пул закрывает менеджер)"""
         if self.connection_pool:
-            await self.connection_pool.close()
+            if not self.pool_manager:
+                await self.connection_pool.close()
             self.connection_pool = None
     
+    @property
+    def schema_key(self) -> str:
+        """Ключ таблицы в кэше схем: DSN базы без пароля и имя таблицы"""
+        return f"{PoolManager.pool_key(self.db_config)}/{self.schema}.{self.table}"
+    
+    async def load_schema(self) -> Dict[str, str]:
+        """
+        Читает столбцы таблицы и их типы (из кэша схем, если запись свежая).
+        
+        Схема читается один раз на writer; по ней строятся кодировщики
+        значений для бинарного COPY.
+        
+        Returns:
+            Словарь {столбец: тип PostgreSQL (udt_name)}
+        """
+        if self.table_columns is not None:
+            return self.table_columns
+        
+        columns = self.schema_cache.get(self.schema_key) if self.schema_cache else None
+        if columns is None:
+            # Подключаемся к базе данных, если еще не подключены
+            await self.connect()
+            
+            async def fetch_columns():
+                async with self.connection_pool.acquire() as conn:
+                    return await conn.fetch(
+                        """
+                        SELECT column_name, udt_name
+                        FROM information_schema.columns
+                        WHERE table_schema = $1 AND table_name = $2
+                        ORDER BY ordinal_position
+                        """,
+                        self.schema, self.table
+                    )
+            
+            rows = await self._with_retry(fetch_columns)
+            columns = {row['column_name']: row['udt_name'] for row in rows}
+            # Отсутствующую таблицу не кэшируем: ее могут создать до следующего запуска
+            if self.schema_cache and columns:
+                self.schema_cache.set(self.schema_key, columns)
+        
+        self.table_columns = columns
+        self.encoders = self._build_encoders(columns)
+        return columns
+    
+    def _build_encoders(self, columns: Dict[str, str]) -> Dict[str, Callable[[Any], Any]]:
+        """
+        Подбирает для полей преобразование значения под тип столбца.
+        
+        Кодировщик выбирается один раз по паре (final_type из DSL, тип столбца),
+        чтобы бинарный COPY получал значения тех типов, которые ожидает asyncpg.
+        """
+        encoders = {}
+        for field_name in self.field_names:
+            final_type, column_type = self.field_types.get(field_name), columns.get(field_name)
+            if column_type is None or final_type is None:
+                continue
+            if column_type in ("json", "jsonb") and final_type != "str":
+                encoders[field_name] = _to_json
+            elif column_type in self.TEXT_TYPES and final_type != "str":
+                encoders[field_name] = _to_text
+            elif column_type == "numeric" and final_type in ("int", "float"):
+                encoders[field_name] = _to_decimal
+            elif column_type in ("float4", "float8") and final_type == "int":
+                encoders[field_name] = _to_float
+            elif final_type == "str" and column_type == "date":
+                encoders[field_name] = _to_date
+            elif final_type == "str" and column_type in ("timestamp", "timestamptz"):
+                encoders[field_name] = _to_datetime
+            elif final_type == "str" and column_type == "uuid":
+                encoders[field_name] = _to_uuid
+        return encoders
+    
+    def type_mismatches(self, columns: Dict[str, str]) -> List[str]:
+        """Возвращает поля, final_type которых не записывается в тип столбца"""
+        mismatches = []
+        for field_name in self.field_names:
+            final_type, column_type = self.field_types.get(field_name), columns.get(field_name)
+            compatible = self.COMPATIBLE_TYPES.get(final_type)
+            # Массивы (udt_name с подчеркиванием) принимают списки
+            if final_type in ("list", "tuple") and column_type and column_type.startswith("_"):
+                continue
+            if compatible and column_type in self.KNOWN_TYPES and column_type not in compatible:
+                mismatches.append(f"{field_name}: {final_type} -> {column_type}")
+        return mismatches
+    
+    async def check_schema(self) -> Tuple[List[str], List[str]]:
+        """
+        Проверяет таблицу до чтения данных.
+        
+        Returns:
+            Кортеж (отсутствующие столбцы, несовпадения типов DSL и таблицы)
+        """
+        columns = await self.load_schema()
+        if not columns:
+            return list(self.field_names), []
+        missing_fields = [field_name for field_name in self.field_names if field_name not in columns]
+        return missing_fields, self.type_mismatches(columns)
+    
     async def validate_fields(self) -> tuple:
         """
         Проверяет существование полей в таблице.
@@ -64,89 +323,519 @@ class PgTargetWriter:
         Returns:
             Кортеж (is_valid, missing_fields)
         """
-        # Подключаемся к базе данных, если еще не подключены
-        await self.connect()
+        missing_fields, _ = await self.check_schema()
+        return len(missing_fields) == 0, missing_fields
+    
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Экранирует идентификатор PostgreSQL"""
+        return '"' + identifier.replace('"', '""') + '"'
+    
+    @staticmethod
+    @asynccontextmanager
+    async def _savepoint(conn: Any, name: str = "dtrt_chunk") -> AsyncIterator[None]:
+        """Точка сохранения: работает и в транзакциях asyncpg, и в начатых вручную"""
+        await conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            await conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        await conn.execute(f"RELEASE SAVEPOINT {name}")
+    
+    @property
+    def relation(self) -> str:
+        return f"{self._quote(self.schema)}.{self._quote(self.table)}"
+    
+    def _build_validator(self) -> TypeAdapter:
+        """
+        Строит валидатор строк таргета по типам из DSL (final_type маршрутов).
         
-        async with self.connection_pool.acquire() as conn:
-            # Получаем список столбцов таблицы
-            query = """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_schema = $1 AND table_name = $2
-            """
-            rows = await conn.fetch(query, self.schema, self.table)
-            table_columns = {row['column_name'] for row in rows}
+        Модель создается один раз при инициализации writer'а; поля без
+        известного типа не проверяются.
+        """
+        # Имена столбцов задаются через alias: они могут не быть идентификаторами Python
+        model_fields = {
+            f"field_{index}": (
+                Optional[self._get_python_type(self.field_types.get(field_name))],
+                Field(None, alias=field_name)
+            )
+            for index, field_name in enumerate(self.field_names)
+        }
+        row_model = create_model('TargetRow', **model_fields)
+        return TypeAdapter(List[row_model])
+    
+    def _validate_rows(self, rows: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Проверяет пачку строк и отбрасывает пустые поля.
+        
+        Строки, не прошедшие проверку, не записываются и сохраняются
+        в failed_rows вместе с ошибками.
+        
+        Args:
+            rows: Значения строк по именам полей
             
-            # Проверяем, все ли поля существуют в таблице
-            missing_fields = []
-            for field in self.field_names:
-                if field not in table_columns:
-                    missing_fields.append(field)
+        Returns:
+            Список пар (исходная строка, словарь ее непустых значений после проверки)
+        """
+        if self.validator is None:
+            return [(data, {k: v for k, v in data.items() if v is not None}) for data in rows]
+        
+        try:
+            validated = self.validator.validate_python(rows)
+        except ValidationError as e:
+            errors = {}
+            for error in e.errors():
+                errors.setdefault(error['loc'][0], []).append(
+                    f"{'.'.join(str(part) for part in error['loc'][1:])}: {error['msg']}"
+                )
+            for index, messages in errors.items():
+                self.failed_rows.append({"row": rows[index], "errors": messages})
+                self.dropped_rows.append(rows[index])
+            self.stats["failed_rows"] += len(errors)
+            rows = [data for index, data in enumerate(rows) if index not in errors]
+            validated = self.validator.validate_python(rows)
+        
+        return [(data, item.model_dump(by_alias=True, exclude_none=True)) for data, item in zip(rows, validated)]
+    
+    def _group_rows(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> Dict[Tuple[str, ...], List[Tuple[Any, ...]]]:
+        """
+        Группирует строки по набору непустых столбцов.
+        
+        NULL-значения не передаются в INSERT (срабатывают DEFAULT таблицы),
+        поэтому строки с разными наборами непустых полей пишутся разными пачками.
+        
+        Returns:
+            Словарь {кортеж столбцов: список кортежей значений}
+        """
+        # Извлекаем данные для вставки
+        field_names = set(self.field_names)
+        rows = [
+            {
+                field_name: field_data.get('final_value')
+                for field_name, field_data in item.items()
+                if field_name in field_names
+            }
+            for item in warehouse
+        ]
+        
+        encoders = self.encoders
+        groups = {}
+        # Исходная строка каждой записи: по ней отклоненная запись попадает в dropped_rows
+        self._record_sources = {}
+        for source, validated_data in self._validate_rows(rows):
+            # Если данных нет, пропускаем запись
+            if not validated_data:
+                continue
             
-            return len(missing_fields) == 0, missing_fields
+            if encoders:
+                values = tuple(
+                    encoders[name](value) if name in encoders else value
+                    for name, value in validated_data.items()
+                )
+            else:
+                values = tuple(validated_data.values())
+            groups.setdefault(tuple(validated_data), []).append(values)
+            self._record_sources[id(values)] = source
+        return groups
+    
+    async def _write_chunk(
+        self,
+        conn: Any,
+        columns: Tuple[str, ...],
+        records: List[Tuple[Any, ...]],
+        staging: bool = False
+    ) -> None:
+        """
+        Записывает пачку строк с одинаковым набором столбцов.
+        
+        Сначала пробует бинарный COPY; если типы значений не кодируются в
+        бинарный формат столбцов, пачка пишется через executemany одним
+        подготовленным INSERT. COPY выполняется в точке сохранения, чтобы
+        его ошибка не прерывала общую транзакцию. Ошибки данных на сервере
+        (ограничения таблицы) не повторяются через INSERT, а передаются выше.
+        
+        Args:
+            staging: Писать во временную промежуточную таблицу вместо целевой
+        """
+        table, schema = (self.staging_table, None) if staging else (self.table, self.schema)
+        if self.use_copy:
+            try:
+                async with self._savepoint(conn):
+                    await conn.copy_records_to_table(
+                        table, records=records, columns=list(columns), schema_name=schema
+                    )
+                self.stats["copy_batches"] += 1
+                return
+            except COPY_FALLBACK_ERRORS:
+                pass
+        
+        relation = self._quote(table) if staging else self.relation
+        placeholders = ", ".join(f"${i + 1}" for i in range(len(columns)))
+        query = (
+            f"INSERT INTO {relation} "
+            f"({', '.join(self._quote(column) for column in columns)}) VALUES ({placeholders})"
+        )
+        await conn.executemany(query, records)
+        self.stats["insert_batches"] += 1
+    
+    def _dedup_by_keys(self, columns: Tuple[str, ...], records: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        """
+        Оставляет последнюю строку для каждого ключа.
+        
+        Один оператор upsert не может обновить строку дважды, поэтому
+        дубликаты ключа внутри пачки схлопываются заранее.
+        """
+        if not all(key in columns for key in self.upsert_keys):
+            return records
+        positions = [columns.index(key) for key in self.upsert_keys]
+        unique = {}
+        for record in records:
+            unique[tuple(record[position] for position in positions)] = record
+        return list(unique.values())
+    
+    def _merge_query(self, columns: Tuple[str, ...]) -> str:
+        """
+        Формирует оператор переноса строк из промежуточной таблицы в целевую.
+        
+        По умолчанию INSERT ... SELECT ... ON CONFLICT DO UPDATE (требует
+        уникального индекса по ключам), при use_merge — MERGE (PostgreSQL 15+).
+        При skip_unchanged строки, в которых ничего не изменилось, не обновляются.
+        """
+        quoted = [self._quote(column) for column in columns]
+        updated = [self._quote(column) for column in columns if column not in self.upsert_keys]
+        staging = self._quote(self.staging_table)
+        
+        if self.use_merge:
+            on = " AND ".join(f"t.{self._quote(key)} = s.{self._quote(key)}" for key in self.upsert_keys)
+            query = f"MERGE INTO {self.relation} AS t USING {staging} AS s ON {on}"
+            if updated:
+                changed = ""
+                if self.skip_unchanged:
+                    changed = (
+                        f" AND ({', '.join(f't.{column}' for column in updated)}) IS DISTINCT FROM "
+                        f"({', '.join(f's.{column}' for column in updated)})"
+                    )
+                assignments = ", ".join(f"{column} = s.{column}" for column in updated)
+                query += f" WHEN MATCHED{changed} THEN UPDATE SET {assignments}"
+            values = ", ".join(f"s.{column}" for column in quoted)
+            return query + f" WHEN NOT MATCHED THEN INSERT ({', '.join(quoted)}) VALUES ({values})"
+        
+        query = (
+            f"INSERT INTO {self.relation} AS t ({', '.join(quoted)}) "
+            f"SELECT {', '.join(quoted)} FROM {staging} "
+            f"ON CONFLICT ({', '.join(self._quote(key) for key in self.upsert_keys)}) "
+        )
+        if not updated:
+            return query + "DO NOTHING"
+        
+        query += "DO UPDATE SET " + ", ".join(f"{column} = EXCLUDED.{column}" for column in updated)
+        if self.skip_unchanged:
+            query += (
+                f" WHERE ({', '.join(f't.{column}' for column in updated)}) IS DISTINCT FROM "
+                f"({', '.join(f'EXCLUDED.{column}' for column in updated)})"
+            )
+        return query
+    
+    async def _create_staging(self, conn: Any) -> None:
+        """Создает промежуточную таблицу upsert на время текущей транзакции"""
+        # Промежуточная таблица повторяет столбцы целевой, но без ограничений
+        await conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {self._quote(self.staging_table)} ON COMMIT DROP "
+            f"AS SELECT * FROM {self.relation} WITH NO DATA"
+        )
+    
+    async def _upsert_chunk(self, conn: Any, columns: Tuple[str, ...], records: List[Tuple[Any, ...]]) -> None:
+        """Загружает пачку в промежуточную таблицу и переносит ее в целевую одним оператором"""
+        await conn.execute(f"TRUNCATE {self._quote(self.staging_table)}")
+        await self._write_chunk(conn, columns, records, staging=True)
+        await conn.execute(self._merge_query(columns))
+        self.stats["upsert_batches"] += 1
+    
+    async def _write_batch(self, conn: Any, columns: Tuple[str, ...], records: List[Tuple[Any, ...]]) -> None:
+        """Записывает одну пачку в текущей транзакции соединения"""
+        if self.upsert_keys:
+            await self._upsert_chunk(conn, columns, records)
+        else:
+            await self._write_chunk(conn, columns, records)
+    
+    def _split_batches(
+        self,
+        groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]]
+    ) -> Iterator[Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]]:
+        """
+        Лениво делит группы строк на пачки.
+        
+        Размер каждой пачки определяется в момент, когда ее забирают на
+        запись, поэтому адаптивный контроллер успевает учесть уже записанные.
+        """
+        for columns, records in groups.items():
+            start = 0
+            while start < len(records):
+                size = self.batch_controller.size if self.batch_controller else self.batch_size
+                yield columns, records[start:start + size]
+                start += size
+    
+    async def _write_timed(
+        self,
+        conn: Any,
+        columns: Tuple[str, ...],
+        records: List[Tuple[Any, ...]],
+        rejected: List[Tuple[Tuple[str, ...], Tuple[Any, ...], BaseException]]
+    ) -> None:
+        """Записывает пачку и сообщает ее время адаптивному контроллеру"""
+        if not self.batch_controller:
+            await self._write_isolated(conn, columns, records, rejected)
+            return
+        started = time.perf_counter()
+        await self._write_isolated(conn, columns, records, rejected)
+        self.batch_controller.record(len(records), time.perf_counter() - started, records[0])
+    
+    async def _write_isolated(
+        self,
+        conn: Any,
+        columns: Tuple[str, ...],
+        records: List[Tuple[Any, ...]],
+        rejected: List[Tuple[Tuple[str, ...], Tuple[Any, ...], BaseException]]
+    ) -> None:
+        """
+        Записывает пачку, при ошибке данных деля ее пополам.
+        
+        Каждая половина пишется в своей точке сохранения, поэтому исправные
+        части пишутся тем же COPY, а отбраковываются только строки, на которых
+        ошибка воспроизводится по одной.
+        
+        Args:
+            rejected: Список, в который добавляются (столбцы, строка, ошибка)
+        """
+        if not self.bisect_errors:
+            await self._write_batch(conn, columns, records)
+            return
+        
+        try:
+            async with self._savepoint(conn, "dtrt_batch"):
+                await self._write_batch(conn, columns, records)
+        except ROW_ERRORS as e:
+            if len(records) == 1:
+                rejected.append((columns, records[0], e))
+                return
+            self.stats["bisections"] += 1
+            middle = len(records) // 2
+            await self._write_isolated(conn, columns, records[:middle], rejected)
+            await self._write_isolated(conn, columns, records[middle:], rejected)
+    
+    async def _with_retry(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполняет транзакцию, повторяя ее при ошибках соединения с экспоненциальной задержкой"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await func()
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+    
+    def _reject(self, rejected: List[Tuple[Tuple[str, ...], Tuple[Any, ...], BaseException]]) -> None:
+        """Сохраняет отбракованные строки и дописывает их в reject_path"""
+        if not rejected:
+            return
+        items = [
+            {"target": self.schema_table, "row": dict(zip(columns, record)), "error": f"{type(e).__name__}: {e}"}
+            for columns, record, e in rejected
+        ]
+        self.rejected_rows.extend(items)
+        self.dropped_rows.extend(
+            self._record_sources[id(record)] for _, record, _ in rejected if id(record) in self._record_sources
+        )
+        self.stats["rejected_rows"] += len(items)
+        if self.reject_path:
+            with open(self.reject_path, "a", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+    
+    async def _write_transaction(self, groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]]) -> int:
+        """
+        Пишет группы строк пачками в одной транзакции (с повтором при ошибках соединения).
+        
+        Returns:
+            Количество записанных строк
+        """
+        async def attempt():
+            rejected = []
+            async with self.connection_pool.acquire() as conn:
+                async with conn.transaction():
+                    if self.upsert_keys:
+                        await self._create_staging(conn)
+                    for columns, records in self._split_batches(groups):
+                        await self._write_timed(conn, columns, records, rejected)
+            return rejected
+        
+        rejected = await self._with_retry(attempt)
+        self._reject(rejected)
+        return sum(len(records) for records in groups.values()) - len(rejected)
+    
+    async def _write_worker(
+        self,
+        index: int,
+        batches: Iterator[Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]],
+        gid: Optional[str]
+    ) -> None:
+        """
+        Пишет пачки из общего итератора.
+        
+        Без двухфазной фиксации каждая пачка пишется в отдельной транзакции
+        (и повторяется при ошибках соединения), с ней все пачки готовятся
+        одной транзакцией соединения (PREPARE TRANSACTION gid).
+        """
+        connection_stats = {"connection": index, "rows": 0, "batches": 0, "seconds": 0.0, "rows_per_second": 0.0}
+        self.stats["connections"].append(connection_stats)
+        started = time.perf_counter()
+        
+        if gid is None:
+            for columns, records in batches:
+                connection_stats["rows"] += await self._write_transaction({columns: records})
+                connection_stats["batches"] += 1
+        else:
+            async with self.connection_pool.acquire() as conn:
+                await conn.execute("BEGIN")
+                rejected = []
+                try:
+                    for columns, records in batches:
+                        await self._write_timed(conn, columns, records, rejected)
+                        connection_stats["rows"] += len(records)
+                        connection_stats["batches"] += 1
+                    await conn.execute(f"PREPARE TRANSACTION '{gid}'")
+                except BaseException:
+                    await conn.execute("ROLLBACK")
+                    raise
+                self._reject(rejected)
+                connection_stats["rows"] -= len(rejected)
+        
+        connection_stats["seconds"] = time.perf_counter() - started
+        if connection_stats["seconds"]:
+            connection_stats["rows_per_second"] = connection_stats["rows"] / connection_stats["seconds"]
+    
+    async def _write_parallel(self, groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]], two_phase: bool) -> None:
+        """
+        Пишет пачки параллельно по нескольким соединениям пула.
+        
+        Без двухфазной фиксации пачки, записанные до ошибки, остаются
+        зафиксированными. С ней транзакции соединений только подготавливаются
+        (их фиксирует commit_prepared), а при ошибке подготовленные откатываются.
+        """
+        workers_count = min(self.parallel, self._count_batches(groups))
+        pending = self._split_batches(groups)
+        run_id = uuid.uuid4().hex
+        gids = [f"dtrt_{run_id}_{index}" if two_phase else None for index in range(workers_count)]
+        
+        results = await asyncio.gather(
+            *(self._write_worker(index, pending, gids[index]) for index in range(workers_count)),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        
+        if two_phase:
+            self.prepared_gids.extend(
+                gid for gid, result in zip(gids, results) if not isinstance(result, BaseException)
+            )
+            if errors:
+                await self.rollback_prepared()
+        
+        if errors:
+            raise errors[0]
+        self.stats["rows"] += sum(connection_stats["rows"] for connection_stats in self.stats["connections"][-workers_count:])
+    
+    async def _finish_prepared(self, command: str) -> None:
+        gids, self.prepared_gids = self.prepared_gids, []
+        if not gids:
+            return
+        async with self.connection_pool.acquire() as conn:
+            for gid in gids:
+                await conn.execute(f"{command} '{gid}'")
+    
+    async def commit_prepared(self) -> None:
+        """Фиксирует транзакции, подготовленные prepare"""
+        await self._finish_prepared("COMMIT PREPARED")
+    
+    async def rollback_prepared(self) -> None:
+        """Откатывает транзакции, подготовленные prepare"""
+        await self._finish_prepared("ROLLBACK PREPARED")
+    
+    def _count_batches(self, groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]]) -> int:
+        """Оценивает количество пачек по текущему размеру пачки"""
+        size = self.batch_controller.size if self.batch_controller else self.batch_size
+        return sum(-(-len(records) // size) for records in groups.values())
+    
+    async def _get_groups(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> Dict[Tuple[str, ...], List[Tuple[Any, ...]]]:
+        """Валидирует и группирует строки; подключается к базе, если есть что писать"""
+        if not warehouse:
+            return {}
+        
+        # Подключаемся к базе данных и читаем схему таблицы (кодировщики значений)
+        await self.connect()
+        await self.load_schema()
+        
+        groups = self._group_rows(warehouse)
+        if self.upsert_keys:
+            groups = {columns: self._dedup_by_keys(columns, records) for columns, records in groups.items()}
+        return groups
+    
+    async def prepare(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Записывает данные, но только подготавливает транзакции (PREPARE TRANSACTION).
+        
+        Используется для записи нескольких таргетов по принципу «все или ничего»:
+        после успешной подготовки всех таргетов вызывается commit_prepared,
+        иначе rollback_prepared.
+        
+        Args:
+            warehouse: Список словарей с данными для записи
+        """
+        if self.upsert_keys:
+            raise ValueError("Двухфазный коммит несовместим с режимом upsert")
+        groups = await self._get_groups(warehouse)
+        if groups:
+            await self._write_parallel(groups, two_phase=True)
     
     async def write(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
         """
         Записывает данные из warehouse в базу данных.
         
+        Строки группируются по набору непустых столбцов и пишутся пачками
+        по batch_size (или размеру от batch_controller) в одной транзакции (при parallel > 1 — параллельно по
+        нескольким соединениям). В режиме upsert каждая пачка сначала
+        копируется во временную таблицу и затем сливается с целевой.
+        
         Args:
             warehouse: Список словарей с данными для записи
         """
-        if not warehouse:
+        if self.two_phase:
+            await self.prepare(warehouse)
+            await self.commit_prepared()
             return
         
-        # Подключаемся к базе данных, если еще не подключены
-        await self.connect()
+        groups = await self._get_groups(warehouse)
+        if not groups:
+            return
         
-        # Начинаем транзакцию
-        async with self.connection_pool.acquire() as conn:
-            async with conn.transaction():
-                for item in warehouse:
-                    # Извлекаем данные для вставки
-                    data = {}
-                    for field_name, field_data in item.items():
-                        if field_name in self.field_names:
-                            data[field_name] = field_data.get('final_value')
-                    
-                    if not self.skip_validation:
-                        # Создаем динамическую Pydantic-модель для валидации
-                        model_fields = {}
-                        for field_name, value in data.items():
-                            field_type = type(value) if value is not None else str
-                            model_fields[field_name] = (Optional[field_type], Field(None))
-                        
-                        DynamicModel = create_model('DynamicModel', **model_fields)
-                        
-                        # Валидируем данные через pydantic
-                        validated_data = DynamicModel(**data).dict(exclude_none=True)
-                    else:
-                        # Пропускаем валидацию
-                        validated_data = {k: v for k, v in data.items() if v is not None}
-                    
-                    # Если данных нет, пропускаем запись
-                    if not validated_data:
-                        continue
-                    
-                    # Формируем SQL-запрос для вставки
-                    fields = list(validated_data.keys())
-                    placeholders = [f"${i+1}" for i in range(len(fields))]
-                    values = list(validated_data.values())
-                    
-                    query = f"""
-                    INSERT INTO {self.schema}.{self.table} ({", ".join(fields)})
-                    VALUES ({", ".join(placeholders)})
-                    """
-                    
-                    # Выполняем запрос
-                    await conn.execute(query, *values)
-    
-    def _get_python_type(self, type_name: str) -> type:
-        """Преобразует имя типа в Python-тип"""
+        if self.parallel > 1 and self._count_batches(groups) > 1:
+            await self._write_parallel(groups, two_phase=False)
+            return
+        
+        self.stats["rows"] += await self._write_transaction(groups)
+    
+    def _get_python_type(self, type_name: Optional[str]) -> Any:
+        """Преобразует имя типа в Python-тип (неизвестные типы не проверяются)"""
         type_mapping = {
             'int': int,
             'str': str,
             'float': float,
             'bool': bool,
+            # Коллекции пайплайн не приводит к типу, поэтому их проверяет только writer
+            'dict': dict,
+            'list': list,
+            'tuple': tuple,
+            'set': set,
             'None': type(None)
         }
-        return type_mapping.get(type_name, str)
+        return type_mapping.get(type_name, Any)
@@ -0,0 +1,249 @@
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import sqlite3
+import time
+
+from src.generator.python.resources.batch_controller import BatchSizeController
+
+
+class SqliteTargetWriter:
+    """
+    Writer для записи данных в SQLite.
+
+    Таблица создается по типам полей из DSL (final_type), если ее нет,
+    иначе проверяется наличие всех столбцов. Строки пишутся пачками
+    executemany в явных транзакциях, база переводится в режим WAL.
+    Работа с базой идет в отдельном потоке, чтобы не блокировать event loop
+    во время параллельной записи таргетов.
+    """
+
+    SQLITE_TYPES = {
+        "int": "INTEGER",
+        "bool": "INTEGER",
+        "float": "REAL",
+        "str": "TEXT",
+    }
+    JSON_TYPES = ("dict", "list", "tuple", "set")
+
+    def __init__(
+        self,
+        target_name: str,
+        field_names: List[str],
+        db_config: Optional[Dict[str, Any]] = None,
+        field_types: Optional[Dict[str, str]] = None,
+        batch_size: int = 10000,
+        upsert_keys: Optional[List[str]] = None,
+        skip_unchanged: bool = False,
+        wal: bool = True,
+        batch_controller: Optional[BatchSizeController] = None
+    ):
+        """
+        Инициализирует SQLite writer.
+
+        Args:
+            target_name: Таргет в формате "путь/к/базе.db:таблица"
+            field_names: Список имен полей для записи
+            db_config: Не используется (общая сигнатура writer'ов)
+            field_types: Типы полей из DSL {final_name: final_type}
+            batch_size: Количество строк в одном executemany
+            upsert_keys: Ключевые столбцы; если заданы, строки обновляются по ключу
+            skip_unchanged: Не обновлять строки, значения которых не изменились
+            wal: Включить журнал WAL
+            batch_controller: Адаптивный размер пачки (вместо постоянного batch_size)
+        """
+        self.target_name = target_name
+        self.field_names = field_names
+        self.field_types = field_types or {}
+        self.batch_size = max(1, batch_size)
+        self.upsert_keys = list(upsert_keys or [])
+        self.skip_unchanged = skip_unchanged
+        self.wal = wal
+        self.batch_controller = batch_controller
+        self.db_path, _, self.table = target_name.rpartition(":")
+        if not self.db_path or not self.table:
+            raise ValueError(f"Ожидается таргет вида 'путь.db:таблица', получено: {target_name}")
+        missing_keys = [key for key in self.upsert_keys if key not in field_names]
+        if missing_keys:
+            raise ValueError(f"Ключевые поля отсутствуют среди полей таргета: {', '.join(missing_keys)}")
+
+        self.connection = None
+        self.stats = {"rows": 0, "batches": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dtrt-sqlite")
+        self._insert_query = None
+        self._in_transaction = False
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Экранирует идентификатор SQLite"""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    async def _run(self, func, *args) -> Any:
+        """Выполняет операцию с базой в потоке writer'а"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _table_columns(self) -> List[str]:
+        rows = self.connection.execute(f"PRAGMA table_info({self._quote(self.table)})").fetchall()
+        return [row[1] for row in rows]
+
+    def _create_table_sql(self) -> str:
+        """Формирует CREATE TABLE по типам полей из DSL"""
+        columns = [
+            f"{self._quote(field_name)} {self.SQLITE_TYPES.get(self.field_types.get(field_name), '')}".rstrip()
+            for field_name in self.field_names
+        ]
+        if self.upsert_keys:
+            columns.append(f"PRIMARY KEY ({', '.join(self._quote(key) for key in self.upsert_keys)})")
+        return f"CREATE TABLE {self._quote(self.table)} ({', '.join(columns)})"
+
+    def _insert_sql(self) -> str:
+        """Формирует INSERT (или upsert) для всех полей таргета"""
+        quoted = [self._quote(field_name) for field_name in self.field_names]
+        query = (
+            f"INSERT INTO {self._quote(self.table)} ({', '.join(quoted)}) "
+            f"VALUES ({', '.join('?' for _ in quoted)})"
+        )
+        if not self.upsert_keys:
+            return query
+
+        updated = [self._quote(name) for name in self.field_names if name not in self.upsert_keys]
+        query += f" ON CONFLICT ({', '.join(self._quote(key) for key in self.upsert_keys)}) DO "
+        if not updated:
+            return query + "NOTHING"
+        query += "UPDATE SET " + ", ".join(f"{column} = excluded.{column}" for column in updated)
+        if self.skip_unchanged:
+            table = self._quote(self.table)
+            query += " WHERE " + " OR ".join(f"{table}.{column} IS NOT excluded.{column}" for column in updated)
+        return query
+
+    def _open_sync(self) -> List[str]:
+        """
+        Открывает базу, включает WAL и создает таблицу, если ее нет.
+
+        Returns:
+            Поля таргета, отсутствующие в существующей таблице
+        """
+        if not self.connection:
+            self.connection = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            if self.wal:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        columns = self._table_columns()
+        if not columns:
+            self.connection.execute(self._create_table_sql())
+            return []
+        return [field_name for field_name in self.field_names if field_name not in columns]
+
+    def _connect(self) -> None:
+        """Открывает базу и проверяет таблицу перед первой записью"""
+        if self._insert_query:
+            return
+        missing_fields = self._open_sync()
+        if missing_fields:
+            raise ValueError(f"В таблице {self.table} отсутствуют столбцы: {', '.join(missing_fields)}")
+        self._insert_query = self._insert_sql()
+
+    async def check_schema(self) -> Tuple[List[str], List[str]]:
+        """
+        Создает или проверяет таблицу до чтения данных.
+
+        Returns:
+            Кортеж (отсутствующие столбцы, несовпадения типов); типы не
+            проверяются: столбцы SQLite хранят значения любого типа
+        """
+        return await self._run(self._open_sync), []
+
+    async def validate_fields(self) -> tuple:
+        """
+        Проверяет существование полей в таблице (отсутствующая таблица будет создана).
+
+        Returns:
+            Кортеж (is_valid, missing_fields)
+        """
+        missing_fields, _ = await self.check_schema()
+        return not missing_fields, missing_fields
+
+    def _encode(self, value: Any, type_name: Optional[str]) -> Any:
+        """Приводит значение к типу, который умеет хранить SQLite"""
+        if value is None or isinstance(value, (int, float, str, bytes)):
+            return value
+        if type_name in self.JSON_TYPES or isinstance(value, (dict, list, tuple, set)):
+            return json.dumps(list(value) if isinstance(value, set) else value, ensure_ascii=False, default=str)
+        return str(value)
+
+    def _rows(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> List[Tuple[Any, ...]]:
+        fields = [(field_name, self.field_types.get(field_name)) for field_name in self.field_names]
+        encode = self._encode
+        return [
+            tuple(
+                encode(item[field_name]['final_value'], type_name) if field_name in item else None
+                for field_name, type_name in fields
+            )
+            for item in warehouse
+        ]
+
+    def _write_sync(self, warehouse: List[Dict[str, Dict[str, Any]]], commit: bool) -> None:
+        self._connect()
+        rows = self._rows(warehouse)
+        if not self._in_transaction:
+            self.connection.execute("BEGIN")
+            self._in_transaction = True
+        try:
+            start = 0
+            while start < len(rows):
+                size = self.batch_controller.size if self.batch_controller else self.batch_size
+                batch = rows[start:start + size]
+                started = time.perf_counter()
+                self.connection.executemany(self._insert_query, batch)
+                if self.batch_controller:
+                    self.batch_controller.record(len(batch), time.perf_counter() - started, batch[0])
+                self.stats["batches"] += 1
+                start += size
+            if commit:
+                self._finish_sync("COMMIT")
+        except BaseException:
+            self._finish_sync("ROLLBACK")
+            raise
+        self.stats["rows"] += len(rows)
+
+    def _finish_sync(self, command: str) -> None:
+        if self._in_transaction:
+            self._in_transaction = False
+            self.connection.execute(command)
+
+    async def write(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Записывает данные из warehouse в таблицу одной транзакцией.
+
+        Args:
+            warehouse: Список словарей с данными для записи
+        """
+        if warehouse:
+            await self._run(self._write_sync, warehouse, True)
+
+    async def prepare(self, warehouse: List[Dict[str, Dict[str, Any]]]) -> None:
+        """Записывает данные, оставляя транзакцию открытой до commit_prepared"""
+        await self._run(self._write_sync, warehouse, False)
+
+    async def commit_prepared(self) -> None:
+        await self._run(self._finish_sync, "COMMIT")
+
+    async def rollback_prepared(self) -> None:
+        await self._run(self._finish_sync, "ROLLBACK")
+
+    async def close(self) -> None:
+        """Закрывает соединение (незафиксированная транзакция откатывается)"""
+        if self._executor is None:
+            return
+
+        def close_sync():
+            if self.connection:
+                self._finish_sync("ROLLBACK")
+                self.connection.close()
+                self.connection = None
+
+        await self._run(close_sync)
+        self._executor.shutdown(wait=False)
+        self._executor = None
@@ -1,8 +1,24 @@
 import pytest
+import sqlite3
 import sys
 import os
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_environment():
     """Фикстура для настройки окружения перед всеми тестами"""
-    yield
\ No newline at end of file
+    yield
+
+
+@pytest.fixture
+def flats_db(tmp_path):
+    """База SQLite с тестовой таблицей flats"""
+    db_path = tmp_path / "flats.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE flats (id INTEGER PRIMARY KEY, rooms TEXT, price INTEGER, comment TEXT)")
+    conn.executemany(
+        "INSERT INTO flats (id, rooms, price, comment) VALUES (?, ?, ?, ?)",
+        [(i, str(i % 4), i * 1000, f"flat {i}") for i in range(1, 101)]
+    )
+    conn.commit()
+    conn.close()
+    return str(db_path)
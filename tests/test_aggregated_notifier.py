@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.notifiers.aggregated_notifier import AggregatedNotifier
+
+
+class RecordingNotifier:
+    """Нотификатор, запоминающий вызовы и поток, в котором они пришли"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def __getattr__(self, name):
+        def record(*args):
+            self.calls.append((name, *args))
+            self.threads.add(threading.current_thread().name)
+        return record
+
+
+class TestAggregatedNotifier:
+    """Агрегация событий и вывод в фоновом потоке"""
+
+    def test_sampling_and_summary(self):
+        inner = RecordingNotifier()
+        notifier = AggregatedNotifier(notifier=inner, sample_first=2, sample_interval=3600)
+
+        for _ in range(10):
+            notifier.event_notify("SKIP", "no price", route="dict/out: price")
+        notifier.event_notify("NOTIFY", "cheap", route="dict/out: price")
+        notifier.info("done")
+        summary = notifier.summary()
+        notifier.close()
+
+        assert summary[0] == {"route": "dict/out: price", "event": "SKIP", "message": "no price", "count": 10}
+        assert [call for call in inner.calls if call[0] == "event_notify"] == [
+            ("event_notify", "SKIP", "no price", "dict/out: price"),
+            ("event_notify", "SKIP", "no price", "dict/out: price"),
+            ("event_notify", "NOTIFY", "cheap", "dict/out: price"),
+        ]
+        assert inner.calls[-1][1].endswith("10 раз")
+        assert inner.threads == {"dtrt-notifier"}
+
+    def test_rate_limited_samples(self):
+        inner = RecordingNotifier()
+        notifier = AggregatedNotifier(notifier=inner, sample_first=1, sample_interval=0)
+
+        for _ in range(3):
+            notifier.event_notify("NOTIFY", "x")
+        notifier.close()
+
+        assert [call[2] for call in inner.calls[:3]] == ["x", "x (повторений: 2)", "x (повторений: 3)"]
+
+    def test_run_summary(self):
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=dict/out
+        target2=dict/all
+        target1:
+            [price] -> |IF($this == None): SKIP("no price")| -> [price](int)
+        target2:
+            [price] -> [price](int)
+        """).compile_ic()
+        source = [{"price": None if i % 2 else i} for i in range(10)]
+
+        result = asyncio.run(DtrtRunner(ic, notifier_type="aggregated", source_data=source).run())
+
+        assert len(result["data"]["dict/out"]) == 5
+        assert result["events"] == [{"route": "dict/out: price", "event": "SKIP", "message": "no price", "count": 5}]
@@ -590,6 +590,42 @@ class TestDuplicateTargetNameTypeError(TestBaseDSL):
         )
 
 
+class TestUnknownTargetKeyError(TestBaseDSL):
+    """Ключевое поле цели не записывается маршрутами (UNKNOWN_TARGET_KEY)"""
+    @pytest.mark.parametrize("test_id, test_case", [
+        (
+            "case_1",
+            '''
+            lang=py
+            source=dict/my_dict
+            target1=sqlite/x.db:t[nope]
+            target1:
+                [id] -> [id](int)
+            '''
+        ),
+        (
+            "case_2",
+            '''
+            lang=py
+            source=dict/my_dict
+            target1=postgres/public.flats[id, uuid]
+            target1:
+                [id] -> [id](int)
+                [uuid] -> [$uuid](str)
+            '''
+        ),
+    ], ids=["case_1", "case_2"])
+    def test_start(self, capsys, test_id, test_case):
+        self.run_test(
+            capsys,
+            test_case,
+            Messages.Error.UNKNOWN_TARGET_KEY,
+            Messages.Hint.UNKNOWN_TARGET_KEY,
+            partial_error="Ключевое поле цели не записывается маршрутами",
+            partial_hint="должны быть итоговыми полями маршрутов этой цели"
+        )
+
+
 class TestNotDefinedVarErrors(TestBaseDSL):
     """Неопределённая переменная"""
     
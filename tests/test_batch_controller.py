@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.resources.batch_controller import BatchSizeController
+from src.generator.python.source_getters.pydict_source_getter import PydictSourceGetter
+from src.generator.python.target_writers.pg_target_writer import PgTargetWriter
+from tests.test_pg_target_writer import FakePool, row
+
+
+class TestBatchSizeController:
+    """Подбор размера пачки по схеме AIMD"""
+
+    def test_additive_increase(self):
+        controller = BatchSizeController(initial=100, min_size=10, max_size=250)
+
+        assert [controller.record(100, 0.1) for _ in range(3)] == [200, 250, 250]
+        assert controller.stats()["largest"] == 250
+
+    def test_multiplicative_decrease(self):
+        controller = BatchSizeController(initial=1000, min_size=100, target_latency=1.0)
+
+        controller.record(1000, 0.5)
+        assert controller.record(2000, 2.0) == 1000
+        assert controller.record(1000, 5.0) == 500
+        assert controller.decreases == 2
+
+    def test_throughput_drop(self):
+        controller = BatchSizeController(initial=1000, min_size=100)
+
+        controller.record(1000, 1.0)
+        assert controller.record(2000, 4.0) == 1000
+
+    def test_memory_budget(self):
+        controller = BatchSizeController(initial=1000, min_size=10, memory_budget=10000)
+
+        size = controller.record(1000, 1.0, {"id": 1, "comment": "x" * 100})
+        assert size == 10000 // controller.bytes_per_row
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            BatchSizeController(min_size=100, max_size=10)
+
+    def test_getter_uses_controller(self):
+        getter = PydictSourceGetter([{"id": i} for i in range(10)], ["id"])
+        getter.batch_controller = BatchSizeController(initial=2, min_size=1, step=1)
+        sizes = []
+        for batch in getter.iter_batches(2):
+            sizes.append(len(batch))
+            getter.batch_controller.record(len(batch), 0.1)
+
+        assert sizes == [2, 3, 4, 1]
+
+    def test_pg_writer_uses_controller(self):
+        controller = BatchSizeController(initial=10, min_size=5, step=10)
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_controller=controller)
+        writer.connection_pool = FakePool()
+
+        asyncio.run(writer.write([row(a=i) for i in range(100)]))
+        calls = writer.connection_pool.connections[-1].calls
+
+        assert [len(call[2]) for call in calls] == [10, 20, 30, 40]
+        assert controller.batches == 4 and writer.stats["rows"] == 100
+
+
+class TestAdaptiveBatchRun:
+    """Адаптивный размер пачки в запуске"""
+
+    def test_sizes_in_result(self, flats_db, tmp_path):
+        ic = DataRoute(f"""
+        lang=py
+        source=sqlite/{flats_db}:flats
+        target1=sqlite/{tmp_path / "out.db"}:flats
+        target1:
+            [id] -> [id](int)
+            [price] -> [price](int)
+        """).compile_ic()
+
+        result = asyncio.run(DtrtRunner(
+            ic,
+            source_config={"batch_size": 10, "adaptive_batch": True, "min_batch_size": 5},
+            target_config={"batch_size": 20, "adaptive_batch": True, "min_batch_size": 5},
+        ).run())
+
+        assert result["status"] == "success"
+        assert result["results"] == {f"sqlite/{tmp_path / 'out.db'}:flats": 100}
+        source = result["batch_sizes"]["source"]
+        assert source["batches"] >= 2 and source["smallest"] >= 5
+        target = next(iter(result["batch_sizes"]["targets"].values()))
+        assert target["batches"] >= 1
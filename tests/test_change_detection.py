@@ -0,0 +1,118 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.state.change_detector import ChangeDetector
+from src.generator.python.state.hash_store import open_hash_store
+from src.generator.python.target_writers.dict_target_writer import DictTargetWriter
+
+
+def row(**values):
+    return {name: {"final_value": value} for name, value in values.items()}
+
+
+IC_DSL = """
+lang=py
+source=dict/feed
+target1=dict/out[id]
+target1:
+    [id] -> [id](int)
+    [price] -> [price](int)
+"""
+
+
+def run(source, state_path):
+    ic = DataRoute(IC_DSL).compile_ic()
+    return asyncio.run(DtrtRunner(ic, source_data=source, write_config={"change_state": state_path}).run())
+
+
+class TestChangeDetector:
+    """Отбор новых и изменившихся строк"""
+
+    @pytest.mark.parametrize("file_name", ["hashes.db", "hashes.dbm"])
+    def test_only_changed_rows(self, tmp_path, file_name):
+        store = open_hash_store(str(tmp_path / file_name))
+        detector = ChangeDetector(store, "dict/out", ["id"], ["id", "price"])
+
+        assert len(detector.filter([row(id=1, price=10), row(id=2, price=20)])) == 2
+        detector.commit()
+        changed = detector.filter([row(id=1, price=10), row(id=2, price=25), row(id=3, price=30), row(price=1)])
+
+        assert [item["price"]["final_value"] for item in changed] == [25, 30, 1]
+        assert detector.stats == {"rows": 6, "changed": 4, "unchanged": 1, "untracked": 1}
+        store.close()
+
+    def test_unknown_key(self, tmp_path):
+        with pytest.raises(ValueError):
+            ChangeDetector(None, "dict/out", ["uuid"], ["id"])
+
+
+class TestChangeDetectionRun:
+    """Отбор изменившихся строк в запуске"""
+
+    def test_second_run_writes_changes(self, tmp_path):
+        state_path = str(tmp_path / "hashes.db")
+        first = run([{"id": i, "price": i * 10} for i in range(5)], state_path)
+        second = run([{"id": i, "price": 99 if i == 3 else i * 10} for i in range(5)], state_path)
+
+        assert len(first["data"]["dict/out"]) == 5
+        assert [item["id"]["final_value"] for item in second["data"]["dict/out"]] == [3]
+        assert second["change_detection"]["dict/out"]["unchanged"] == 4
+
+    def test_state_kept_on_failure(self, tmp_path, monkeypatch):
+        state_path = str(tmp_path / "hashes.db")
+        source = [{"id": i, "price": i} for i in range(3)]
+
+        async def fail(self, warehouse):
+            raise RuntimeError("запись не удалась")
+        with monkeypatch.context() as patch:
+            patch.setattr(DictTargetWriter, "write", fail)
+            assert run(source, state_path)["status"] == "error"
+
+        assert len(run(source, state_path)["data"]["dict/out"]) == 3
+
+    def test_change_keys_upsert_table(self, tmp_path):
+        db_path = tmp_path / "out.db"
+        ic = DataRoute(f"""
+lang=py
+source=dict/feed
+target1=sqlite/{db_path}:flats
+target1:
+    [id] -> [id](int)
+    [price] -> [price](int)
+""").compile_ic()
+        write_config = {
+            "change_state": str(tmp_path / "hashes.db"),
+            "change_keys": {f"sqlite/{db_path}:flats": ["id"]}
+        }
+        for prices in ([10, 20], [10, 30]):
+            source = [{"id": i, "price": price} for i, price in enumerate(prices)]
+            assert asyncio.run(DtrtRunner(ic, source_data=source, write_config=write_config).run())["status"] == "success"
+
+        # Изменившаяся строка обновлена по ключу, а не записана второй копией
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT id, price FROM flats ORDER BY id").fetchall() == [(0, 10), (1, 30)]
+        conn.close()
+
+    def test_change_keys_differ_from_upsert(self, tmp_path):
+        db_path = tmp_path / "out.db"
+        ic = DataRoute(f"""
+lang=py
+source=dict/feed
+target1=sqlite/{db_path}:flats[id]
+target1:
+    [id] -> [id](int)
+    [price] -> [price](int)
+""").compile_ic()
+        write_config = {
+            "change_state": str(tmp_path / "hashes.db"),
+            "change_keys": {f"sqlite/{db_path}:flats": ["price"]}
+        }
+        result = asyncio.run(DtrtRunner(ic, source_data=[{"id": 1, "price": 2}], write_config=write_config).run())
+
+        assert result["status"] == "error"
+        assert "ключи отбора ['price']" in result["error"]
+        assert not db_path.exists()
@@ -0,0 +1,40 @@
+from benchmarks.compiler_bench import compare, run_case
+from benchmarks.dsl_generator import DslShape, generate_dsl
+from dataroute import DataRoute
+
+
+class TestDslGenerator:
+    """Синтетические программы DSL"""
+
+    def test_compiles_with_dependencies(self):
+        shape = DslShape(routes=30, targets=2, depth=3, condition_density=0.5, var_refs=0.3)
+        text = generate_dsl(shape)
+
+        ic = DataRoute(text).compile_ic()
+
+        assert text == generate_dsl(shape)
+        assert len(ic["dict/out1"]["routes"]) == 15 and len(ic["dict/out2"]["routes"]) == 15
+        assert len(ic["dict/out1"]["execution_plan"]) > 1
+
+
+class TestCompilerBench:
+    """Измерение стадий и сравнение с базовыми результатами"""
+
+    def test_run_case(self):
+        case = run_case(DslShape(routes=10), repeat=1)
+
+        assert set(case["stages"]) == {"lex", "parse", "generate", "total"}
+        assert case["stages"]["parse"]["peak"] > 0
+        assert case["lines"] == generate_dsl(DslShape(routes=10)).count("\n")
+
+    def test_compare(self):
+        def results(**timings):
+            return {"cases": [
+                {"name": name, "stages": {"total": {"min": seconds}}} if seconds else {"name": name, "skipped": "budget"}
+                for name, seconds in timings.items()
+            ]}
+
+        baseline = results(a=1.0, b=1.0, c=1.0, d=0.002)
+        current = results(a=1.1, b=2.0, c=None, d=0.008)
+
+        assert [(item["case"], item["current"]) for item in compare(current, baseline)] == [("b", 2.0), ("c", None)]
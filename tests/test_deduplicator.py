@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.state.bloom_filter import BloomFilter
+from src.generator.python.state.deduplicator import Deduplicator
+from src.generator.python.state.spilling_hash_set import SpillingHashSet
+
+
+def key(value):
+    return hashlib.blake2b(str(value).encode(), digest_size=16).digest()
+
+
+def row(**values):
+    return {name: {"final_value": value} for name, value in values.items()}
+
+
+class TestSpillingHashSet:
+    """Точное множество с вытеснением на диск"""
+
+    def test_exact_after_spill(self, tmp_path):
+        seen = SpillingHashSet(memory_limit=SpillingHashSet.ENTRY_BYTES * 10, spill_dir=str(tmp_path))
+
+        first = seen.add_many([key(i) for i in range(50)])
+        second = seen.add_many([key(i) for i in range(40, 60)] + [key(59)])
+        stats = seen.stats()
+        path = seen.path
+        seen.close()
+
+        assert all(first)
+        assert second == [False] * 10 + [True] * 10 + [False]
+        assert stats["spills"] >= 1 and stats["spilled"] + stats["in_memory"] == 60
+        assert not os.path.exists(path)
+
+
+class TestBloomFilter:
+    """Приближенное множество"""
+
+    def test_error_rate(self):
+        bloom = BloomFilter(10000, error_rate=0.01)
+        bloom.add_many([key(i) for i in range(10000)])
+        false_positives = sum(key(i) in bloom for i in range(10000, 20000))
+
+        assert all(key(i) in bloom for i in range(10000))
+        assert false_positives < 300
+        assert bloom.error_rate < 0.02
+
+    def test_memory_cap(self):
+        bloom = BloomFilter(1000000, error_rate=0.001, max_bytes=1024)
+
+        assert len(bloom.array) == 1024
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            BloomFilter(10, error_rate=1.5)
+
+
+class TestDeduplicator:
+    """Отбрасывание повторов по ключевым полям"""
+
+    def test_across_batches(self):
+        deduplicator = Deduplicator("dict/out", ["id", "kind"], SpillingHashSet())
+
+        first = deduplicator.filter([row(id=1, kind="a"), row(id=1, kind="b"), row(id=1, kind="a")])
+        second = deduplicator.filter([row(id=1, kind="b"), row(kind="c"), row(id=2, kind="a")])
+
+        assert [(item.get("id", {}).get("final_value"), item["kind"]["final_value"]) for item in first + second] == [
+            (1, "a"), (1, "b"), (None, "c"), (2, "a")
+        ]
+        assert deduplicator.stats["duplicates"] == 2 and deduplicator.stats["untracked"] == 1
+
+    @pytest.mark.parametrize("mode", ["exact", "bloom"])
+    def test_run_report(self, mode):
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=dict/out[id]
+        target1:
+            [id] -> [id](int)
+            [price] -> [price](int)
+        """).compile_ic()
+        source = [{"id": i % 7, "price": i} for i in range(20)]
+
+        result = asyncio.run(DtrtRunner(
+            ic, source_data=source, source_config={"batch_size": 6}, write_config={"dedup": mode}
+        ).run())
+
+        assert [item["price"]["final_value"] for item in result["data"]["dict/out"]] == list(range(7))
+        assert result["dedup"]["dict/out"]["duplicates"] == 13
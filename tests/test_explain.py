@@ -0,0 +1,66 @@
+import asyncio
+import pstats
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.explain import build_plan, explain
+from src.generator.python.metrics.profiler import collapsed_stacks
+
+
+DSL = """
+lang=py
+source=dict/feed
+target1=dict/out
+target1:
+    [price] -> |IF($this == None): SKIP("no price") ELSE: *upper| -> [price](str)
+    [name] -> |*upper| -> [name](str)
+"""
+
+
+def compile_ic(tmp_path):
+    (tmp_path / "upper.py").write_text("def func(value):\n    return str(value).upper()\n")
+    return DataRoute(DSL, func_folder=str(tmp_path)).compile_ic()
+
+
+class TestExplain:
+    """План выполнения и профиль запуска"""
+
+    def test_plan(self, tmp_path):
+        ic = compile_ic(tmp_path)
+
+        plan = build_plan(ic, user_functions_path=str(tmp_path))
+        routes = {route["route"]: route for level in plan[0]["levels"] for route in level}
+
+        assert plan[0]["target"] == "dict/out"
+        assert routes["price"]["steps"][0]["type"] == "condition"
+        assert routes["price"]["steps"][0]["functions"][0]["resolved"].startswith(f"upper.func ({tmp_path}")
+        assert "calls=" not in explain(ic, str(tmp_path))
+
+    def test_profile_run(self, tmp_path):
+        ic = compile_ic(tmp_path)
+        source = [{"price": None if i % 2 else i, "name": "x"} for i in range(10)]
+        runner = DtrtRunner(
+            ic, str(tmp_path), source_data=source,
+            profile={"pstats": str(tmp_path / "run.pstats"), "collapsed": str(tmp_path / "run.collapsed")}
+        )
+
+        result = asyncio.run(runner.run())
+        steps = {(step["route"], step["step"]): step for step in result["profile"]["steps"]}
+        text = explain(ic, str(tmp_path), runner.hooks.profiler)
+
+        assert steps[("price", 1)]["calls"] == 10 and steps[("name", 1)]["calls"] == 10
+        assert 0 < steps[("name", 1)]["share"] < 1
+        assert "name -> name(str)" in text and "p99=" in text
+        # Время функции может быть меньше порога collapsed stacks, поэтому ее вызовы проверяются по pstats
+        functions = pstats.Stats(str(tmp_path / "run.pstats")).stats
+        assert any(filename.endswith("upper.py") and name == "func" for filename, _, name in functions)
+        assert (tmp_path / "run.collapsed").stat().st_size > 0
+
+    def test_collapsed_stacks(self):
+        root, child = ("a.py", 1, "main"), ("b.py", 2, "work")
+        stats = {
+            root: (1, 1, 0.001, 0.003, {}),
+            child: (2, 2, 0.002, 0.002, {root: (2, 2, 0.002, 0.002)}),
+        }
+
+        assert collapsed_stacks(stats) == [("a.py:main:1", 1000), ("a.py:main:1;b.py:work:2", 2000)]
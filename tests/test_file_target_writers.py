@@ -0,0 +1,119 @@
+import asyncio
+import csv
+import gzip
+import json
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.target_writers.base_file_target_writer import BaseFileTargetWriter
+from src.generator.python.target_writers.csv_target_writer import CsvTargetWriter
+from src.generator.python.target_writers.jsonl_target_writer import JsonlTargetWriter
+
+
+def row(**values):
+    return {name: {"final_value": value} for name, value in values.items()}
+
+
+async def write_batches(writer, *batches):
+    for batch in batches:
+        await writer.write(batch)
+    await writer.close()
+
+
+class TestFileTargetWriters:
+    """Файловые таргеты"""
+
+    def test_jsonl(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        writer = JsonlTargetWriter(str(path), ["id", "name"])
+        asyncio.run(write_batches(writer, [row(id=1, name="Дом"), row(id=2)], [row(id=3, name=None)]))
+
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert lines == [{"id": 1, "name": "Дом"}, {"id": 2, "name": None}, {"id": 3, "name": None}]
+        assert writer.stats["rows"] == 3
+
+    def test_csv_gzip(self, tmp_path):
+        path = tmp_path / "out.csv.gz"
+        writer = CsvTargetWriter(str(path), ["id", "comment"], delimiter=";")
+        asyncio.run(write_batches(writer, [row(id=1, comment="a;b"), row(id=2, comment=None)]))
+
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            assert list(csv.reader(f, delimiter=";")) == [["id", "comment"], ["1", "a;b"], ["2", ""]]
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_text("old\n")
+        writer = JsonlTargetWriter(str(path), ["id"])
+
+        async def run():
+            await writer.write([row(id=1)])
+            with pytest.raises(TypeError):
+                await writer.write([{"id": "broken"}])
+            await writer.close()
+
+        asyncio.run(run())
+        assert path.read_text() == "old\n"
+        assert [p.name for p in tmp_path.iterdir()] == ["out.jsonl"]
+
+    def test_writer_without_encoder(self, tmp_path):
+        # Формат без _encode_batch не создается, а не падает на первой пачке
+        writer_class = type("NoEncoder", (BaseFileTargetWriter,), {})
+        with pytest.raises(TypeError):
+            writer_class(str(tmp_path / "out.txt"), ["id"])
+        assert not list(tmp_path.iterdir())
+
+    def test_dict_target_result(self, tmp_path):
+        ic = DataRoute(f"""
+        lang=py
+        source=dict/feed
+        target1=dict/memory
+        target2=jsonl/{tmp_path}/flats.jsonl
+        target1:
+            [id] -> [id](int)
+        target2:
+            [id] -> [id](str)
+        """).compile_ic()
+
+        result = asyncio.run(DtrtRunner(ic, source_data=[{"id": 1}, {"id": 2}]).run())
+
+        assert [item["id"]["final_value"] for item in result["data"]["dict/memory"]] == [1, 2]
+        assert (tmp_path / "flats.jsonl").read_text() == '{"id": "1"}\n{"id": "2"}\n'
+
+    def test_shared_options_with_mixed_targets(self, tmp_path):
+        ic = DataRoute(f"""
+        lang=py
+        source=dict/feed
+        target1=sqlite/{tmp_path}/flats.db:flats
+        target2=csv/{tmp_path}/flats.csv
+        target3=dict/memory
+        target1:
+            [id] -> [id](int)
+        target2:
+            [id] -> [id](int)
+        target3:
+            [id] -> [id](int)
+        """).compile_ic()
+        target_config = {"batch_size": 2, "adaptive_batch": True, "delimiter": ";"}
+
+        result = asyncio.run(DtrtRunner(ic, source_data=[{"id": 1}, {"id": 2}], target_config=target_config).run())
+
+        assert result["status"] == "success", result.get("error")
+        assert result["write_stats"][f"sqlite/{tmp_path}/flats.db:flats"]["rows"] == 2
+        assert (tmp_path / "flats.csv").read_text().splitlines() == ["id", "1", "2"]
+
+    def test_unknown_target_option(self, tmp_path):
+        ic = DataRoute(f"""
+        lang=py
+        source=dict/feed
+        target1=csv/{tmp_path}/flats.csv
+        target1:
+            [id] -> [id](int)
+        """).compile_ic()
+        target_config = {f"csv/{tmp_path}/flats.csv": {"batch_size": 2}}
+
+        result = asyncio.run(DtrtRunner(ic, source_data=[{"id": 1}], target_config=target_config).run())
+
+        assert result["status"] == "error"
+        assert "batch_size" in result["error"]
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from benchmarks.dsl_generator import DslShape, generate_dsl
+from dsl_compiler.constants import TokenType
+from dsl_compiler.lexer import Lexer
+
+
+DSL = """
+
+    lang=py
+    source=dict/feed
+    # комментарий
+    $limit = 10
+    target1=postgres/public.flats [id, uuid]
+    target1:
+        [id] -> [id](int)
+        [price] -> |*s1|IF($this > $limit): *get($this) ELSE: *get(0)| -> [price](int)
+        [$limit] -> [limit](int)
+"""
+
+
+def tokens(text):
+    return [(token.type, token.value, token.position) for token in Lexer().tokenize(text)]
+
+
+class TestLexer:
+    """Однопроходный лексический анализ"""
+
+    def test_tokens(self):
+        result = tokens(DSL)
+
+        assert [item[0] for item in result] == [
+            TokenType.LANG, TokenType.SOURCE, TokenType.GLOBAL_VAR, TokenType.TARGET,
+            TokenType.ROUTE_HEADER, TokenType.ROUTE_LINE, TokenType.ROUTE_LINE, TokenType.GLOBAL_VAR_USAGE,
+        ]
+        # Номера строк считаются от первой непустой строки
+        assert result[0][2] == 1 and result[3][2] == 5
+        assert result[2][1] == {"name": "limit", "value": 10, "type": "int"}
+        assert result[3][1] == {"name": "target1", "type": "postgres", "value": "public.flats", "keys": ["id", "uuid"]}
+        assert result[6][1]["pipeline"] == "|*s1|IF($this > $limit): *get($this) ELSE: *get(0)|"
+        assert result[6][1]["line"] == "        [price] -> |*s1|IF($this > $limit): *get($this) ELSE: *get(0)| -> [price](int)"
+
+    def test_line_iterator(self):
+        text = generate_dsl(DslShape(routes=200, targets=2, condition_density=0.5))
+
+        assert tokens(io.StringIO(text)) == tokens(text)
+        assert tokens(iter(text.splitlines())) == tokens(text)
+
+    def test_missing_lang_reported_before_line_errors(self, capsys):
+        with pytest.raises(SystemExit):
+            Lexer().tokenize("source=dict/feed\n[a] [b](str)\n")
+        missing = capsys.readouterr().out
+
+        with pytest.raises(SystemExit):
+            Lexer().tokenize("source=dict/feed\n[a] [b](str)\nlang=py\n")
+        line_error = capsys.readouterr().out
+
+        assert missing != line_error
+        with pytest.raises(SystemExit):
+            Lexer().tokenize("source=dict/feed\n")
+        assert capsys.readouterr().out == missing
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import tracemalloc
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.metrics.memory_tracker import MemoryTracker
+
+
+class TestMemoryTracker:
+    """Учет памяти по стадиям"""
+
+    def test_peak_and_retained(self):
+        tracker = MemoryTracker(top=3)
+        tracker.start()
+        kept = []
+        try:
+            with tracker.stage("alloc"):
+                kept.append(bytearray(1_000_000))
+                temporary = bytearray(2_000_000)
+                del temporary
+        finally:
+            tracker.stop()
+        stage = tracker.report()["stages"]["alloc"]
+
+        assert not tracemalloc.is_tracing()
+        assert 1_000_000 <= stage["retained"] < 1_100_000
+        assert stage["peak"] >= 3_000_000
+        assert "test_memory_tracker.py:" in stage["top"][0]["site"]
+        assert stage["top"][0]["size"] >= 1_000_000
+
+    def test_snapshot_first_call_only(self, monkeypatch):
+        snapshots = []
+        take_snapshot = tracemalloc.take_snapshot
+        monkeypatch.setattr(tracemalloc, "take_snapshot", lambda: snapshots.append(1) or take_snapshot())
+        tracker = MemoryTracker(top=3)
+        every_call = MemoryTracker(top=3, snapshot_calls=None)
+        tracker.start()
+        try:
+            for _ in range(3):
+                with tracker.stage("batch"):
+                    pass
+            assert len(snapshots) == 2
+            for _ in range(3):
+                with every_call.stage("batch"):
+                    pass
+            assert len(snapshots) == 8
+        finally:
+            tracker.stop()
+
+        assert tracker.report()["stages"]["batch"]["calls"] == 3
+
+    def test_run_report(self, tmp_path):
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=dict/out
+        target2=dict/all
+        target1:
+            [price] -> [price](int)
+        target2:
+            [price] -> [price](str)
+        """).compile_ic()
+        source = [{"price": i} for i in range(50)]
+        path = tmp_path / "memory.json"
+
+        result = asyncio.run(DtrtRunner(
+            ic, source_data=source, source_config={"batch_size": 20}, memory_profile={"path": str(path), "top": 2}
+        ).run())
+        stages = result["memory"]["stages"]
+
+        assert {"source init", "source read", "transform dict/out", "transform dict/all",
+                "write dict/out", "write dict/all"} <= set(stages)
+        assert stages["transform dict/out"]["calls"] == 3
+        assert stages["transform dict/out"]["retained"] > 0
+        assert len(stages["transform dict/out"]["top"]) <= 2
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["stages"].keys() == stages.keys()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.metrics.run_hooks import RunHooks
+from src.generator.python.metrics.run_metrics import RunMetrics
+from src.generator.python.pipeline.instrumented_step import InstrumentedStep
+from src.generator.python.pipeline.pipeline_executor import PipelineExecutor
+from src.generator.python.config import STD_FUNCTIONS_PATH
+
+
+def counters(metrics, name):
+    return {tuple(item["labels"].values()): item["value"] for item in metrics["counters"] if item["name"] == name}
+
+
+class TestRunMetrics:
+    """Реестр метрик и форматы экспорта"""
+
+    def test_prometheus_format(self):
+        metrics = RunMetrics(buckets=[0.1, 1.0])
+        metrics.inc("dtrt_events_total", target="dict/out", route='a"b', event="SKIP")
+        metrics.observe("dtrt_step_duration_seconds", 0.05, type="py_func")
+        metrics.observe("dtrt_step_duration_seconds", 2.0, type="py_func")
+
+        text = metrics.to_prometheus()
+
+        assert '# TYPE dtrt_events_total counter' in text
+        assert 'dtrt_events_total{target="dict/out",route="a\\"b",event="SKIP"} 1' in text
+        assert 'dtrt_step_duration_seconds_bucket{type="py_func",le="0.1"} 1' in text
+        assert 'dtrt_step_duration_seconds_bucket{type="py_func",le="+Inf"} 2' in text
+        assert 'dtrt_step_duration_seconds_count{type="py_func"} 2' in text
+
+    def test_export(self, tmp_path):
+        metrics = RunMetrics()
+        metrics.inc("dtrt_source_records_total", 3)
+
+        paths = metrics.export(str(tmp_path / "metrics"))
+
+        with open(paths["json"], encoding="utf-8") as f:
+            assert json.load(f)["counters"][0]["value"] == 3
+        with open(paths["prometheus"], encoding="utf-8") as f:
+            assert "dtrt_source_records_total 3" in f.read()
+
+
+class TestRunHooks:
+    """Инструментирование запуска"""
+
+    def test_disabled_hooks_do_nothing(self):
+        hooks = RunHooks(notifier=None)
+        result = {}
+
+        hooks.start()
+        with hooks.stage("write"), hooks.memory_stage("write"):
+            hooks.record_batch(10, 0.1, 0.2)
+            hooks.record_write("dict/out", 0.1)
+        hooks.report(result, {}, None)
+        hooks.finish()
+
+        assert result == {}
+
+    def test_stage_timed_on_error(self):
+        hooks = RunHooks(notifier=None, metrics_config={})
+
+        try:
+            with hooks.stage("write"):
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        assert list(hooks.metrics.stages()) == ["write"]
+
+
+class TestPipelineMetrics:
+    """Метрики шагов, событий и приведения типов"""
+
+    IC = """
+    lang=py
+    source=dict/feed
+    target1=dict/out
+    target2=dict/all
+    target1:
+        [price] -> |IF($this == None): SKIP("no price")| -> [price](int)
+        [name] -> |*upper| -> [name](str)
+    target2:
+        [price] -> [price](int)
+        [code] -> [code](int)
+    """
+
+    def test_disabled_builds_plain_steps(self):
+        ic = DataRoute(self.IC).compile_ic()
+        executor = PipelineExecutor(ic, STD_FUNCTIONS_PATH)
+
+        steps = executor.pipeline_builders["dict/out"].build_pipeline("price")
+
+        assert steps and not any(isinstance(step, InstrumentedStep) for step in steps)
+        assert executor.pipeline_builders["dict/out"].build_pipeline("price") is steps
+
+    def test_run_metrics(self, tmp_path):
+        (tmp_path / "upper.py").write_text("def func(value):\n    return value.upper()\n")
+        ic = DataRoute(self.IC).compile_ic()
+        source = [{"price": None if i % 2 else i, "name": "x", "code": "abc" if i < 3 else i} for i in range(10)]
+
+        result = asyncio.run(DtrtRunner(
+            ic, str(tmp_path), source_data=source, source_config={"batch_size": 4},
+            metrics_config={"path": str(tmp_path / "metrics")}
+        ).run())
+        metrics = result["metrics"]
+
+        assert counters(metrics, "dtrt_events_total") == {("dict/out", "price", "SKIP"): 5}
+        assert counters(metrics, "dtrt_cast_fallbacks_total") == {("dict/all", "code", "int"): 3}
+        assert counters(metrics, "dtrt_target_rows_total") == {("dict/out",): 5, ("dict/all",): 10}
+        assert counters(metrics, "dtrt_source_records_total") == {(): 10}
+        invocations = counters(metrics, "dtrt_step_invocations_total")
+        assert invocations[("dict/out", "name", "1", "py_func")] == 10
+        assert sum(counters(metrics, "dtrt_step_errors_total").values()) == 0
+        assert result["data"]["dict/out"][0]["name"]["final_value"] == "X"
+        assert set(metrics["stages"]) == {"read", "transform", "write"}
+        assert (tmp_path / "metrics" / "metrics.json").exists() and (tmp_path / "metrics" / "metrics.prom").exists()
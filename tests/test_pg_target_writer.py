@@ -0,0 +1,480 @@
+import asyncio
+import os
+from datetime import datetime
+from decimal import Decimal
+
+import asyncpg
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.resources import pool_manager as pool_manager_module
+from src.generator.python.target_writers.pg_target_writer import PgTargetWriter
+from tests.test_pg_source_getter import db_config_from_dsn
+
+PG_DSN = os.environ.get("DTRT_TEST_PG_DSN")
+
+
+def row(**values):
+    return {name: {"final_value": value} for name, value in values.items()}
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    """Соединение, записывающее вызовы COPY и executemany"""
+
+    def __init__(self, copy_error=None, bad_values=(), columns=None):
+        self.copy_error = copy_error
+        self.bad_values = set(bad_values)
+        self.columns = columns or {}
+        self.calls = []
+        self.executed = []
+        self.fetched = []
+
+    async def execute(self, query):
+        self.executed.append(query)
+
+    async def fetch(self, query, *args):
+        self.fetched.append(args)
+        return [{"column_name": name, "udt_name": udt_name} for name, udt_name in self.columns.items()]
+
+    def transaction(self):
+        return FakeTransaction()
+
+    async def copy_records_to_table(self, table, records, columns, schema_name):
+        await asyncio.sleep(0)
+        if self.copy_error:
+            raise self.copy_error
+        if any(record[0] in self.bad_values for record in records):
+            raise asyncpg.UniqueViolationError("duplicate key value")
+        self.calls.append(("copy", tuple(columns), list(records)))
+
+    async def executemany(self, query, records):
+        self.calls.append(("insert", query, list(records)))
+
+
+class FakePool:
+    """Пул, выдающий отдельное поддельное соединение на каждый acquire"""
+
+    def __init__(self, fail_on=None, bad_values=(), disconnects=0, columns=None):
+        self.fail_on = fail_on
+        self.bad_values = bad_values
+        self.disconnects = disconnects
+        self.columns = columns
+        self.connections = []
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                if pool.disconnects:
+                    pool.disconnects -= 1
+                    raise asyncpg.exceptions.ConnectionDoesNotExistError("connection was closed")
+                conn = FakeConnection(bad_values=pool.bad_values, columns=pool.columns)
+                if pool.fail_on is not None and len(pool.connections) == pool.fail_on:
+                    conn.copy_error = asyncpg.DataError("bad binary value")
+
+                    async def executemany(query, records):
+                        raise asyncpg.DataError("bad value")
+                    conn.executemany = executemany
+                pool.connections.append(conn)
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+    def get_size(self):
+        return len(self.connections)
+
+    get_idle_size = get_min_size = get_max_size = get_size
+
+    async def close(self):
+        pass
+
+
+class TestPgTargetWriterBatches:
+    """Пакетная запись в PostgreSQL без подключения к базе"""
+
+    def test_group_by_non_null_columns(self):
+        writer = PgTargetWriter("public.flats", ["a", "b"], skip_validation=True)
+        groups = writer._group_rows([row(a=1, b=2), row(a=3, b=None), row(a=4, b=5, c=6), row(a=None, b=None)])
+
+        assert groups == {("a", "b"): [(1, 2), (4, 5)], ("a",): [(3,)]}
+
+    def test_copy_in_batches(self):
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_size=2)
+        conn = FakeConnection()
+        records = [(i,) for i in range(5)]
+
+        async def run():
+            for start in range(0, len(records), writer.batch_size):
+                await writer._write_chunk(conn, ("a",), records[start:start + writer.batch_size])
+
+        asyncio.run(run())
+        assert [call[0] for call in conn.calls] == ["copy"] * 3
+        assert writer.stats["copy_batches"] == 3
+
+    @pytest.mark.parametrize("copy_error", [
+        asyncpg.exceptions._base.DataError("bad binary value"),
+        asyncpg.exceptions._base.InternalClientError("no binary format encoder for type tsvector"),
+    ])
+    def test_fallback_to_executemany(self, copy_error):
+        writer = PgTargetWriter("public.flats", ["a", "b"], skip_validation=True)
+        conn = FakeConnection(copy_error=copy_error)
+
+        asyncio.run(writer._write_chunk(conn, ("a", "b"), [(1, 2)]))
+        assert conn.calls == [("insert", 'INSERT INTO "public"."flats" ("a", "b") VALUES ($1, $2)', [(1, 2)])]
+        assert writer.stats["insert_batches"] == 1
+        assert conn.executed == ["SAVEPOINT dtrt_chunk", "ROLLBACK TO SAVEPOINT dtrt_chunk"]
+
+    def test_parallel_connections(self):
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_size=10, parallel=3)
+        writer.connection_pool = FakePool()
+
+        asyncio.run(writer.write([row(a=i) for i in range(95)]))
+        written = [record for conn in writer.connection_pool.connections for call in conn.calls for record in call[2]]
+
+        assert sorted(written) == [(i,) for i in range(95)]
+        assert len(writer.stats["connections"]) == 3
+        assert sum(item["batches"] for item in writer.stats["connections"]) == 10
+        assert writer.stats["rows"] == 95
+
+    def test_two_phase_rollback(self):
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_size=10, parallel=2, two_phase=True)
+        writer.connection_pool = FakePool(fail_on=2)
+
+        with pytest.raises(asyncpg.DataError):
+            asyncio.run(writer.write([row(a=i) for i in range(40)]))
+        _, first, failed, finisher = writer.connection_pool.connections
+
+        assert first.executed[0] == "BEGIN" and first.executed[-1].startswith("PREPARE TRANSACTION 'dtrt_")
+        assert failed.executed[-1] == "ROLLBACK"
+        assert finisher.executed == [first.executed[-1].replace("PREPARE TRANSACTION", "ROLLBACK PREPARED")]
+
+    def test_validation_by_final_type(self):
+        writer = PgTargetWriter(
+            "public.flats", ["id", "price", "_note"], field_types={"id": "int", "price": "float", "_note": "abc"}
+        )
+        groups = writer._group_rows([
+            row(id=1, price=10.5, _note=[1]),
+            row(id="x", price=1.0),
+            row(id=2, price=None),
+            row(id=3, price="bad"),
+        ])
+
+        assert groups == {("id", "price", "_note"): [(1, 10.5, [1])], ("id",): [(2,)]}
+        assert [failed["row"]["id"] for failed in writer.failed_rows] == ["x", 3]
+        assert writer.failed_rows[1]["errors"][0].startswith("price:")
+        assert writer.stats["failed_rows"] == 2
+        assert writer.dropped_rows == [failed["row"] for failed in writer.failed_rows]
+
+
+class TestPgTargetWriterErrors:
+    """Повтор при обрыве соединения и отбраковка строк делением пачки"""
+
+    def test_bisect_rejects_only_bad_rows(self, tmp_path):
+        reject_path = tmp_path / "rejected.jsonl"
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_size=8, reject_path=str(reject_path))
+        writer.connection_pool = FakePool(bad_values={3, 13})
+
+        asyncio.run(writer.write([row(a=i) for i in range(16)]))
+        written = [record for conn in writer.connection_pool.connections for call in conn.calls for record in call[2]]
+
+        assert sorted(written) == [(i,) for i in range(16) if i not in (3, 13)]
+        assert [item["row"] for item in writer.rejected_rows] == [{"a": 3}, {"a": 13}]
+        assert writer.dropped_rows == [{"a": 3}, {"a": 13}]
+        assert writer.stats["rows"] == 14 and writer.stats["rejected_rows"] == 2
+        assert reject_path.read_text(encoding="utf-8").count("UniqueViolationError") == 2
+
+    def test_without_bisect_batch_fails(self):
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_size=8)
+        writer.connection_pool = FakePool(bad_values={3})
+
+        with pytest.raises(asyncpg.UniqueViolationError):
+            asyncio.run(writer.write([row(a=i) for i in range(16)]))
+
+    def test_retry_transient_errors(self):
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, batch_size=5, parallel=2, retry_delay=0)
+        writer.connection_pool = FakePool(disconnects=2)
+
+        asyncio.run(writer.write([row(a=i) for i in range(20)]))
+
+        assert writer.stats["retries"] == 2 and writer.stats["rows"] == 20
+
+    def test_retries_exhausted(self):
+        writer = PgTargetWriter("public.flats", ["a"], skip_validation=True, max_retries=1, retry_delay=0)
+        writer.connection_pool = FakePool(disconnects=2)
+
+        with pytest.raises(asyncpg.PostgresConnectionError):
+            asyncio.run(writer.write([row(a=1)]))
+        assert writer.stats["retries"] == 1
+
+
+    def test_rejected_rows_written_next_run(self, tmp_path, monkeypatch):
+        columns = {"id": "int4", "price": "int4"}
+        pools = [FakePool(bad_values={3}, columns=columns), FakePool(columns=columns)]
+        created = iter(pools)
+        monkeypatch.setattr(
+            pool_manager_module.asyncpg, "create_pool", lambda **kwargs: asyncio.sleep(0, next(created))
+        )
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=postgres/public.flats[id]
+        target1:
+            [id] -> [id](int)
+            [price] -> [price](int)
+        """).compile_ic()
+
+        for _ in pools:
+            runner = DtrtRunner(
+                ic, source_data=[{"id": i, "price": i * 10} for i in range(5)],
+                target_config={"bisect_errors": True}, write_config={"change_state": str(tmp_path / "hashes.db")}
+            )
+            assert asyncio.run(runner.run())["status"] == "success"
+        written = [
+            [record for conn in pool.connections for call in conn.calls for record in call[2]] for pool in pools
+        ]
+
+        assert sorted(written[0]) == [(i, i * 10) for i in range(5) if i != 3]
+        assert written[1] == [(3, 30)]
+
+class TestPgTargetWriterSchema:
+    """Схема таблицы: кэш, кодировщики значений и проверка типов"""
+
+    COLUMNS = {"id": "int4", "payload": "jsonb", "price": "numeric", "created": "timestamptz", "note": "text"}
+
+    def make_writer(self, **options):
+        return PgTargetWriter(
+            "public.flats", ["id", "payload", "price", "created", "note"], skip_validation=True,
+            field_types={"id": "int", "payload": "dict", "price": "float", "created": "str", "note": "int"},
+            **options
+        )
+
+    def test_encoders_by_column_type(self):
+        writer = self.make_writer()
+        writer.connection_pool = FakePool(columns=self.COLUMNS)
+
+        asyncio.run(writer.write([row(id=1, payload={"a": 1}, price=9.5, created="2024-05-01T10:00:00", note=7)]))
+        written = writer.connection_pool.connections[-1].calls[0][2][0]
+
+        assert written == (1, '{"a": 1}', Decimal("9.5"), datetime(2024, 5, 1, 10, 0), "7")
+
+    @pytest.mark.parametrize("final_type, value, text", [
+        ("dict", {"a": "б"}, '{"a": "б"}'),
+        ("list", [1, None], "[1, null]"),
+        ("bool", True, "true"),
+        ("float", 2.5, "2.5"),
+    ])
+    def test_text_column_encoding(self, final_type, value, text):
+        writer = PgTargetWriter("public.flats", ["note"], skip_validation=True, field_types={"note": final_type})
+        writer.connection_pool = FakePool(columns={"note": "text"})
+
+        asyncio.run(writer.write([row(note=value)]))
+        assert writer.connection_pool.connections[-1].calls[0][2] == [(text,)]
+
+    def test_type_mismatches(self):
+        writer = self.make_writer()
+        writer.connection_pool = FakePool(columns=dict(self.COLUMNS, id="timestamptz", payload="int8"))
+
+        missing, mismatches = asyncio.run(writer.check_schema())
+        assert missing == []
+        assert mismatches == ["id: int -> timestamptz", "payload: dict -> int8"]
+
+    def test_missing_table(self):
+        writer = self.make_writer()
+        writer.connection_pool = FakePool()
+
+        assert asyncio.run(writer.validate_fields()) == (False, ["id", "payload", "price", "created", "note"])
+
+    def test_disk_cache(self, tmp_path):
+        cache_path = str(tmp_path / "schema.json")
+        first = self.make_writer(schema_cache=cache_path)
+        first.connection_pool = FakePool(columns=self.COLUMNS)
+        asyncio.run(first.load_schema())
+
+        cached = self.make_writer(schema_cache=cache_path)
+        cached.connection_pool = FakePool(columns={"id": "text"})
+        expired = self.make_writer(schema_cache=cache_path, schema_ttl=-1)
+        expired.connection_pool = FakePool(columns={"id": "text"})
+
+        assert asyncio.run(cached.load_schema()) == self.COLUMNS
+        assert cached.connection_pool.connections == []
+        assert asyncio.run(expired.load_schema()) == {"id": "text"}
+
+    def test_runner_checks_before_reading(self, monkeypatch):
+        monkeypatch.setattr(
+            pool_manager_module.asyncpg, "create_pool",
+            lambda **kwargs: asyncio.sleep(0, FakePool(columns={"id": "int4", "price": "int4"}))
+        )
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=postgres/public.flats
+        target1:
+            [id] -> [id](int)
+            [price] -> [price](str)
+        """).compile_ic()
+
+        runner = DtrtRunner(ic, source_data=[{"id": 1, "price": 2}])
+        runner._iter_source = lambda getter: pytest.fail("источник не должен читаться")
+        result = asyncio.run(runner.run())
+
+        assert result["status"] == "error"
+        assert "price: str -> int4" in result["error"]
+
+
+    def test_runner_validates_rows(self, monkeypatch):
+        pools = []
+
+        async def create_pool(**kwargs):
+            pools.append(FakePool(columns={"id": "int4", "payload": "jsonb"}))
+            return pools[-1]
+        monkeypatch.setattr(pool_manager_module.asyncpg, "create_pool", create_pool)
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=postgres/public.flats
+        target1:
+            [id] -> [id](int)
+            [payload] -> [payload](dict)
+        """).compile_ic()
+        source = [{"id": 1, "payload": {"a": 1}}, {"id": 2, "payload": "not a dict"}]
+
+        checked = asyncio.run(DtrtRunner(ic, source_data=source).run())
+        unchecked = asyncio.run(DtrtRunner(ic, source_data=source, target_config={"skip_validation": True}).run())
+
+        assert checked["write_stats"]["postgres/public.flats"]["failed_rows"] == 1
+        assert [call[2] for call in pools[0].connections[-1].calls] == [[(1, '{"a": 1}')]]
+        assert unchecked["write_stats"]["postgres/public.flats"]["rows"] == 2
+
+    def test_runner_reports_unreachable_database(self):
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=postgres/public.flats
+        target1:
+            [id] -> [id](int)
+        """).compile_ic()
+
+        runner = DtrtRunner(ic, source_data=[{"id": 1}], db_config={"host": "127.0.0.1", "port": 1})
+        result = asyncio.run(runner.run())
+
+        assert result["status"] == "error"
+        assert "Не удалось проверить таблицу" in result["error"]
+
+
+class TestPgTargetWriterUpsert:
+    """Режим upsert через промежуточную таблицу"""
+
+    def test_keys_from_dsl(self):
+        result = DataRoute("""
+        lang=py
+        source=dict/my_dict
+        target1=postgres/public.flats[id, uuid]
+        target2=postgres/public.plain
+        target1:
+            [id] -> [id](int)
+            [uuid] -> [uuid](str)
+        target2:
+            [id] -> [id](int)
+        """).compile_ic()
+
+        assert result["postgres/public.flats"]["target_keys"] == ["id", "uuid"]
+        assert result["postgres/public.flats"]["target_type"] == {"type": "postgres", "name": "public.flats"}
+        assert "target_keys" not in result["postgres/public.plain"]
+
+    def test_on_conflict_query(self):
+        writer = PgTargetWriter("public.flats", ["id", "price"], upsert_keys=["id"], skip_unchanged=True)
+
+        assert writer._merge_query(("id", "price")) == (
+            'INSERT INTO "public"."flats" AS t ("id", "price") SELECT "id", "price" FROM "dtrt_stage_flats" '
+            'ON CONFLICT ("id") DO UPDATE SET "price" = EXCLUDED."price" '
+            'WHERE (t."price") IS DISTINCT FROM (EXCLUDED."price")'
+        )
+        assert writer._merge_query(("id",)).endswith('ON CONFLICT ("id") DO NOTHING')
+
+    def test_merge_query(self):
+        writer = PgTargetWriter("public.flats", ["id", "price"], upsert_keys=["id"], use_merge=True)
+
+        assert writer._merge_query(("id", "price")) == (
+            'MERGE INTO "public"."flats" AS t USING "dtrt_stage_flats" AS s ON t."id" = s."id" '
+            'WHEN MATCHED THEN UPDATE SET "price" = s."price" '
+            'WHEN NOT MATCHED THEN INSERT ("id", "price") VALUES (s."id", s."price")'
+        )
+
+    def test_last_duplicate_wins(self):
+        writer = PgTargetWriter("public.flats", ["id", "price"], upsert_keys=["id"])
+
+        assert writer._dedup_by_keys(("id", "price"), [(1, 10), (2, 20), (1, 30)]) == [(1, 30), (2, 20)]
+        assert writer._dedup_by_keys(("price",), [(10,), (10,)]) == [(10,), (10,)]
+
+    def test_unknown_key(self):
+        with pytest.raises(ValueError):
+            PgTargetWriter("public.flats", ["id"], upsert_keys=["uuid"])
+
+    def test_runner_reports_incompatible_options(self):
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=postgres/public.flats[id]
+        target1:
+            [id] -> [id](int)
+        """).compile_ic()
+
+        for target_config in ({"two_phase": True}, {"no_such_option": 1}):
+            result = asyncio.run(DtrtRunner(ic, source_data=[{"id": 1}], target_config=target_config).run())
+
+            assert result["status"] == "error"
+            assert "Ошибка конфигурации компонента 'target'" in result["error"]
+
+
+@pytest.mark.skipif(not PG_DSN, reason="DTRT_TEST_PG_DSN не задан")
+class TestPgTargetWriter:
+    """Запись в PostgreSQL"""
+
+    def test_write(self):
+        async def run():
+            conn = await asyncpg.connect(PG_DSN)
+            await conn.execute("DROP TABLE IF EXISTS public.dtrt_dst_flats")
+            await conn.execute("CREATE TABLE public.dtrt_dst_flats (id INTEGER, rooms TEXT DEFAULT 'n/a')")
+            writer = PgTargetWriter(
+                "public.dtrt_dst_flats", ["id", "rooms"], db_config_from_dsn(PG_DSN), batch_size=300
+            )
+            await writer.write([row(id=i, rooms=str(i) if i % 2 else None) for i in range(1000)])
+            await writer.close()
+            rows = await conn.fetch("SELECT id, rooms FROM public.dtrt_dst_flats ORDER BY id")
+            await conn.close()
+            return rows
+
+        rows = asyncio.run(run())
+        assert len(rows) == 1000
+        assert rows[0]["rooms"] == "n/a" and rows[1]["rooms"] == "1"
+
+    def test_upsert(self):
+        async def run():
+            conn = await asyncpg.connect(PG_DSN)
+            await conn.execute("DROP TABLE IF EXISTS public.dtrt_dst_upsert")
+            await conn.execute("CREATE TABLE public.dtrt_dst_upsert (id INTEGER PRIMARY KEY, price INTEGER)")
+            for prices in ([1, 2, 3], [10, 20, 30, 40]):
+                writer = PgTargetWriter(
+                    "public.dtrt_dst_upsert", ["id", "price"], db_config_from_dsn(PG_DSN),
+                    upsert_keys=["id"], skip_unchanged=True
+                )
+                await writer.write([row(id=i, price=price) for i, price in enumerate(prices)])
+                await writer.close()
+            rows = await conn.fetch("SELECT id, price FROM public.dtrt_dst_upsert ORDER BY id")
+            await conn.close()
+            return [tuple(r) for r in rows]
+
+        assert asyncio.run(run()) == [(0, 10), (1, 20), (2, 30), (3, 40)]
@@ -0,0 +1,105 @@
+import asyncio
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.resources import pool_manager as pool_manager_module
+from src.generator.python.resources.pool_manager import PoolManager
+from src.generator.python.source_getters import pg_source_getter as pg_source_getter_module
+from src.generator.python.source_getters.pg_source_getter import PgSourceGetter
+from src.generator.python.target_writers.pg_target_writer import PgTargetWriter
+
+
+class FakePool:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+
+    def get_size(self):
+        return 1
+
+    def get_idle_size(self):
+        return 1
+
+    def get_min_size(self):
+        return self.kwargs["min_size"]
+
+    def get_max_size(self):
+        return self.kwargs["max_size"]
+
+    async def close(self):
+        self.closed = True
+
+
+async def fake_create_pool(**kwargs):
+    await asyncio.sleep(0)
+    return FakePool(**kwargs)
+
+
+class TestPoolManager:
+    """Общие пулы соединений запуска"""
+
+    def test_one_pool_per_dsn(self, monkeypatch):
+        monkeypatch.setattr(pool_manager_module.asyncpg, "create_pool", fake_create_pool)
+        manager = PoolManager()
+        main_db = {"host": "db", "database": "main", "password": "secret"}
+
+        async def run():
+            pools = await asyncio.gather(
+                manager.get_pool(main_db),
+                manager.get_pool(dict(main_db)),
+                manager.get_pool({"host": "db", "database": "other"}),
+            )
+            writer = PgTargetWriter("public.flats", ["id"], main_db, pool_manager=manager)
+            await writer.connect()
+            shared = writer.connection_pool is pools[0]
+            await writer.close()
+            closed_by_writer = pools[0].closed
+            stats = manager.stats()
+            await manager.close()
+            return pools, shared, closed_by_writer, stats
+
+        pools, shared, closed_by_writer, stats = asyncio.run(run())
+
+        assert pools[0] is pools[1] and pools[0] is not pools[2]
+        assert shared and not closed_by_writer
+        assert stats["postgresql://postgres@db:5432/main"]["requests"] == 3
+        assert all("secret" not in key for key in stats)
+        assert all(pool.closed for pool in pools)
+
+    def test_source_getter_own_pool_size(self, monkeypatch):
+        monkeypatch.setattr(pg_source_getter_module.asyncpg, "create_pool", fake_create_pool)
+        getter = PgSourceGetter(
+            "flats", ["id"], db_config={"min_connections": 2, "max_connections": 6}, partitions=4, partition_key="id"
+        )
+        asyncio.run(getter.connect())
+
+        assert getter.connection_pool.get_min_size() == 2
+        assert getter.connection_pool.get_max_size() == 6
+
+    def test_context_argument(self, tmp_path):
+        (tmp_path / "lookup.py").write_text(
+            "def func(value, context=None):\n"
+            "    return f\"{value}:{type(context).__name__}\"\n"
+        )
+        (tmp_path / "plain.py").write_text("def func(value):\n    return value * 2\n")
+        ic = DataRoute("""
+        lang=py
+        source=dict/feed
+        target1=dict/out
+        target1:
+            [a] -> |*lookup| -> [a](str)
+            [b] -> |*plain| -> [b](int)
+        """).compile_ic()
+
+        runner = DtrtRunner(ic, user_functions_path=str(tmp_path), source_data=[{"a": 1, "b": 2}])
+        runner._init_targets = lambda: asyncio.sleep(0)
+        written = {}
+
+        async def write_results(results):
+            written.update(results)
+        runner._write_results = write_results
+
+        assert asyncio.run(runner.run())["status"] == "success"
+        row = written["dict/out"][0]
+        assert row["a"]["final_value"] == "1:RunContext"
+        assert row["b"]["final_value"] == 4
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.generator.python.source_getters.base_source_getter import AsyncSourceGetter, SyncSourceGetter
+from src.generator.python.source_getters.prefetch_getter import PrefetchGetter
+from src.generator.python.source_getters.pydict_source_getter import PydictSourceGetter
+from src.generator.python.source_getters.sqlite_source_getter import SqliteSourceGetter
+
+
+async def collect(getter, batch_size=None):
+    return [batch async for batch in getter.aiter_batches(batch_size)]
+
+
+class AsyncGetter:
+    """Асинхронный getter, отдающий заранее заданные пачки"""
+
+    def __init__(self, batches):
+        self.batches = batches
+
+    async def aiter_batches(self, batch_size=None):
+        for batch in self.batches:
+            await asyncio.sleep(0)
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
+
+
+class TestPrefetchGetter:
+    """Упреждающее чтение пачек"""
+
+    def test_sync_getter_on_thread(self, flats_db):
+        getter = SqliteSourceGetter(f"{flats_db}:flats", ["id"])
+        prefetch = PrefetchGetter(getter, depth=3)
+        batches = asyncio.run(collect(prefetch, 30))
+        prefetch.close()
+
+        assert [len(batch) for batch in batches] == [30, 30, 30, 10]
+        assert prefetch.stats["batches"] == 4
+        assert prefetch.report["fully_valid"]
+
+    def test_async_getter_and_budget(self):
+        batches = [[{"v": i}] * 10 for i in range(5)]
+        prefetch = PrefetchGetter(AsyncGetter(batches), depth=4, max_bytes=1)
+
+        assert asyncio.run(collect(prefetch)) == batches
+        assert prefetch.stats["source_wait_seconds"] >= 0
+
+    def test_error_propagates(self):
+        prefetch = PrefetchGetter(AsyncGetter([[{"v": 1}], ValueError("boom")]))
+
+        async def run():
+            received = []
+            try:
+                async for batch in prefetch.aiter_batches():
+                    received.append(batch)
+            except ValueError as e:
+                return received, str(e)
+
+        assert asyncio.run(run()) == ([[{"v": 1}]], "boom")
+
+    def test_early_stop(self):
+        getter = PydictSourceGetter([{"v": i} for i in range(10)], ["v"])
+        prefetch = PrefetchGetter(getter, depth=2)
+
+        async def run():
+            async for batch in prefetch.aiter_batches(2):
+                return batch
+
+        assert asyncio.run(run()) == [{"v": 0}, {"v": 1}]
+
+    @pytest.mark.parametrize("base", [SyncSourceGetter, AsyncSourceGetter])
+    def test_getter_without_reader(self, base):
+        # Getter без чтения пачками не создается, а не падает при первом чтении
+        getter_class = type("NoReader", (base,), {})
+        with pytest.raises(TypeError):
+            getter_class(["v"])
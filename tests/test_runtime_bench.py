@@ -0,0 +1,54 @@
+from benchmarks.flats_generator import MIXES, FeedShape, generate_records
+from benchmarks.runtime_bench import compare, run_case
+
+
+class TestFlatsGenerator:
+    """Синтетическая лента квартир"""
+
+    def test_deterministic_skip_rate(self):
+        shape = FeedShape(records=1000, skip_rate=0.2)
+        records = generate_records(shape)
+
+        assert records == generate_records(shape)
+        assert 150 < sum(record["uuid"] is None for record in records) < 250
+
+
+class TestRuntimeBench:
+    """Измерение запуска и сравнение с базовыми результатами"""
+
+    def test_run_case_sinks(self):
+        for sink in ("memory", "postgres", "jsonl"):
+            case = run_case(FeedShape(records=50, mix="funcs", skip_rate=0.2), sink, batch_size=20, repeat=1)
+
+            assert case["written"] == case["sink_rows"] == sum(
+                record["uuid"] is not None for record in generate_records(FeedShape(records=50, skip_rate=0.2))
+            )
+            assert set(case["stages"]) == {"read", "transform", "write"}
+            assert case["stages"]["transform"]["records"] == case["written"]
+            assert case["stages"]["read"]["records"] == case["written"]
+            assert 0 < case["stages"]["transform"]["p50"] <= case["stages"]["transform"]["p99"]
+
+    def test_peak_memory_grows_with_records(self):
+        # Строки таргетов копятся до записи: пик памяти растет с числом записей
+        small, large = (
+            run_case(FeedShape(records=records, mix="direct", skip_rate=0.0), batch_size=50, repeat=1)
+            for records in (100, 1000)
+        )
+
+        assert 0 < small["memory"]["peak_bytes"] < large["memory"]["peak_bytes"]
+        assert "memory" not in run_case(FeedShape(records=10, mix="direct"), repeat=1, memory=False)
+
+    def test_mixes_compile_and_run(self):
+        for mix in MIXES:
+            case = run_case(FeedShape(records=10, mix=mix, skip_rate=0.0), repeat=1)
+            assert case["written"] == 10
+
+    def test_compare(self):
+        def results(**throughput):
+            return {"cases": [
+                {"name": name, "records_per_second": {"max": value}} if value else {"name": name, "skipped": "budget"}
+                for name, value in throughput.items()
+            ]}
+
+        regressions = compare(results(a=900, b=500, c=None), results(a=1000, b=1000, c=1000))
+        assert [(item["case"], item["current"]) for item in regressions] == [("b", 500), ("c", None)]
@@ -0,0 +1,139 @@
+import sqlite3
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.source_getters.pydict_source_getter import PydictSourceGetter
+from src.generator.python.source_getters.skip_predicate import SkipCondition, SkipPredicate
+from src.generator.python.source_getters.sqlite_source_getter import SqliteSourceGetter
+
+
+VALUES = [None, 0, 3, 5, 7, 10]
+
+
+def make_predicate(groups):
+    return SkipPredicate([[SkipCondition(field, exp) for field, exp in group] for group in groups])
+
+
+class TestSkipPredicateCompile:
+    """Вынос IF(...): SKIP(...) в IC"""
+
+    def test_skip_predicates_in_ic(self):
+        test_case = """
+        lang=py
+        source=dict/my_dict
+        target1=dict/my_new_dict
+        $limit = 5
+        target1:
+            [price] -> |IF($this == None): SKIP("no price")|*func1()| -> [price](int)
+            [rooms] -> |*func1()|IF($this == None): SKIP("later")| -> [rooms](int)
+            [area] -> |IF($this > $limit): SKIP("big")| -> [area](int)
+            [floor] -> |IF($this == None): *func1() ELSE: SKIP("x")| -> [floor](int)
+        """
+        result = DataRoute(test_case, lang="ru").compile_ic()
+
+        assert result["dict/my_new_dict"]["skip_predicates"] == [
+            {"field": "price", "exp": "$this == None"},
+            {"field": "area", "exp": "$this > 5"},
+        ]
+
+    def test_no_skip_predicates_key(self):
+        test_case = """
+        lang=py
+        source=dict/my_dict
+        target1=dict/my_new_dict
+        target1:
+            [price] -> [price](int)
+        """
+        result = DataRoute(test_case, lang="ru").compile_ic()
+
+        assert "skip_predicates" not in result["dict/my_new_dict"]
+
+
+class TestSkipPredicate:
+    """Проталкивание предиката пропуска в источник"""
+
+    @pytest.mark.parametrize("expression", [
+        "$this == None",
+        "$this != None",
+        "$this > 5",
+        "5 >= $this",
+        "$this in (3, None)",
+        "$this not in [0, 7]",
+        "$this > 5 or $this == None",
+        "$this == None or $this > 5",
+        "not ($this < 4) and $this != 10",
+    ])
+    def test_sql_matches_python(self, tmp_path, expression):
+        db_path = tmp_path / "values.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(value,) for value in VALUES])
+        conn.commit()
+        conn.close()
+
+        predicate = make_predicate([[("v", expression)]])
+        getter = SqliteSourceGetter(f"{db_path}:t", ["v"], predicate)
+        query, params, pushed_down = getter.build_query()
+        from_sql = [row["v"] for batch in getter.iter_batches() for row in batch]
+        getter.close()
+
+        assert pushed_down
+        assert from_sql == [value for value in VALUES if not predicate.matches({"v": value})]
+
+    @pytest.mark.parametrize("expression", [
+        "$this > 5",
+        "$this <= \"b\"",
+        "$this == 5",
+        "$this != \"5\"",
+        "$this in (5, \"a\", None)",
+        "$this > 5 or $this == \"a\"",
+    ])
+    def test_sql_matches_python_mixed_types(self, tmp_path, expression):
+        # Столбец без типа хранит значения разных видов: TEXT и INTEGER в SQLite
+        # сравнимы, а в Python сравнение на больше/меньше падает с TypeError
+        values = [None, 3, 5, 7, 2.5, "5", "a", "c"]
+        db_path = tmp_path / "mixed.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (v)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(value,) for value in values])
+        conn.commit()
+        conn.close()
+
+        predicate = make_predicate([[("v", expression)]])
+        getter = SqliteSourceGetter(f"{db_path}:t", ["v"], predicate)
+        _, _, pushed_down = getter.build_query()
+        from_sql = [row["v"] for batch in getter.iter_batches() for row in batch]
+        getter.close()
+
+        assert pushed_down
+        assert from_sql == [value for value in values if not predicate.matches({"v": value})]
+
+    def test_postgres_requires_matching_column_type(self):
+        predicate = make_predicate([[("v", "$this > 5")]])
+
+        assert predicate.to_sql(lambda name: name, "postgres", [], {"v": "int4"}) is not None
+        assert predicate.to_sql(lambda name: name, "postgres", [], {"v": "text"}) is None
+        assert predicate.to_sql(lambda name: name, "postgres", []) is None
+        # Сравнение с None не зависит от типа столбца
+        assert make_predicate([[("v", "$this == None")]]).to_sql(lambda name: name, "postgres", []) is not None
+
+    def test_all_targets_must_skip(self):
+        config = {
+            "lang": "py",
+            "dict/a": {"routes": {}, "skip_predicates": [{"field": "v", "exp": "$this > 5"}]},
+            "dict/b": {"routes": {}, "skip_predicates": [{"field": "v", "exp": "$this == 10"}]},
+        }
+        predicate = SkipPredicate.from_config(config)
+        getter = PydictSourceGetter([{"v": value} for value in VALUES], ["v"], predicate)
+
+        assert [row["v"] for batch in getter.iter_batches() for row in batch] == [None, 0, 3, 5, 7]
+
+        config["dict/c"] = {"routes": {}}
+        assert SkipPredicate.from_config(config) is None
+
+    def test_not_pushable_expression(self):
+        with pytest.raises(ValueError):
+            SkipCondition("v", "$this IN $other")
+        with pytest.raises(ValueError):
+            SkipCondition("v", "$this == None OR $this == 0")
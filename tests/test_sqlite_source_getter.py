@@ -0,0 +1,84 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.source_getters.sqlite_source_getter import SqliteSourceGetter
+
+
+class TestSqliteSourceGetter:
+    """Потоковое чтение из SQLite"""
+
+    def test_projection_and_batches(self, flats_db):
+        getter = SqliteSourceGetter(f"{flats_db}:flats", ["rooms", "price"], batch_size=30)
+        batches = list(getter.iter_batches())
+        getter.close()
+
+        assert getter.report["fully_valid"]
+        assert [len(batch) for batch in batches] == [30, 30, 30, 10]
+        assert batches[0][0] == {"rooms": "1", "price": 1000}
+
+    def test_query_source(self, flats_db):
+        getter = SqliteSourceGetter(f"{flats_db}:SELECT id, price FROM flats WHERE price > 95000", ["price"])
+        rows = [row for batch in getter.iter_batches() for row in batch]
+        getter.close()
+
+        assert rows == [{"price": 96000}, {"price": 97000}, {"price": 98000}, {"price": 99000}, {"price": 100000}]
+
+    def test_missing_columns(self, flats_db):
+        getter = SqliteSourceGetter(f"{flats_db}:flats", ["rooms", "area"])
+        getter.close()
+
+        assert not getter.report["fully_valid"]
+        assert getter.report["invalid_count"] == 100
+        assert getter.report["invalid_examples"][0]["missing_keys"] == ["area"]
+
+    @pytest.mark.parametrize("partition_key", ["rowid", "id"])
+    def test_partitions_cover_table(self, flats_db, partition_key):
+        seen = []
+        for index in range(3):
+            getter = SqliteSourceGetter(
+                f"{flats_db}:flats", ["price"], partition=(index, 3), partition_key=partition_key
+            )
+            seen.extend(row["price"] for batch in getter.iter_batches() for row in batch)
+            getter.close()
+
+        assert sorted(seen) == [i * 1000 for i in range(1, 101)]
+
+    @pytest.mark.parametrize("null_every", [3, 1])
+    def test_partitions_read_null_keys(self, tmp_path, null_every):
+        db_path = tmp_path / "nullable.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE items (k INTEGER, price INTEGER)")
+        conn.executemany(
+            "INSERT INTO items (k, price) VALUES (?, ?)",
+            [(None if i % null_every == 0 else i, i) for i in range(30)]
+        )
+        conn.commit()
+        conn.close()
+
+        seen = []
+        for index in range(3):
+            getter = SqliteSourceGetter(f"{db_path}:items", ["price"], partition=(index, 3), partition_key="k")
+            seen.extend(row["price"] for batch in getter.iter_batches() for row in batch)
+            getter.close()
+
+        assert sorted(seen) == list(range(30))
+
+    @pytest.mark.parametrize("source", ["nope.db:flats", "flats.db:nope"])
+    def test_runner_reports_unavailable_source(self, flats_db, tmp_path, source):
+        ic = DataRoute(f"""
+        lang=py
+        source=sqlite/{tmp_path / source}
+        target1=dict/out
+        target1:
+            [price] -> [price](int)
+        """).compile_ic()
+
+        result = asyncio.run(DtrtRunner(ic).run())
+
+        assert result["status"] == "error"
+        assert "Ошибка конфигурации компонента 'source'" in result["error"]
+        assert not (tmp_path / "nope.db").exists()
@@ -0,0 +1,124 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.target_writers.sqlite_target_writer import SqliteTargetWriter
+
+
+def row(**values):
+    return {name: {"final_value": value} for name, value in values.items()}
+
+
+def fetch(db_path, query):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+class TestSqliteTargetWriter:
+    """Запись в SQLite"""
+
+    def test_create_table_and_write(self, tmp_path):
+        db_path = str(tmp_path / "out.db")
+        writer = SqliteTargetWriter(
+            f"{db_path}:flats", ["id", "price", "tags"],
+            field_types={"id": "int", "price": "float", "tags": "list"}, batch_size=2
+        )
+
+        async def run():
+            await writer.write([row(id=i, price=i * 1.5, tags=["a"]) for i in range(5)] + [row(id=5)])
+            await writer.close()
+
+        asyncio.run(run())
+        assert fetch(db_path, "PRAGMA journal_mode") == [("wal",)]
+        assert [column[2] for column in fetch(db_path, "PRAGMA table_info(flats)")] == ["INTEGER", "REAL", ""]
+        assert fetch(db_path, "SELECT * FROM flats WHERE id IN (1, 5) ORDER BY id") == [
+            (1, 1.5, '["a"]'), (5, None, None)
+        ]
+        assert writer.stats == {"rows": 6, "batches": 3}
+
+    def test_missing_columns(self, tmp_path):
+        db_path = str(tmp_path / "out.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE flats (id INTEGER)")
+        conn.close()
+        writer = SqliteTargetWriter(f"{db_path}:flats", ["id", "price"])
+
+        assert asyncio.run(writer.validate_fields()) == (False, ["price"])
+        with pytest.raises(ValueError):
+            asyncio.run(writer.write([row(id=1, price=2)]))
+
+    def test_upsert_from_dsl_keys(self, tmp_path):
+        db_path = str(tmp_path / "out.db")
+        ic = DataRoute(f"""
+        lang=py
+        source=dict/feed
+        target1=sqlite/{db_path}:flats[id]
+        target1:
+            [id] -> [id](int)
+            [price] -> [price](int)
+        """).compile_ic()
+
+        for prices in ([1, 2], [10, 20, 30]):
+            source = [{"id": i, "price": price} for i, price in enumerate(prices)]
+            assert asyncio.run(DtrtRunner(ic, source_data=source).run())["status"] == "success"
+
+        assert fetch(db_path, "SELECT id, price FROM flats ORDER BY id") == [(0, 10), (1, 20), (2, 30)]
+
+    def test_prepare_rollback(self, tmp_path):
+        db_path = str(tmp_path / "out.db")
+        writer = SqliteTargetWriter(f"{db_path}:flats", ["id"])
+
+        async def run():
+            await writer.prepare([row(id=1)])
+            await writer.rollback_prepared()
+            await writer.close()
+
+        asyncio.run(run())
+        assert fetch(db_path, "SELECT COUNT(*) FROM flats") == [(0,)]
+
+    def test_runner_checks_before_reading(self, tmp_path):
+        db_path = str(tmp_path / "out.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE flats (id INTEGER)")
+        conn.close()
+        ic = DataRoute(f"""
+        lang=py
+        source=dict/feed
+        target1=sqlite/{db_path}:flats
+        target1:
+            [id] -> [id](int)
+            [price] -> [price](int)
+        """).compile_ic()
+
+        runner = DtrtRunner(ic, source_data=[{"id": 1, "price": 2}])
+        runner._iter_source = lambda getter: pytest.fail("источник не должен читаться")
+        result = asyncio.run(runner.run())
+
+        assert result["status"] == "error"
+        assert "price" in result["error"]
+
+    def test_all_or_nothing_same_file(self, tmp_path):
+        def run(second_db):
+            ic = DataRoute(f"""
+            lang=py
+            source=dict/feed
+            target1=sqlite/{tmp_path / 'a.db'}:flats
+            target2=sqlite/{tmp_path / second_db}:prices
+            target1:
+                [id] -> [id](int)
+            target2:
+                [id] -> [id](int)
+            """).compile_ic()
+            return asyncio.run(DtrtRunner(ic, source_data=[{"id": 1}], write_config={"all_or_nothing": True}).run())
+
+        shared = run("a.db")
+        assert shared["status"] == "error"
+        assert "в одном файле" in shared["error"]
+        assert run("b.db")["status"] == "success"
+        assert fetch(str(tmp_path / "b.db"), "SELECT id FROM prices") == [(1,)]
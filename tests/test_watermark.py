@@ -0,0 +1,110 @@
+import asyncio
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.source_getters.pydict_source_getter import PydictSourceGetter
+from src.generator.python.source_getters.sqlite_source_getter import SqliteSourceGetter
+from src.generator.python.state.checkpoint_store import open_checkpoint_store
+
+
+DSL = """
+lang=py
+source=dict/feed
+target1=dict/out
+target1:
+    [id] -> [id](int)
+"""
+
+
+def make_runner(data, watermark):
+    # Таргет dict/out не записывается: проверяется только чтение и контрольная точка
+    runner = DtrtRunner(DataRoute(DSL).compile_ic(), source_data=data, watermark=watermark)
+    runner._init_targets = lambda: asyncio.sleep(0)
+    runner._write_results = lambda results: asyncio.sleep(0)
+    return runner
+
+
+class TestCheckpointStore:
+    """Хранение контрольных точек"""
+
+    @pytest.mark.parametrize("file_name", ["state.json", "state.db"])
+    def test_roundtrip(self, tmp_path, file_name):
+        path = str(tmp_path / file_name)
+        store = open_checkpoint_store(path)
+        assert store.get("a") is None
+        store.set("a", datetime(2024, 1, 2, 3, 4, 5))
+        store.set("b", Decimal("1.50"))
+        store.set("a", datetime(2024, 2, 1))
+        store.close()
+
+        store = open_checkpoint_store(path)
+        assert store.get("a") == datetime(2024, 2, 1)
+        assert store.get("b") == Decimal("1.50")
+        store.close()
+
+
+class TestWatermark:
+    """Инкрементальное чтение по водяному знаку"""
+
+    def test_sqlite_where(self, tmp_path):
+        db_path = tmp_path / "src.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (id INTEGER, updated INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, i * 10) for i in range(5)])
+        conn.commit()
+        conn.close()
+
+        getter = SqliteSourceGetter(f"{db_path}:t", ["id", "updated"], watermark=("updated", 20))
+        rows = [row["id"] for batch in getter.iter_batches() for row in batch]
+        getter.close()
+
+        assert rows == [3, 4]
+
+    def test_runner_saves_checkpoint(self, tmp_path):
+        state_path = str(tmp_path / "state.json")
+        watermark = {"field": "updated", "state_path": state_path}
+        data = [{"id": i, "updated": i} for i in range(3)]
+
+        runner = make_runner(data, watermark)
+        result = asyncio.run(runner.run())
+        assert result["watermark"] == {"field": "updated", "previous": None, "current": 2}
+
+        data.append({"id": 3, "updated": 3})
+        runner = make_runner(data, watermark)
+        result = asyncio.run(runner.run())
+        assert result["results"] == {"dict/out": 1}
+        assert result["watermark"] == {"field": "updated", "previous": 2, "current": 3}
+
+    def test_runner_keeps_checkpoint_on_dropped_rows(self, tmp_path):
+        state_path = str(tmp_path / "state.json")
+        watermark = {"field": "updated", "state_path": state_path}
+        data = [{"id": i, "updated": i} for i in range(3)]
+
+        runner = make_runner(data, watermark)
+
+        async def write_results(results):
+            # Таргет отбросил строку: она должна быть прочитана снова
+            runner.target_writers["dict/out"] = SimpleNamespace(dropped_rows=[{"id": 1}])
+
+        runner._write_results = write_results
+        result = asyncio.run(runner.run())
+        assert result["status"] == "success"
+
+        store = open_checkpoint_store(state_path)
+        assert store.get("dict/feed:updated") is None
+        store.close()
+
+        runner = make_runner(data, watermark)
+        result = asyncio.run(runner.run())
+        assert result["results"] == {"dict/out": 3}
+        assert result["watermark"] == {"field": "updated", "previous": None, "current": 2}
+
+    def test_pydict_filter(self):
+        getter = PydictSourceGetter([{"v": None}, {"v": 1}, {"v": 5}], ["v"], watermark=("v", 1))
+        assert [row["v"] for batch in getter.iter_batches() for row in batch] == [5]
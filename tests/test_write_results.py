@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from dataroute import DataRoute
+from src.generator.python.dtrt_runner import DtrtRunner
+from src.generator.python.exeptions import TargetWriteError
+
+DSL = """
+lang=py
+source=dict/feed
+target1=dict/a
+target2=dict/b
+target3=dict/c
+target1:
+    [id] -> [id](int)
+target2:
+    [id] -> [id](int)
+target3:
+    [id] -> [id](int)
+"""
+
+
+class FakeWriter:
+    """Writer, записывающий строки в память с задержкой"""
+
+    active = 0
+    max_active = 0
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.written = None
+        self.prepared = None
+        self.closed = False
+
+    async def write(self, warehouse):
+        FakeWriter.active += 1
+        FakeWriter.max_active = max(FakeWriter.max_active, FakeWriter.active)
+        await asyncio.sleep(0.01)
+        FakeWriter.active -= 1
+        if self.fail:
+            raise RuntimeError("write failed")
+        self.written = warehouse
+
+    async def prepare(self, warehouse):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("prepare failed")
+        self.prepared = warehouse
+
+    async def commit_prepared(self):
+        self.written, self.prepared = self.prepared, None
+
+    async def rollback_prepared(self):
+        self.prepared = None
+
+    async def close(self):
+        self.closed = True
+
+
+def write(write_config, failing=()):
+    FakeWriter.active = FakeWriter.max_active = 0
+    runner = DtrtRunner(DataRoute(DSL).compile_ic(), write_config=write_config)
+    runner.target_writers = {key: FakeWriter(fail=key in failing) for key in runner.targets}
+    results = {key: [{"id": {"final_value": index}}] for index, key in enumerate(runner.targets)}
+    try:
+        asyncio.run(runner._write_results(results))
+        error = None
+    except TargetWriteError as e:
+        error = e
+    return runner.target_writers, error
+
+
+class TestWriteResults:
+    """Параллельная запись таргетов"""
+
+    def test_concurrency_cap(self):
+        writers, error = write({"concurrency": 2})
+
+        assert error is None
+        assert FakeWriter.max_active == 2
+        assert all(writer.written and writer.closed for writer in writers.values())
+
+    def test_error_isolation(self):
+        writers, error = write({}, failing={"dict/b"})
+
+        assert "dict/b" in str(error)
+        assert writers["dict/a"].written and writers["dict/c"].written
+        assert all(writer.closed for writer in writers.values())
+
+    @pytest.mark.parametrize("failing, committed", [((), True), (("dict/c",), False)])
+    def test_all_or_nothing(self, failing, committed):
+        writers, error = write({"all_or_nothing": True}, failing=failing)
+
+        assert (error is None) == committed
+        assert all(bool(writer.written) == committed for writer in writers.values())